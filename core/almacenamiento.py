@@ -0,0 +1,107 @@
+# --------------------
+# Organización de los archivos subidos en MEDIA_ROOT
+# --------------------
+# Antes todo caía en carpetas planas (documentos/, anexos_historicos/,
+# anexos/) y, cuando un nombre se repetía, el almacenamiento probaba en disco
+# un nombre tras otro. Con decenas de miles de archivos eso vuelve lentos los
+# listados, los respaldos y cada ``exists()``.
+#
+# Ahora cada archivo va en una carpeta por entidad y un prefijo de hash:
+#
+#   documentos/<entidad_id>/<hh>/<token>_<nombre original>
+#
+# donde ``token`` son 8 caracteres hexadecimales y ``hh`` sus dos primeros.
+# Cada carpeta queda con pocos archivos y el token hace que los choques de
+# nombre sean prácticamente imposibles (un solo ``exists()`` por carga).
+#
+# ``manage.py fragmentar_media`` mueve los archivos existentes a este esquema.
+#
+# IMPORTANTE: sin importaciones de modelos (las funciones de ``upload_to`` se
+# importan desde core/models.py y desde las migraciones).
+import hashlib
+import os
+import re
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from django.core.files.storage import default_storage
+from django.utils.text import get_valid_filename
+
+_RE_TOKEN = re.compile(r'^[0-9a-f]{8}_')
+
+
+def ruta_fragmentada(carpeta, entidad_id, nombre, token=None):
+    """Ruta relativa a MEDIA_ROOT para ``nombre`` dentro de ``carpeta``.
+
+    ``token`` es aleatorio salvo que se indique (la migración de archivos usa
+    uno derivado de la ruta anterior para poder reanudarse).
+    """
+    token = token or uuid.uuid4().hex[:8]
+    nombre = get_valid_filename(os.path.basename(nombre)) or 'archivo'
+    return f'{carpeta}/{entidad_id or 0}/{token[:2]}/{token}_{nombre}'
+
+
+def token_de(ruta):
+    """Token estable (8 hexadecimales) derivado de una ruta."""
+    return hashlib.blake2b(ruta.encode('utf-8'), digest_size=4).hexdigest()
+
+
+def es_fragmentada(carpeta, ruta):
+    return re.match(rf'^{re.escape(carpeta)}/\d+/[0-9a-f]{{2}}/[0-9a-f]{{8}}_', ruta or '') is not None
+
+
+def nombre_visible(ruta):
+    """Nombre original del archivo, sin carpetas ni token."""
+    return _RE_TOKEN.sub('', os.path.basename(ruta or ''))
+
+
+# --------------------
+# upload_to de los modelos
+# --------------------
+def subir_documento(instancia, nombre):
+    return ruta_fragmentada('documentos', instancia.usuario_id, nombre)
+
+
+def subir_historico(instancia, nombre):
+    return ruta_fragmentada('anexos_historicos', instancia.entidad_id, nombre)
+
+
+def subir_anexo_usuario(instancia, nombre):
+    return ruta_fragmentada('anexos', instancia.usuario_id, nombre)
+
+
+# --------------------
+# Mantenimiento de MEDIA_ROOT
+# --------------------
+# ``fragmentar_media`` mueve archivos antes de actualizar sus rutas en la base
+# y ``limpiar_huerfanos`` borra los archivos sin ruta en la base: si corren a
+# la vez, el segundo puede borrar un archivo recién movido. Los dos toman este
+# bloqueo (un archivo en MEDIA_ROOT con ``flock``, compartido entre procesos).
+class MantenimientoEnCurso(Exception):
+    pass
+
+
+@contextmanager
+def bloqueo_mantenimiento():
+    """Bloqueo exclusivo de los comandos que mueven o borran archivos de MEDIA_ROOT."""
+    if fcntl is None:
+        yield
+        return
+    ruta = default_storage.path('.mantenimiento.lock')
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, 'a') as archivo:
+        try:
+            fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise MantenimientoEnCurso(
+                "Otro comando de mantenimiento de archivos (fragmentar_media o limpiar_huerfanos) está en curso."
+            )
+        try:
+            yield
+        finally:
+            fcntl.flock(archivo, fcntl.LOCK_UN)
@@ -0,0 +1,64 @@
+# --------------------
+# Baja de usuarios en segundo plano
+# --------------------
+# ``usuario.delete()`` dentro de la petición carga en memoria todos sus
+# documentos y respaldos para borrarlos en cascada, y deja los archivos en
+# disco. La vista solo desactiva la cuenta (ya no puede entrar) y lanza la
+# TareaFondo 'eliminar_usuario', que borra los registros por lotes y los
+# archivos de cada lote al confirmar su transacción. Desde que se desactiva,
+# la entidad ya no cuenta en reportes ni puntajes (filtran ``is_active``).
+#
+# Si la tarea queda abandonada (``TareaFondo.abandonada``, p. ej. tras un
+# reinicio), la vista permite lanzarla de nuevo: lo que ya se borró no se
+# vuelve a procesar.
+from django.conf import settings
+from django.db import transaction
+
+from . import tareas
+from .signals import invalidacion_agrupada
+from .models import AnexoHistorico, AnexoUsuario, Documento, TareaFondo, Usuario
+
+# Modelos con archivos que dependen del usuario y el campo que lo referencia
+DEPENDIENTES = [
+    (Documento, 'usuario_id'),
+    (AnexoUsuario, 'usuario_id'),
+    (AnexoHistorico, 'entidad_id'),
+]
+
+
+def bajas_en_curso():
+    """``{usuario_id: TareaFondo}`` de las bajas pendientes, en curso o fallidas (la más reciente)."""
+    return {
+        tarea.parametros.get('usuario_id'): tarea
+        for tarea in TareaFondo.objects.filter(
+            tipo='eliminar_usuario', estado__in=['pendiente', 'en_curso', 'fallida'],
+        ).order_by('fecha_creacion')
+    }
+
+
+def eliminar_usuario(tarea):
+    """Borra los registros y archivos del usuario ``tarea.parametros['usuario_id']`` y luego al usuario."""
+    usuario_id = tarea.parametros['usuario_id']
+    lote = getattr(settings, 'USUARIOS_BORRADO_LOTE', 500)
+    tareas.avanzar(tarea, 0, total=sum(
+        modelo.objects.filter(**{campo: usuario_id}).count() for modelo, campo in DEPENDIENTES
+    ))
+
+    procesados = 0
+    for modelo, campo in DEPENDIENTES:
+        registros = modelo.objects.filter(**{campo: usuario_id}).order_by('id')
+        while True:
+            filas = list(registros.values_list('id', 'archivo')[:lote])
+            if not filas:
+                break
+            # Una invalidación de puntajes por lote (no por registro), después del commit
+            with invalidacion_agrupada(), transaction.atomic():
+                modelo.objects.filter(id__in=[pk for pk, _ in filas]).delete()
+                tareas.borrar_al_confirmar([ruta for _, ruta in filas])
+            procesados += len(filas)
+            tareas.avanzar(tarea, procesados)
+
+    # Ya sin dependientes pesados, el borrado en cascada del usuario es inmediato
+    with transaction.atomic():
+        Usuario.objects.filter(id=usuario_id).delete()
+    return f"Se eliminaron el usuario y {procesados} registros con sus archivos."
@@ -0,0 +1,170 @@
+# --------------------
+# Benchmark de vistas
+# --------------------
+# Mide por vista: tiempo (mediana de varias repeticiones), número de queries y
+# pico de memoria de Python (tracemalloc, en una pasada aparte porque
+# tracemalloc hace más lento el código). Cada medición empieza con la caché
+# vacía, así que los resultados corresponden al peor caso (caché fría).
+#
+# Lo usa el comando ``benchmark_vistas``, que además crea la base de datos de
+# prueba, genera los datos sintéticos y compara contra una línea base.
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import AnexoRequerido, Usuario
+
+
+class Vista:
+    """Una petición a medir.
+
+    ``url`` recibe el contexto (ids de la escala actual) y regresa la ruta.
+    Las vistas que modifican datos (``muta=True``) se miden una sola vez.
+    """
+
+    def __init__(self, nombre, url, metodo='get', usuario='admin', datos=None, muta=False):
+        self.nombre = nombre
+        self.url = url
+        self.metodo = metodo
+        self.usuario = usuario
+        self.datos = datos or {}
+        self.muta = muta
+
+
+# El orden importa: respaldar_anexos va antes de las vistas que leen los respaldos
+VISTAS = [
+    Vista('usuario_dashboard', lambda c: reverse('usuario_dashboard'), usuario='entidad'),
+    Vista('admin_revision_documentacion', lambda c: reverse('admin_revision_documentacion')),
+    Vista('admin_revision_documentacion_entidad',
+          lambda c: reverse('admin_revision_documentacion_entidad', args=[c['entidad_id']])),
+    Vista('admin_gestion_usuarios', lambda c: reverse('admin_gestion_usuarios')),
+    Vista('admin_anexos', lambda c: reverse('admin_anexos')),
+    Vista('reporte_general_pdf', lambda c: reverse('reporte_general_pdf')),
+    Vista('reporte_entidad_pdf', lambda c: reverse('reporte_entidad_pdf', args=[c['entidad_id']])),
+    Vista('reporte_anexos_pdf', lambda c: reverse('reporte_anexos_pdf')),
+    Vista('exportar_reportes_entidades',
+          lambda c: reverse('exportar_reportes_entidades') + f"?entidad_federativa={c['entidad_federativa']}"),
+    Vista('exportar_matriz_cumplimiento', lambda c: reverse('exportar_matriz_cumplimiento') + '?formato=csv'),
+    Vista('tendencias_cumplimiento', lambda c: reverse('tendencias_cumplimiento')),
+    Vista('descargar_instantanea', lambda c: reverse('descargar_instantanea')),
+    Vista('respaldar_anexos', lambda c: reverse('respaldar_anexos'), metodo='post', muta=True),
+    Vista('vista_respaldo_anexos', lambda c: reverse('vista_respaldo_anexos')),
+    Vista('descargar_respaldo_zip', lambda c: reverse('descargar_respaldo_zip')),
+]
+
+
+def contexto_escala():
+    """Ids que necesitan las URLs, tomados de los datos ya generados."""
+    entidad = Usuario.objects.filter(rol='usuario').order_by('id').first()
+    return {
+        'entidad_id': entidad.id,
+        'entidad': entidad,
+        'entidad_federativa': entidad.entidad_federativa,
+        'anexo_id': AnexoRequerido.objects.order_by('id').values_list('id', flat=True).first(),
+    }
+
+
+def _consumir(respuesta):
+    """Recorre el cuerpo completo (las respuestas en flujo se generan al leerlas)."""
+    if respuesta.streaming:
+        for _ in respuesta.streaming_content:
+            pass
+    respuesta.close()
+
+
+def _peticion(cliente, vista, contexto):
+    respuesta = getattr(cliente, vista.metodo)(vista.url(contexto), vista.datos)
+    _consumir(respuesta)
+    return respuesta.status_code
+
+
+def medir(vista, contexto, admin, repeticiones=3):
+    """Mide una vista y regresa ``{'tiempo_ms', 'consultas', 'memoria_kb', 'estado'}``."""
+    cliente = Client()
+    cliente.force_login(contexto['entidad'] if vista.usuario == 'entidad' else admin)
+
+    # Pasada con tracemalloc: pico de memoria (y la única medición si la vista modifica datos)
+    cache.clear()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            estado = _peticion(cliente, vista, contexto)
+            tiempos = [time.perf_counter() - inicio]
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    if not vista.muta:
+        tiempos = []
+        for _ in range(repeticiones):
+            cache.clear()
+            with CaptureQueriesContext(connection) as consultas:
+                inicio = time.perf_counter()
+                estado = _peticion(cliente, vista, contexto)
+                tiempos.append(time.perf_counter() - inicio)
+
+    return {
+        'tiempo_ms': round(statistics.median(tiempos) * 1000, 1),
+        'consultas': len(consultas),
+        'memoria_kb': round(pico / 1024, 1),
+        'estado': estado,
+    }
+
+
+def medir_vistas(admin, vistas=None, repeticiones=3):
+    """Mide ``vistas`` (todas por defecto) sobre los datos actuales."""
+    contexto = contexto_escala()
+    return {vista.nombre: medir(vista, contexto, admin, repeticiones) for vista in (vistas or VISTAS)}
+
+
+# --------------------
+# Línea base
+# --------------------
+# Diferencias menores a estos márgenes se consideran ruido aunque superen el umbral
+MARGEN_TIEMPO_MS = 10
+MARGEN_MEMORIA_KB = 512
+
+
+def comparar(resultados, linea_base, umbral=0.25):
+    """Lista de regresiones de ``resultados`` respecto a ``linea_base``.
+
+    Ambos tienen la forma ``{escala: {vista: medicion}}``. Es regresión que el
+    tiempo o la memoria crezcan más de ``umbral`` (fracción) por encima de
+    los márgenes de ruido, o cualquier query adicional.
+    """
+    regresiones = []
+    for escala, vistas in resultados.items():
+        for nombre, actual in vistas.items():
+            base = linea_base.get(escala, {}).get(nombre)
+            if not base:
+                continue
+            if actual['consultas'] > base['consultas']:
+                regresiones.append(
+                    f"{escala} {nombre}: {actual['consultas']} queries (línea base {base['consultas']})"
+                )
+            for clave, margen, unidad in (('tiempo_ms', MARGEN_TIEMPO_MS, 'ms'),
+                                          ('memoria_kb', MARGEN_MEMORIA_KB, 'KB')):
+                limite = max(base[clave] * (1 + umbral), base[clave] + margen)
+                if actual[clave] > limite:
+                    regresiones.append(
+                        f"{escala} {nombre}: {actual[clave]} {unidad} (línea base {base[clave]} {unidad})"
+                    )
+    return regresiones
+
+
+def cargar_linea_base(ruta):
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)['escalas']
+
+
+def guardar_linea_base(ruta, resultados):
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump({'escalas': resultados}, archivo, indent=2, ensure_ascii=False)
@@ -0,0 +1,259 @@
+# --------------------
+# Pruebas de carga (cierre de ciclo: muchas entidades subiendo y revisores validando)
+# --------------------
+# Simula usuarios concurrentes contra un servidor en ejecución usando solo la
+# biblioteca estándar (urllib + hilos):
+#
+# - entidades: inician sesión, cargan su dashboard y suben varios PDF a la vez
+# - revisores: inician sesión, abren la revisión de una entidad, guardan
+#   estados y descargan reportes (el usuario de ``--admin`` debe ser
+#   superusuario: el reporte por entidad solo lo pueden descargar ellos)
+#
+# Preparación típica (SQLite local):
+#
+#   SEMUJERES_DB=sqlite python manage.py migrate
+#   SEMUJERES_DB=sqlite python manage.py generar_datos_sinteticos --entidades 50 --anexos 20
+#   SEMUJERES_DB=sqlite python manage.py runserver --noreload
+#   python manage.py prueba_carga --entidades 30 --revisores 3 --admin <usuario> --admin-contrasena <...>
+#
+# Para MySQL en Docker basta con apuntar SEMUJERES_DB_HOST/SEMUJERES_DB_PORT
+# al contenedor, por ejemplo:
+#
+#   docker run -d -p 3307:3306 -e MYSQL_DATABASE=semujer_db -e MYSQL_USER=semujer_user \
+#       -e MYSQL_PASSWORD=Semujer123! -e MYSQL_RANDOM_ROOT_PASSWORD=1 mysql:8
+#   SEMUJERES_DB_PORT=3307 python manage.py migrate
+import http.cookiejar
+import math
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+from .datos_sinteticos import CONTRASENA, PDF_MINIMO
+
+_RE_DOCUMENTO = re.compile(r'name="documento_(\d+)"')
+_RE_ESTADO = re.compile(r'name="estado_(\d+)"')
+# Solo las opciones del selector de entidades (la página tiene otros <select>)
+_RE_SELECTOR_ENTIDAD = re.compile(r'<select[^>]*id="entidadSelect"[^>]*>(.*?)</select>', re.S)
+_RE_OPCION = re.compile(r'<option value="(\d+)"')
+
+
+class ErrorPreparacion(Exception):
+    """La prueba no puede arrancar (p. ej. el revisor no tiene los permisos necesarios)."""
+
+
+class _SinRedirecciones(urllib.request.HTTPRedirectHandler):
+    """Cada redirección cuenta como una respuesta propia (no se sigue)."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Registro:
+    """Latencias y errores por endpoint, compartido por todos los hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = {}
+        self.errores = {}
+
+    def agregar(self, endpoint, segundos, ok):
+        with self._lock:
+            self.latencias.setdefault(endpoint, []).append(segundos)
+            if not ok:
+                self.errores[endpoint] = self.errores.get(endpoint, 0) + 1
+
+    def resumen(self, duracion):
+        """Filas ``{endpoint, peticiones, errores, por_segundo, p50_ms, p95_ms, p99_ms}``."""
+        filas = []
+        for endpoint, latencias in sorted(self.latencias.items()):
+            ordenadas = sorted(latencias)
+            filas.append({
+                'endpoint': endpoint,
+                'peticiones': len(ordenadas),
+                'errores': self.errores.get(endpoint, 0),
+                'por_segundo': round(len(ordenadas) / duracion, 2) if duracion else 0,
+                'p50_ms': round(percentil(ordenadas, 50) * 1000, 1),
+                'p95_ms': round(percentil(ordenadas, 95) * 1000, 1),
+                'p99_ms': round(percentil(ordenadas, 99) * 1000, 1),
+            })
+        return filas
+
+
+def percentil(ordenados, p):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not ordenados:
+        return 0
+    indice = max(0, min(len(ordenados) - 1, math.ceil(p * len(ordenados) / 100) - 1))
+    return ordenados[indice]
+
+
+class Cliente:
+    """Un usuario virtual con su propia sesión (cookies)."""
+
+    def __init__(self, base, registro, timeout=60):
+        self.base = base.rstrip('/')
+        self.registro = registro
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), _SinRedirecciones,
+        )
+
+    def csrf(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def pedir(self, endpoint, ruta, datos=None, archivos=None, esperado=None):
+        """Hace la petición, la registra y regresa ``(estado, cuerpo)``.
+
+        Con ``datos`` o ``archivos`` es un POST (con el token CSRF de la sesión).
+        Es error cualquier estado >= 400, una excepción de red o, si se da
+        ``esperado``, un estado distinto.
+        """
+        url = self.base + ruta
+        cuerpo, encabezados = None, {'Referer': url}
+        if datos is not None or archivos is not None:
+            campos = dict(datos or {}, csrfmiddlewaretoken=self.csrf())
+            if archivos:
+                cuerpo, tipo = _multipart(campos, archivos)
+            else:
+                cuerpo, tipo = urllib.parse.urlencode(campos).encode(), 'application/x-www-form-urlencoded'
+            encabezados['Content-Type'] = tipo
+        solicitud = urllib.request.Request(url, data=cuerpo, headers=encabezados)
+
+        inicio = time.perf_counter()
+        try:
+            with self.opener.open(solicitud, timeout=self.timeout) as respuesta:
+                estado, contenido = respuesta.status, respuesta.read()
+        except urllib.error.HTTPError as e:
+            estado, contenido = e.code, e.read()
+        except (urllib.error.URLError, OSError):
+            estado, contenido = 0, b''
+        segundos = time.perf_counter() - inicio
+
+        ok = 0 < estado < 400 and (esperado is None or estado == esperado)
+        self.registro.agregar(endpoint, segundos, ok)
+        return estado, contenido.decode('utf-8', 'replace')
+
+    def iniciar_sesion(self, usuario, contrasena):
+        self.pedir('login (GET)', '/login/')
+        estado, _ = self.pedir('login (POST)', '/login/',
+                               datos={'username': usuario, 'password': contrasena}, esperado=302)
+        return estado == 302
+
+
+def _multipart(campos, archivos):
+    frontera = uuid.uuid4().hex
+    partes = []
+    for nombre, valor in campos.items():
+        partes.append(
+            f'--{frontera}\r\nContent-Disposition: form-data; name="{nombre}"\r\n\r\n{valor}\r\n'.encode()
+        )
+    for nombre, (nombre_archivo, contenido) in archivos.items():
+        partes.append(
+            f'--{frontera}\r\nContent-Disposition: form-data; name="{nombre}"; filename="{nombre_archivo}"\r\n'
+            f'Content-Type: application/pdf\r\n\r\n'.encode() + contenido + b'\r\n'
+        )
+    partes.append(f'--{frontera}--\r\n'.encode())
+    return b''.join(partes), f'multipart/form-data; boundary={frontera}'
+
+
+def _pdf(tam_kb):
+    return PDF_MINIMO + b'\0' * max(0, tam_kb * 1024 - len(PDF_MINIMO))
+
+
+# --------------------
+# Escenarios
+# --------------------
+def escenario_entidad(cliente, usuario, hasta, archivos=2, tam_kb=200, pausa=0.5):
+    if not cliente.iniciar_sesion(usuario, CONTRASENA):
+        return
+    contenido = _pdf(tam_kb)
+    while time.monotonic() < hasta:
+        _, html = cliente.pedir('dashboard', '/dashboard/')
+        documentos = _RE_DOCUMENTO.findall(html)
+        if documentos:
+            elegidos = random.sample(documentos, min(archivos, len(documentos)))
+            cliente.pedir('dashboard (subir)', '/dashboard/', archivos={
+                f'documento_{doc_id}': (f'anexo_{doc_id}.pdf', contenido) for doc_id in elegidos
+            }, esperado=302)
+        time.sleep(random.uniform(0, 2 * pausa))
+
+
+def escenario_revisor(cliente, usuario, contrasena, hasta, pausa=0.5, reportes_cada=5):
+    if not cliente.iniciar_sesion(usuario, contrasena):
+        return
+    iteracion = 0
+    while time.monotonic() < hasta:
+        iteracion += 1
+        _, html = cliente.pedir('revision', '/revision/')
+        selector = _RE_SELECTOR_ENTIDAD.search(html)
+        entidades = _RE_OPCION.findall(selector.group(1)) if selector else []
+        if not entidades:
+            break
+        entidad_id = random.choice(entidades)
+        _, html = cliente.pedir('revision (entidad)', f'/revision/{entidad_id}/')
+        documentos = _RE_ESTADO.findall(html)
+        if documentos:
+            datos = {}
+            for doc_id in documentos:
+                datos[f'estado_{doc_id}'] = random.choice(['pendiente', 'validado', 'rechazado'])
+                datos[f'observaciones_{doc_id}'] = ''
+            cliente.pedir('revision (guardar)', f'/revision/{entidad_id}/', datos=datos, esperado=302)
+        if iteracion % reportes_cada == 0:
+            cliente.pedir('reporte entidad (pdf)', f'/reporte/entidad/{entidad_id}/pdf/', esperado=200)
+            cliente.pedir('reporte anexos (pdf)', '/anexos/reporte_pdf/', esperado=200)
+        time.sleep(random.uniform(0, 2 * pausa))
+
+
+def verificar_revisor(base, usuario, contrasena):
+    """Lanza ``ErrorPreparacion`` si ``usuario`` no puede correr el escenario de revisor.
+
+    Los reportes redirigen al login a quien no es superusuario y cada
+    redirección contaría como error durante toda la prueba. Se revisa antes
+    con una entidad inexistente: un superusuario recibe 404 sin generar nada.
+    """
+    cliente = Cliente(base, Registro())  # estas peticiones no entran en el resumen
+    if not cliente.iniciar_sesion(usuario, contrasena):
+        raise ErrorPreparacion(f"No se pudo iniciar sesión como {usuario} en {base}.")
+    estado, _ = cliente.pedir('verificar', '/reporte/entidad/0/pdf/')
+    if estado != 404:
+        raise ErrorPreparacion(
+            f"{usuario} no puede descargar los reportes por entidad (respuesta {estado}); "
+            "el escenario de revisor necesita un superusuario."
+        )
+
+
+def ejecutar(base, usuarios_entidad, admin, admin_contrasena, revisores=1, duracion=60,
+             archivos=2, tam_kb=200, pausa=0.5):
+    """Corre ambos escenarios en paralelo durante ``duracion`` segundos.
+
+    Regresa ``(registro, segundos_reales)``. Con revisores, antes verifica que
+    ``admin`` sea superusuario (ver ``verificar_revisor``).
+    """
+    if revisores:
+        verificar_revisor(base, admin, admin_contrasena)
+    registro = Registro()
+    hasta = time.monotonic() + duracion
+    hilos = [
+        threading.Thread(target=escenario_entidad,
+                         args=(Cliente(base, registro), usuario, hasta, archivos, tam_kb, pausa))
+        for usuario in usuarios_entidad
+    ] + [
+        threading.Thread(target=escenario_revisor,
+                         args=(Cliente(base, registro), admin, admin_contrasena, hasta, pausa))
+        for _ in range(revisores)
+    ]
+    inicio = time.monotonic()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return registro, time.monotonic() - inicio
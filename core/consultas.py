@@ -0,0 +1,33 @@
+# --------------------
+# Consultas columnares para análisis (NumPy)
+# --------------------
+import numpy as np
+
+from django.db import connection
+from django.db.models import CharField
+from django.db.models.functions import Cast
+
+
+def columnas(queryset, tipos):
+    """Ejecuta el query de ``values_list`` y regresa un arreglo de NumPy por columna.
+
+    Se usa el cursor directamente para no pasar cada fila por los
+    convertidores de Django. Las fechas conviene pedirlas como texto ISO (ver
+    ``texto``) porque NumPy las convierte en bloque mucho más rápido que
+    objetos ``datetime``.
+
+    IMPORTANTE: en el SQL las anotaciones van después de los campos del
+    modelo, así que en ``values_list`` deben pedirse al final.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        filas = cursor.fetchall()
+    if not filas:
+        return [np.array([], dtype=tipo) for tipo in tipos]
+    return [np.array(columna, dtype=tipo) for columna, tipo in zip(zip(*filas), tipos)]
+
+
+def texto(campo):
+    """Expresión que regresa ``campo`` como texto (para fechas)."""
+    return Cast(campo, output_field=CharField())
@@ -0,0 +1,215 @@
+# --------------------
+# Datos sintéticos para pruebas de rendimiento
+# --------------------
+# Genera N entidades × M anexos con una mezcla de estados configurable. Los
+# archivos son PDF mínimos "dispersos": se escribe un encabezado válido y el
+# resto se extiende con truncate(), así que un archivo de varios cientos de KB
+# casi no ocupa espacio real en disco (en sistemas de archivos que lo permiten).
+#
+# Todo lo generado lleva el prefijo indicado (usuarios y anexos), así que
+# ``limpiar_datos`` puede borrarlo sin tocar los datos reales.
+import os
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .almacenamiento import ruta_fragmentada
+from .models import AnexoHistorico, AnexoRequerido, Documento, Usuario
+
+ENTIDADES_FEDERATIVAS = [
+    'Aguascalientes', 'Baja California', 'Baja California Sur', 'Campeche', 'Chiapas',
+    'Chihuahua', 'Ciudad de México', 'Coahuila', 'Colima', 'Durango', 'Guanajuato',
+    'Guerrero', 'Hidalgo', 'Jalisco', 'México', 'Michoacán', 'Morelos', 'Nayarit',
+    'Nuevo León', 'Oaxaca', 'Puebla', 'Querétaro', 'Quintana Roo', 'San Luis Potosí',
+    'Sinaloa', 'Sonora', 'Tabasco', 'Tamaulipas', 'Tlaxcala', 'Veracruz', 'Yucatán',
+    'Zacatecas',
+]
+
+# Proporción de documentos en cada estado; 'sin_archivo' es pendiente y sin archivo
+MEZCLA_DEFAULT = {'validado': 0.4, 'rechazado': 0.1, 'pendiente': 0.3, 'sin_archivo': 0.2}
+
+CONTRASENA = 'semujeres-benchmark'
+
+PDF_MINIMO = (
+    b'%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n'
+    b'2 0 obj<</Type/Pages/Kids[]/Count 0>>endobj\n'
+    b'trailer<</Root 1 0 R>>\n%%EOF\n'
+)
+
+_LOTE = 1000
+
+
+def interpretar_mezcla(texto):
+    """Convierte ``'validado=0.5,rechazado=0.1,...'`` en un diccionario normalizado."""
+    mezcla = dict(MEZCLA_DEFAULT)
+    if texto:
+        mezcla = {estado: 0.0 for estado in MEZCLA_DEFAULT}
+        for parte in texto.split(','):
+            estado, _, valor = parte.partition('=')
+            estado = estado.strip()
+            if estado not in MEZCLA_DEFAULT:
+                raise ValueError(f"Estado desconocido en la mezcla: {estado!r}")
+            mezcla[estado] = float(valor)
+    total = sum(mezcla.values())
+    if total <= 0:
+        raise ValueError("La mezcla de estados debe sumar más de cero.")
+    return {estado: valor / total for estado, valor in mezcla.items()}
+
+
+def _archivo_disperso(nombre, tam_kb):
+    """Crea en el almacenamiento un PDF mínimo extendido a ``tam_kb`` y regresa su nombre."""
+    ruta = default_storage.path(nombre)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, 'wb') as archivo:
+        archivo.write(PDF_MINIMO)
+        if tam_kb * 1024 > len(PDF_MINIMO):
+            archivo.truncate(tam_kb * 1024)
+    return nombre
+
+
+def _fijar_fechas(modelo, fechas, *campos):
+    """Fija ``fecha_subida`` de filas recién creadas con bulk_create.
+
+    auto_now_add reemplaza la fecha al crear, así que se corrige después con
+    bulk_update. ``fechas`` va de la clave natural (valores de ``campos``) a
+    la fecha; las filas se buscan por esa clave porque en MySQL bulk_create
+    no regresa los ids.
+    """
+    if not fechas:
+        return
+    filas = modelo.objects.filter(**{f'{campos[0]}__in': {clave[0] for clave in fechas}})
+    cambios = [
+        modelo(id=pk, fecha_subida=fechas[tuple(clave)])
+        for pk, *clave in filas.values_list('id', *campos).iterator()
+        if tuple(clave) in fechas
+    ]
+    modelo.objects.bulk_update(cambios, ['fecha_subida'], batch_size=_LOTE)
+
+
+def generar_datos(entidades, anexos, mezcla=None, respaldos=0.0, tam_kb=64,
+                  obligatorios=0.7, dias=365, prefijo='bench', semilla=None):
+    """Crea ``entidades`` usuarios con un documento por cada uno de ``anexos`` anexos.
+
+    - ``mezcla``: proporción de estados (ver ``MEZCLA_DEFAULT``)
+    - ``respaldos``: fracción de documentos con archivo que además tienen
+      un respaldo en AnexoHistorico
+    - ``tam_kb``: tamaño aparente de cada PDF
+    - ``dias``: las fechas de carga se reparten en los últimos ``dias`` días
+
+    Regresa un diccionario con los conteos creados.
+    """
+    aleatorio = random.Random(semilla)
+    mezcla = mezcla or MEZCLA_DEFAULT
+    estados, pesos = list(mezcla), list(mezcla.values())
+    ahora = timezone.now()
+
+    # Anexos (se reutilizan si ya existen con el mismo nombre)
+    existentes = set(
+        AnexoRequerido.objects.filter(nombre__startswith=f'{prefijo} ').values_list('nombre', flat=True)
+    )
+    AnexoRequerido.objects.bulk_create([
+        AnexoRequerido(
+            nombre=f'{prefijo} Anexo {j:03d}',
+            descripcion='Anexo generado para pruebas de rendimiento',
+            obligatorio=j < anexos * obligatorios,
+        )
+        for j in range(anexos)
+        if f'{prefijo} Anexo {j:03d}' not in existentes
+    ])
+    lista_anexos = list(
+        AnexoRequerido.objects.filter(nombre__startswith=f'{prefijo} Anexo ').order_by('nombre')[:anexos]
+    )
+
+    # Entidades: la contraseña se calcula una sola vez (el hash es lento a propósito)
+    contrasena = make_password(CONTRASENA)
+    inicio = Usuario.objects.filter(username__startswith=f'{prefijo}_').count()
+    Usuario.objects.bulk_create([
+        Usuario(
+            username=f'{prefijo}_{i:05d}',
+            correo=f'{prefijo}_{i:05d}@ejemplo.test',
+            email=f'{prefijo}_{i:05d}@ejemplo.test',
+            nombre_responsable=f'Responsable {i}',
+            entidad_federativa=ENTIDADES_FEDERATIVAS[i % len(ENTIDADES_FEDERATIVAS)],
+            rol='usuario',
+            password=contrasena,
+        )
+        for i in range(inicio, inicio + entidades)
+    ], batch_size=_LOTE)
+    lista_entidades = list(
+        Usuario.objects.filter(username__startswith=f'{prefijo}_').order_by('username')[inicio:inicio + entidades]
+    )
+
+    documentos, historicos = [], []
+    creados = {'entidades': len(lista_entidades), 'anexos': len(lista_anexos),
+               'documentos': 0, 'archivos': 0, 'respaldos': 0}
+
+    def guardar():
+        # Las fechas se toman antes: bulk_create las reemplaza por la actual
+        fechas_documentos = {(d.usuario_id, d.anexo_id): d.fecha_subida for d in documentos}
+        fechas_historicos = {(h.archivo.name,): h.fecha_subida for h in historicos}
+        Documento.objects.bulk_create(documentos, batch_size=_LOTE)
+        AnexoHistorico.objects.bulk_create(historicos, batch_size=_LOTE)
+        _fijar_fechas(Documento, fechas_documentos, 'usuario_id', 'anexo_id')
+        _fijar_fechas(AnexoHistorico, fechas_historicos, 'archivo')
+        creados['documentos'] += len(documentos)
+        creados['respaldos'] += len(historicos)
+        documentos.clear()
+        historicos.clear()
+
+    for entidad in lista_entidades:
+        for anexo in lista_anexos:
+            estado = aleatorio.choices(estados, pesos)[0]
+            fecha = ahora - timedelta(days=aleatorio.randrange(max(dias, 1)), seconds=aleatorio.randrange(86400))
+            archivo = None
+            if estado != 'sin_archivo':
+                archivo = _archivo_disperso(
+                    ruta_fragmentada('documentos', entidad.id, f'{entidad.username}_{anexo.id}.pdf'), tam_kb
+                )
+                creados['archivos'] += 1
+                if aleatorio.random() < respaldos:
+                    historicos.append(AnexoHistorico(
+                        entidad=entidad,
+                        anexo_requerido=anexo,
+                        archivo=_archivo_disperso(ruta_fragmentada(
+                            'anexos_historicos', entidad.id, f'{entidad.username}_{anexo.id}_previo.pdf'
+                        ), tam_kb),
+                        fecha_subida=fecha - timedelta(days=dias),
+                    ))
+            documentos.append(Documento(
+                usuario=entidad,
+                anexo=anexo,
+                archivo=archivo,
+                estado='pendiente' if estado == 'sin_archivo' else estado,
+                fecha_subida=fecha.date(),
+            ))
+        if len(documentos) >= _LOTE:
+            guardar()
+    guardar()
+
+    # bulk_create no emite señales: invalidamos los puntajes a mano
+    from .puntajes import invalidar
+    invalidar()
+    return creados
+
+
+def limpiar_datos(prefijo='bench'):
+    """Borra las entidades y anexos generados con ``prefijo`` y sus archivos."""
+    entidades = Usuario.objects.filter(username__startswith=f'{prefijo}_')
+    rutas = list(
+        Documento.objects.filter(usuario__in=entidades).exclude(archivo='')
+        .exclude(archivo__isnull=True).values_list('archivo', flat=True)
+    )
+    rutas += list(AnexoHistorico.objects.filter(entidad__in=entidades).values_list('archivo', flat=True))
+    for ruta in rutas:
+        if default_storage.exists(ruta):
+            default_storage.delete(ruta)
+
+    borrados, _ = entidades.delete()
+    borrados += AnexoRequerido.objects.filter(nombre__startswith=f'{prefijo} Anexo ').delete()[0]
+
+    from .puntajes import invalidar
+    invalidar()
+    return {'registros': borrados, 'archivos': len(rutas)}
@@ -0,0 +1,218 @@
+# --------------------
+# Utilidades para descargas (archivos temporales, respuestas, rangos y ZIP en flujo)
+# --------------------
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+# Tamaño de bloque al copiar archivos dentro del ZIP
+TAM_BLOQUE = 64 * 1024
+
+
+def archivo_temporal():
+    """Archivo temporal que vive en memoria hasta ``REPORTES_SPOOL_MAX_BYTES`` y luego pasa a disco."""
+    return tempfile.SpooledTemporaryFile(
+        max_size=getattr(settings, 'REPORTES_SPOOL_MAX_BYTES', 5 * 1024 * 1024)
+    )
+
+
+def abrir_temporal(ruta):
+    """Abre un archivo temporal generado en otro proceso y lo borra del disco.
+
+    El archivo queda accesible mientras siga abierto; al cerrarlo (por ejemplo
+    al terminar la respuesta) el sistema libera el espacio.
+    """
+    archivo = open(ruta, 'rb')
+    try:
+        os.remove(ruta)
+    except OSError:
+        # Windows no permite borrar un archivo abierto: lo copiamos antes
+        copia = archivo_temporal()
+        shutil.copyfileobj(archivo, copia)
+        archivo.close()
+        os.remove(ruta)
+        copia.seek(0)
+        archivo = copia
+    return archivo
+
+
+def respuesta_archivo(archivo, filename, content_type='application/pdf'):
+    """``FileResponse`` de descarga con ``Content-Length`` para un archivo ya escrito.
+
+    La respuesta envía el archivo por bloques y lo cierra al terminar.
+    """
+    archivo.seek(0, os.SEEK_END)
+    tam = archivo.tell()
+    archivo.seek(0)
+    response = FileResponse(archivo, as_attachment=True, filename=filename, content_type=content_type)
+    response['Content-Length'] = tam
+    return response
+
+
+# --------------------
+# Archivos subidos (MEDIA_ROOT) con Range, ETag y envío delegado
+# --------------------
+_RE_RANGO = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _rango(encabezado, tam):
+    """Interpreta un encabezado ``Range`` de un solo intervalo.
+
+    Regresa ``(inicio, fin)`` (inclusivos), ``None`` si hay que enviar el
+    archivo completo (sin Range, varios intervalos o un valor mal formado) o
+    ``False`` si el intervalo no se puede satisfacer (416).
+    """
+    coincide = _RE_RANGO.match(encabezado.replace(' ', '')) if encabezado else None
+    if not coincide or coincide[1] == coincide[2] == '':
+        return None
+    if coincide[1] == '':
+        # Sufijo: los últimos N bytes
+        sufijo = int(coincide[2])
+        if sufijo == 0 or tam == 0:
+            return False
+        return max(0, tam - sufijo), tam - 1
+    inicio = int(coincide[1])
+    if inicio >= tam:
+        return False
+    fin = min(int(coincide[2]), tam - 1) if coincide[2] else tam - 1
+    return (inicio, fin) if fin >= inicio else None
+
+
+def _leer_rango(archivo, inicio, longitud):
+    try:
+        archivo.seek(inicio)
+        while longitud > 0:
+            bloque = archivo.read(min(TAM_BLOQUE, longitud))
+            if not bloque:
+                break
+            longitud -= len(bloque)
+            yield bloque
+    finally:
+        archivo.close()
+
+
+def _encabezados(response, nombre, etag=None, ultima_modificacion=None):
+    response['Content-Disposition'] = content_disposition_header(False, os.path.basename(nombre))
+    response['Cache-Control'] = 'private, max-age=0'
+    if etag:
+        response['ETag'] = etag
+    if ultima_modificacion:
+        response['Last-Modified'] = http_date(ultima_modificacion)
+    return response
+
+
+def enviar_archivo(request, nombre):
+    """Respuesta que entrega el archivo ``nombre`` de MEDIA_ROOT (ya autorizado).
+
+    Según ``MEDIA_ENVIO``:
+
+    - ``'x-accel'``: nginx lo envía desde la location interna ``MEDIA_ACCEL_PREFIJO``
+    - ``'x-sendfile'``: Apache/lighttpd lo envía desde la ruta absoluta
+    - ``'django'``: ``FileResponse`` (sendfile del servidor WSGI si lo tiene)
+      con ``ETag``/``If-None-Match`` y rangos de bytes, para que un visor de
+      PDF pueda mostrar la primera página sin descargar el archivo completo
+
+    En los dos primeros casos el servidor frontal se encarga de Range y ETag.
+    Con ``'django'`` solo la respuesta completa puede aprovechar sendfile: los
+    rangos (206) se leen por bloques en Python y ocupan un worker mientras
+    dura la transferencia. En producción conviene ``'x-accel'`` o
+    ``'x-sendfile'``.
+    """
+    try:
+        ruta = default_storage.path(nombre)
+        estado = os.stat(ruta)
+    except (OSError, ValueError):
+        raise Http404("El archivo no existe.")
+    content_type = mimetypes.guess_type(nombre)[0] or 'application/octet-stream'
+
+    envio = getattr(settings, 'MEDIA_ENVIO', 'django')
+    if envio == 'x-accel':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = getattr(settings, 'MEDIA_ACCEL_PREFIJO', '/media-protegida/') + quote(nombre)
+        return _encabezados(response, nombre)
+    if envio == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = ruta
+        return _encabezados(response, nombre)
+
+    etag = quote_etag(f'{estado.st_size:x}-{estado.st_mtime_ns:x}')
+    no_modificado = get_conditional_response(request, etag=etag, last_modified=int(estado.st_mtime))
+    if no_modificado is not None:
+        return _encabezados(no_modificado, nombre, etag, estado.st_mtime)
+
+    # If-Range: el rango solo vale si el cliente tiene la versión actual
+    si_rango = request.headers.get('If-Range')
+    rango = None
+    if not si_rango or si_rango in (etag, http_date(estado.st_mtime)):
+        rango = _rango(request.headers.get('Range'), estado.st_size)
+
+    if rango is False:
+        response = HttpResponse(status=416, content_type=content_type)
+        response['Content-Range'] = f'bytes */{estado.st_size}'
+    elif rango:
+        inicio, fin = rango
+        response = StreamingHttpResponse(
+            _leer_rango(open(ruta, 'rb'), inicio, fin - inicio + 1), status=206, content_type=content_type,
+        )
+        response['Content-Length'] = fin - inicio + 1
+        response['Content-Range'] = f'bytes {inicio}-{fin}/{estado.st_size}'
+    else:
+        response = FileResponse(open(ruta, 'rb'), content_type=content_type)
+    response['Accept-Ranges'] = 'bytes'
+    return _encabezados(response, nombre, etag, estado.st_mtime)
+
+
+class _SalidaZip:
+    """Destino de escritura sin ``seek`` que acumula lo que produce ``ZipFile``.
+
+    ``ZipFile`` detecta que el destino no es buscable y escribe los
+    descriptores de datos al final de cada entrada, lo que permite enviar
+    el ZIP al cliente mientras se construye.
+    """
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def zip_en_flujo(entradas, compresion=zipfile.ZIP_DEFLATED):
+    """Genera los bytes de un ZIP a partir de ``entradas``.
+
+    ``entradas`` es un iterable de tuplas ``(ruta_en_zip, contenido)`` donde el
+    contenido puede ser ``bytes`` o un objeto tipo archivo abierto en modo
+    binario. Los archivos se copian por bloques, así que la memoria usada no
+    depende del tamaño de cada entrada.
+    """
+    salida = _SalidaZip()
+    with zipfile.ZipFile(salida, 'w', compresion) as zip_file:
+        for ruta_en_zip, contenido in entradas:
+            if isinstance(contenido, bytes):
+                zip_file.writestr(ruta_en_zip, contenido)
+            else:
+                with zip_file.open(ruta_en_zip, 'w', force_zip64=True) as destino:
+                    for bloque in iter(lambda: contenido.read(TAM_BLOQUE), b''):
+                        destino.write(bloque)
+                        yield salida.vaciar()
+            yield salida.vaciar()
+    yield salida.vaciar()
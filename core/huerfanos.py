@@ -0,0 +1,115 @@
+# --------------------
+# Archivos huérfanos en MEDIA_ROOT
+# --------------------
+# Al borrar usuarios o anexos, la cascada elimina los registros de
+# Documento/AnexoHistorico/AnexoUsuario pero sus archivos se quedan en disco.
+#
+# Para encontrarlos sin cargar todo en memoria:
+#
+# 1. Las rutas referenciadas se leen de la base en un query por modelo
+#    (con ``iterator()``) y se guardan como hash de 64 bits en un arreglo de
+#    NumPy ordenado: 8 bytes por archivo en lugar de un str de Python.
+# 2. El árbol se recorre con ``os.scandir`` y se procesa por lotes; cada lote
+#    se cruza con ``np.isin`` contra el arreglo de referencias.
+#
+# Un choque de hash solo puede hacer que un huérfano parezca referenciado (se
+# conserva), nunca lo contrario.
+#
+# Las referencias del paso 1 son de cuando empezó el recorrido. Antes de
+# reportar un lote, sus candidatos se vuelven a buscar en la base (por el
+# índice de ``archivo``), así que un archivo registrado a mitad del recorrido
+# no se borra. Los comandos que mueven archivos (``fragmentar_media``) no
+# corren a la vez: ver ``bloqueo_mantenimiento`` en core/almacenamiento.py.
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from django.core.files.storage import default_storage
+
+from .models import AnexoHistorico, AnexoUsuario, Documento
+
+# Carpetas de MEDIA_ROOT que llenan los FileField (ver core/almacenamiento.py)
+CARPETAS = ('documentos', 'anexos_historicos', 'anexos')
+
+_MODELOS = (Documento, AnexoHistorico, AnexoUsuario)
+
+
+def hash_ruta(ruta):
+    return int.from_bytes(hashlib.blake2b(ruta.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def referenciados(lote=10000):
+    """Hashes (uint64, ordenados y únicos) de todas las rutas guardadas en la base."""
+    partes, actual = [], []
+    for modelo in _MODELOS:
+        rutas = modelo.objects.exclude(archivo='').exclude(archivo__isnull=True).values_list('archivo', flat=True)
+        for ruta in rutas.iterator(chunk_size=lote):
+            actual.append(hash_ruta(ruta))
+            if len(actual) >= lote:
+                partes.append(np.array(actual, dtype=np.uint64))
+                actual = []
+    partes.append(np.array(actual, dtype=np.uint64))
+    return np.unique(np.concatenate(partes))
+
+
+def sin_referencia(rutas, lote=500):
+    """Las ``rutas`` que ninguna fila referencia en este momento."""
+    pendientes = set(rutas)
+    for modelo in _MODELOS:
+        restantes = list(pendientes)
+        for i in range(0, len(restantes), lote):
+            pendientes -= set(
+                modelo.objects.filter(archivo__in=restantes[i:i + lote]).values_list('archivo', flat=True)
+            )
+    return pendientes
+
+
+def recorrer(carpeta):
+    """Genera ``(ruta relativa a MEDIA_ROOT, bytes, mtime)`` de cada archivo bajo ``carpeta``."""
+    raiz = default_storage.path('')
+    pendientes = [os.path.join(raiz, carpeta)]
+    while pendientes:
+        try:
+            entradas = os.scandir(pendientes.pop())
+        except FileNotFoundError:
+            continue
+        with entradas:
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    pendientes.append(entrada.path)
+                elif entrada.is_file(follow_symlinks=False):
+                    estado = entrada.stat(follow_symlinks=False)
+                    relativa = os.path.relpath(entrada.path, raiz).replace(os.sep, '/')
+                    yield relativa, estado.st_size, estado.st_mtime
+
+
+def buscar_huerfanos(carpetas=CARPETAS, lote=10000, antiguedad_min=60):
+    """Genera listas de ``(ruta, bytes)`` de archivos sin registro, por lotes.
+
+    Se ignoran los archivos modificados en los últimos ``antiguedad_min``
+    minutos: una carga en curso escribe el archivo antes de que su registro
+    se confirme en la base.
+    """
+    referencias = referenciados(lote)
+    limite = time.time() - antiguedad_min * 60
+
+    def cruzar(candidatos):
+        hashes = np.fromiter((hash_ruta(r) for r, _ in candidatos), dtype=np.uint64, count=len(candidatos))
+        huerfano = ~np.isin(hashes, referencias, assume_unique=False)
+        posibles = [c for c, h in zip(candidatos, huerfano.tolist()) if h]
+        confirmados = sin_referencia(r for r, _ in posibles)
+        return [c for c in posibles if c[0] in confirmados]
+
+    candidatos = []
+    for carpeta in carpetas:
+        for ruta, tam, modificado in recorrer(carpeta):
+            if modificado > limite:
+                continue
+            candidatos.append((ruta, tam))
+            if len(candidatos) >= lote:
+                yield cruzar(candidatos)
+                candidatos = []
+    if candidatos:
+        yield cruzar(candidatos)
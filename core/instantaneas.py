@@ -0,0 +1,156 @@
+# --------------------
+# Instantáneas columnares para análisis fuera de línea
+# --------------------
+# Una instantánea guarda el estado de Usuario, Documento y AnexoHistorico en un
+# solo archivo .npz SIN compresión: un arreglo de NumPy por columna, con las
+# columnas de texto repetitivas (estado, anexo, entidad federativa, rol)
+# codificadas por diccionario como enteros pequeños más su tabla de valores.
+#
+# Al no estar comprimido, cada arreglo ocupa un bloque contiguo dentro del ZIP
+# y ``cargar_instantanea`` lo mapea en memoria (np.memmap) sin leerlo completo.
+#
+# Claves dentro del archivo: ``<tabla>__<columna>`` y, para las columnas
+# codificadas, ``<tabla>__<columna>__valores`` con el diccionario.
+import struct
+import zipfile
+
+import numpy as np
+
+from django.utils import timezone
+
+from .consultas import columnas, texto
+from .models import AnexoHistorico, AnexoRequerido, Documento, Usuario
+
+VERSION = 1
+
+# Encabezado local de una entrada ZIP: 30 bytes fijos + nombre + campo extra
+_ENCABEZADO_LOCAL = struct.Struct('<4s5HL2L2H')
+
+
+def _codificar(valores):
+    """Codificación por diccionario: regresa ``(codigos, valores_unicos)``."""
+    unicos, codigos = np.unique(valores.astype(str), return_inverse=True)
+    tipo = np.int8 if len(unicos) <= 127 else np.int16 if len(unicos) <= 32767 else np.int32
+    return codigos.astype(tipo), unicos
+
+
+def _agregar(arreglos, tabla, columna, valores, codificar=False):
+    clave = f'{tabla}__{columna}'
+    if codificar:
+        arreglos[clave], arreglos[f'{clave}__valores'] = _codificar(valores)
+    else:
+        arreglos[clave] = valores
+
+
+def _arreglos_instantanea():
+    """Lee las tablas con un query columnar cada una y arma el diccionario de arreglos."""
+    arreglos = {
+        'meta__version': np.array([VERSION], dtype=np.int16),
+        'meta__generada': np.array([timezone.now().replace(tzinfo=None)], dtype='datetime64[s]'),
+    }
+
+    ids, username, entidad_federativa, rol = columnas(
+        Usuario.objects.order_by('id').values_list('id', 'username', 'entidad_federativa', 'rol'),
+        (np.int64, str, object, object),
+    )
+    _agregar(arreglos, 'usuarios', 'id', ids)
+    _agregar(arreglos, 'usuarios', 'username', username)
+    _agregar(arreglos, 'usuarios', 'entidad_federativa', entidad_federativa, codificar=True)
+    _agregar(arreglos, 'usuarios', 'rol', rol, codificar=True)
+
+    ids, nombre, obligatorio = columnas(
+        AnexoRequerido.objects.order_by('id').values_list('id', 'nombre', 'obligatorio'),
+        (np.int64, str, bool),
+    )
+    _agregar(arreglos, 'anexos', 'id', ids)
+    _agregar(arreglos, 'anexos', 'nombre', nombre)
+    _agregar(arreglos, 'anexos', 'obligatorio', obligatorio)
+
+    # Las anotaciones (fechas como texto) van al final de values_list
+    ids, usuario, anexo, estado, archivo, fecha = columnas(
+        Documento.objects.order_by('id')
+        .annotate(dia=texto('fecha_subida'))
+        .values_list('id', 'usuario_id', 'anexo_id', 'estado', 'archivo', 'dia'),
+        (np.int64, np.int64, np.int64, object, object, 'datetime64[D]'),
+    )
+    _agregar(arreglos, 'documentos', 'id', ids)
+    _agregar(arreglos, 'documentos', 'usuario_id', usuario)
+    _agregar(arreglos, 'documentos', 'anexo_id', anexo)
+    _agregar(arreglos, 'documentos', 'estado', estado, codificar=True)
+    _agregar(arreglos, 'documentos', 'con_archivo', (archivo != None) & (archivo != ''))  # noqa: E711
+    _agregar(arreglos, 'documentos', 'fecha_subida', fecha)
+
+    ids, entidad, anexo, instante = columnas(
+        AnexoHistorico.objects.order_by('id')
+        .annotate(instante=texto('fecha_subida'))
+        .values_list('id', 'entidad_id', 'anexo_requerido_id', 'instante'),
+        (np.int64, np.int64, np.int64, 'datetime64[s]'),
+    )
+    _agregar(arreglos, 'historico', 'id', ids)
+    _agregar(arreglos, 'historico', 'entidad_id', entidad)
+    _agregar(arreglos, 'historico', 'anexo_id', anexo)
+    _agregar(arreglos, 'historico', 'fecha_subida', instante)
+
+    # Los ids caben en int32 en cualquier instalación razonable: la mitad de espacio
+    for clave, arreglo in arreglos.items():
+        if arreglo.dtype == np.int64 and (not len(arreglo) or arreglo.max() < 2 ** 31):
+            arreglos[clave] = arreglo.astype(np.int32)
+    return arreglos
+
+
+def escribir_instantanea(salida):
+    """Escribe la instantánea en ``salida`` (ruta o archivo binario con ``seek``)."""
+    np.savez(salida, **_arreglos_instantanea())
+
+
+def nombre_instantanea():
+    return f"instantanea_{timezone.localtime().strftime('%Y%m%d_%H%M%S')}.npz"
+
+
+# --------------------
+# Lectura
+# --------------------
+def _inicio_datos(archivo, info):
+    """Posición en el archivo donde empiezan los datos de la entrada ``info``."""
+    archivo.seek(info.header_offset)
+    campos = _ENCABEZADO_LOCAL.unpack(archivo.read(_ENCABEZADO_LOCAL.size))
+    largo_nombre, largo_extra = campos[-2], campos[-1]
+    return info.header_offset + _ENCABEZADO_LOCAL.size + largo_nombre + largo_extra
+
+
+def cargar_instantanea(ruta, mmap=True):
+    """Carga una instantánea como ``{tabla: {columna: arreglo}}``.
+
+    Con ``mmap=True`` cada columna es un ``np.memmap`` de solo lectura sobre
+    el archivo: solo se lee del disco lo que se usa. Si el archivo viene
+    comprimido (p. ej. lo regeneró otra herramienta) se lee de forma normal.
+    """
+    tablas = {}
+    with zipfile.ZipFile(ruta) as zip_file, open(ruta, 'rb') as archivo:
+        for info in zip_file.infolist():
+            clave = info.filename[:-len('.npy')]
+            tabla, columna = clave.split('__', 1)
+            if not mmap or info.compress_type != zipfile.ZIP_STORED:
+                with zip_file.open(info) as entrada:
+                    arreglo = np.lib.format.read_array(entrada)
+            else:
+                archivo.seek(_inicio_datos(archivo, info))
+                version = np.lib.format.read_magic(archivo)
+                if version == (1, 0):
+                    forma, fortran, dtype = np.lib.format.read_array_header_1_0(archivo)
+                else:
+                    forma, fortran, dtype = np.lib.format.read_array_header_2_0(archivo)
+                if dtype.hasobject or not np.prod(forma):
+                    arreglo = np.zeros(forma, dtype=dtype)
+                else:
+                    arreglo = np.memmap(
+                        ruta, dtype=dtype, mode='r', shape=forma,
+                        order='F' if fortran else 'C', offset=archivo.tell(),
+                    )
+            tablas.setdefault(tabla, {})[columna] = arreglo
+    return tablas
+
+
+def decodificar(tabla, columna):
+    """Regresa los valores originales de una columna codificada por diccionario."""
+    return tabla[f'{columna}__valores'][tabla[columna]]
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from core import benchmark
+from core.datos_sinteticos import generar_datos, interpretar_mezcla
+from core.models import Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide tiempo, queries y memoria de las vistas principales con datos sintéticos "
+        "a varias escalas y compara contra una línea base JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escalas', default='50x20,500x20',
+                            help="Lista de ENTIDADESxANEXOS separada por comas.")
+        parser.add_argument('--repeticiones', type=int, default=3)
+        parser.add_argument('--mezcla', help="Proporción de estados (ver generar_datos_sinteticos).")
+        parser.add_argument('--respaldos', type=float, default=0.3)
+        parser.add_argument('--vistas', help="Solo estas vistas (nombres separados por comas).")
+        parser.add_argument('--linea-base', help="Archivo JSON de línea base (por defecto BENCHMARK_LINEA_BASE).")
+        parser.add_argument('--guardar', action='store_true', help="Guarda los resultados como nueva línea base.")
+        parser.add_argument('--umbral', type=float, default=0.25,
+                            help="Crecimiento permitido en tiempo y memoria (0.25 = 25%%).")
+
+    def handle(self, *args, **options):
+        try:
+            escalas = [tuple(int(n) for n in e.lower().split('x')) for e in options['escalas'].split(',')]
+            mezcla = interpretar_mezcla(options['mezcla'])
+        except ValueError as e:
+            raise CommandError(f"Parámetros inválidos: {e}")
+
+        vistas = benchmark.VISTAS
+        if options['vistas']:
+            nombres = set(options['vistas'].split(','))
+            vistas = [v for v in benchmark.VISTAS if v.nombre in nombres]
+            if not vistas:
+                raise CommandError("Ninguna vista coincide con --vistas.")
+
+        ruta_base = options['linea_base'] or getattr(
+            settings, 'BENCHMARK_LINEA_BASE', os.path.join(settings.BASE_DIR, 'benchmarks', 'linea_base.json')
+        )
+
+        # Base de datos y MEDIA_ROOT desechables; los reportes se generan en este
+        # proceso (los workers del pool no ven la base de datos de prueba)
+        media = tempfile.mkdtemp(prefix='benchmark_media_')
+        setup_test_environment()
+        nombre_original = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(
+                MEDIA_ROOT=media,
+                REPORTES_FUERA_DE_PROCESO=False,
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+            ):
+                resultados = {}
+                for entidades, anexos in escalas:
+                    escala = f'{entidades}x{anexos}'
+                    self.stdout.write(f"Escala {escala}: generando datos...")
+                    call_command('flush', interactive=False, verbosity=0)
+                    admin = Usuario.objects.create_superuser(
+                        username='benchmark_admin', correo='admin@ejemplo.test',
+                        password='benchmark', rol='admin',
+                    )
+                    generar_datos(entidades, anexos, mezcla=mezcla, respaldos=options['respaldos'], semilla=0)
+                    resultados[escala] = benchmark.medir_vistas(admin, vistas, options['repeticiones'])
+                    self._imprimir(escala, resultados[escala])
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+            teardown_test_environment()
+            shutil.rmtree(media, ignore_errors=True)
+
+        if options['guardar']:
+            os.makedirs(os.path.dirname(ruta_base), exist_ok=True)
+            benchmark.guardar_linea_base(ruta_base, resultados)
+            self.stdout.write(self.style.SUCCESS(f"Línea base guardada en {ruta_base}"))
+            return
+
+        if not os.path.exists(ruta_base):
+            self.stdout.write(f"No hay línea base en {ruta_base}; usa --guardar para crearla.")
+            return
+
+        regresiones = benchmark.comparar(resultados, benchmark.cargar_linea_base(ruta_base), options['umbral'])
+        if regresiones:
+            for regresion in regresiones:
+                self.stderr.write(f"  REGRESIÓN {regresion}")
+            raise CommandError(f"{len(regresiones)} regresiones respecto a {ruta_base}")
+        self.stdout.write(self.style.SUCCESS("Sin regresiones respecto a la línea base."))
+
+    def _imprimir(self, escala, mediciones):
+        self.stdout.write(f"{'Vista':<40}{'Estado':>7}{'ms':>10}{'Queries':>9}{'Memoria KB':>12}")
+        for nombre, m in mediciones.items():
+            self.stdout.write(
+                f"{nombre:<40}{m['estado']:>7}{m['tiempo_ms']:>10}{m['consultas']:>9}{m['memoria_kb']:>12}"
+            )
+        self.stdout.write('')
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import tareas
+from core.models import TareaFondo
+from core.respaldos import politica_retencion
+
+
+class Command(BaseCommand):
+    help = (
+        "Aplica RESPALDOS_RETENCION al histórico de anexos: por cada entidad y anexo conserva "
+        "las últimas versiones (y una por año) y borra el resto. Pensado para cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ultimas', type=int, help="Versiones recientes a conservar (sobrescribe el ajuste).")
+        parser.add_argument('--sin-anuales', action='store_true', help="No conservar una versión por año.")
+        parser.add_argument(
+            '--completa', action='store_true',
+            help="Revisa todos los grupos, no solo los que recibieron respaldos desde la última corrida.",
+        )
+
+    def handle(self, *args, **options):
+        parametros = {}
+        if options['ultimas'] is not None:
+            parametros['ultimas'] = options['ultimas']
+        if options['sin_anuales']:
+            parametros['una_por_anio'] = False
+        if options['completa']:
+            parametros['completa'] = True
+        ultimas, _ = politica_retencion(parametros)
+        if not ultimas or ultimas < 1:
+            raise CommandError("Indica --ultimas o configura RESPALDOS_RETENCION['ultimas'].")
+
+        tarea = TareaFondo.objects.create(tipo='compactar_respaldos', parametros=parametros)
+        tareas.ejecutar(tarea.id)
+        tareas.esperar()
+
+        tarea.refresh_from_db()
+        if tarea.estado == 'fallida':
+            raise CommandError(tarea.mensaje)
+        self.stdout.write(self.style.SUCCESS(tarea.mensaje))
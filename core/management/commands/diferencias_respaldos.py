@@ -0,0 +1,45 @@
+import json
+from collections import Counter
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import AnexoRequerido, Usuario
+from core.respaldos import ESTADOS_DIFERENCIA, diferencias
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el histórico de anexos al cierre de dos fechas (AAAA-MM-DD) por entidad y anexo: "
+        "agregados, eliminados, cambiados y sin cambios, según el hash del contenido."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fecha_a')
+        parser.add_argument('fecha_b')
+        parser.add_argument('--todos', action='store_true', help="Incluye también los sin cambios.")
+        parser.add_argument('--json', action='store_true', help="Salida en JSON (una lista de objetos).")
+
+    def handle(self, *args, **options):
+        try:
+            fecha_a, fecha_b = date.fromisoformat(options['fecha_a']), date.fromisoformat(options['fecha_b'])
+        except ValueError:
+            raise CommandError("Las fechas deben tener el formato AAAA-MM-DD.")
+
+        filas = diferencias(fecha_a, fecha_b)
+        resumen = Counter(f['estado'] for f in filas)
+        if not options['todos']:
+            filas = [f for f in filas if f['estado'] != 'sin_cambios']
+
+        entidades = dict(Usuario.objects.filter(id__in={f['entidad_id'] for f in filas}).values_list('id', 'username'))
+        anexos = dict(AnexoRequerido.objects.values_list('id', 'nombre'))
+        for f in filas:
+            f['entidad'] = entidades.get(f['entidad_id'], '')
+            f['anexo'] = anexos.get(f['anexo_id'], '')
+
+        if options['json']:
+            self.stdout.write(json.dumps(filas, ensure_ascii=False, indent=2))
+            return
+        for f in filas:
+            self.stdout.write(f"{f['estado']:<12} {f['entidad']} / {f['anexo']}")
+        self.stdout.write(", ".join(f"{etiqueta}: {resumen[estado]}" for estado, etiqueta in ESTADOS_DIFERENCIA))
@@ -0,0 +1,28 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.instantaneas import escribir_instantanea, nombre_instantanea
+
+
+class Command(BaseCommand):
+    help = "Exporta una instantánea columnar (.npz) de usuarios, documentos e histórico para análisis."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--salida',
+            help="Archivo o carpeta destino (por defecto INSTANTANEAS_DIR).",
+        )
+
+    def handle(self, *args, **options):
+        destino = str(options['salida'] or getattr(
+            settings, 'INSTANTANEAS_DIR', os.path.join(settings.BASE_DIR, 'instantaneas')
+        ))
+        if not destino.endswith('.npz'):
+            os.makedirs(destino, exist_ok=True)
+            destino = os.path.join(destino, nombre_instantanea())
+
+        escribir_instantanea(destino)
+        tam = os.path.getsize(destino) / 1024
+        self.stdout.write(self.style.SUCCESS(f"Instantánea guardada en {destino} ({tam:.1f} KB)"))
@@ -0,0 +1,95 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.almacenamiento import (
+    MantenimientoEnCurso,
+    bloqueo_mantenimiento,
+    es_fragmentada,
+    ruta_fragmentada,
+    token_de,
+)
+from core.models import AnexoHistorico, AnexoUsuario, Documento
+
+# (modelo, carpeta, campo de la entidad dueña)
+MODELOS = {
+    'documentos': (Documento, 'documentos', 'usuario_id'),
+    'historicos': (AnexoHistorico, 'anexos_historicos', 'entidad_id'),
+    'anexos': (AnexoUsuario, 'anexos', 'usuario_id'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve los archivos subidos al esquema <carpeta>/<entidad>/<hh>/<token>_<nombre> "
+        "(ver core/almacenamiento.py) y actualiza las rutas en la base de datos por lotes. "
+        "Se puede interrumpir y volver a ejecutar: continúa donde se quedó."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help="Registros por transacción.")
+        parser.add_argument('--modelos', default=','.join(MODELOS),
+                            help=f"Cuáles migrar, separados por comas ({', '.join(MODELOS)}).")
+        parser.add_argument('--simular', action='store_true', help="Solo cuenta lo que se movería.")
+
+    def handle(self, *args, **options):
+        self.verbosidad = options['verbosity']
+        nombres = [n.strip() for n in options['modelos'].split(',') if n.strip()]
+        desconocidos = set(nombres) - set(MODELOS)
+        if desconocidos:
+            raise CommandError(f"Modelos desconocidos: {', '.join(sorted(desconocidos))}")
+
+        # limpiar_huerfanos no debe ver un archivo ya movido antes de que su ruta se guarde
+        try:
+            with bloqueo_mantenimiento():
+                for nombre in nombres:
+                    modelo, carpeta, campo_entidad = MODELOS[nombre]
+                    totales = self._migrar(
+                        modelo, carpeta, campo_entidad, max(1, options['lote']), options['simular'],
+                    )
+                    self.stdout.write(self.style.SUCCESS(
+                        f"{nombre}: {totales['movidos']} movidos, {totales['actualizados']} rutas actualizadas, "
+                        f"{totales['faltantes']} sin archivo en disco"
+                    ))
+        except MantenimientoEnCurso as e:
+            raise CommandError(str(e))
+
+    def _migrar(self, modelo, carpeta, campo_entidad, lote, simular):
+        totales = {'movidos': 0, 'actualizados': 0, 'faltantes': 0}
+        pendientes = modelo.objects.exclude(archivo='').exclude(archivo__isnull=True).order_by('id')
+        ultimo = 0
+        while True:
+            filas = list(pendientes.filter(id__gt=ultimo).values_list('id', campo_entidad, 'archivo')[:lote])
+            if not filas:
+                return totales
+            ultimo = filas[-1][0]
+
+            cambios = []
+            for pk, entidad_id, anterior in filas:
+                if es_fragmentada(carpeta, anterior):
+                    continue
+                # El destino depende solo de la ruta anterior: si el proceso se
+                # interrumpe entre mover y guardar, al reanudar se encuentra el
+                # archivo ya movido y solo falta actualizar la base de datos
+                nueva = ruta_fragmentada(carpeta, entidad_id, anterior, token=token_de(anterior))
+                origen, destino = default_storage.path(anterior), default_storage.path(nueva)
+                if simular:
+                    totales['movidos'] += os.path.exists(origen)
+                    continue
+                if os.path.exists(origen):
+                    os.makedirs(os.path.dirname(destino), exist_ok=True)
+                    os.replace(origen, destino)
+                    totales['movidos'] += 1
+                elif not os.path.exists(destino):
+                    totales['faltantes'] += 1
+                    continue
+                cambios.append(modelo(id=pk, archivo=nueva))
+
+            if cambios:
+                with transaction.atomic():
+                    modelo.objects.bulk_update(cambios, ['archivo'])
+                totales['actualizados'] += len(cambios)
+            if self.verbosidad > 1:
+                self.stdout.write(f"  {modelo.__name__}: hasta id {ultimo} ({totales['actualizados']} actualizados)")
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.datos_sinteticos import generar_datos, interpretar_mezcla, limpiar_datos
+
+
+class Command(BaseCommand):
+    help = "Genera entidades, documentos y respaldos sintéticos para pruebas de rendimiento."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entidades', type=int, default=50)
+        parser.add_argument('--anexos', type=int, default=20)
+        parser.add_argument(
+            '--mezcla',
+            help="Proporción de estados, p. ej. validado=0.5,rechazado=0.1,pendiente=0.2,sin_archivo=0.2",
+        )
+        parser.add_argument('--respaldos', type=float, default=0.3,
+                            help="Fracción de documentos con archivo que también tienen respaldo.")
+        parser.add_argument('--tam-kb', type=int, default=64, help="Tamaño aparente de cada PDF.")
+        parser.add_argument('--prefijo', default='bench')
+        parser.add_argument('--semilla', type=int)
+        parser.add_argument('--limpiar', action='store_true',
+                            help="Borra los datos generados con el prefijo en lugar de crearlos.")
+
+    def handle(self, *args, **options):
+        if options['limpiar']:
+            borrados = limpiar_datos(options['prefijo'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Se borraron {borrados['registros']} registros y {borrados['archivos']} archivos."
+            ))
+            return
+
+        try:
+            mezcla = interpretar_mezcla(options['mezcla'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        with transaction.atomic():
+            creados = generar_datos(
+                options['entidades'], options['anexos'], mezcla=mezcla,
+                respaldos=options['respaldos'], tam_kb=options['tam_kb'],
+                prefijo=options['prefijo'], semilla=options['semilla'],
+            )
+        self.stdout.write(self.style.SUCCESS(
+            "Creados: {entidades} entidades, {anexos} anexos, {documentos} documentos "
+            "({archivos} con archivo), {respaldos} respaldos.".format(**creados)
+        ))
@@ -0,0 +1,68 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from core.almacenamiento import MantenimientoEnCurso, bloqueo_mantenimiento
+from core.huerfanos import CARPETAS, buscar_huerfanos
+
+
+def _legible(tam):
+    for unidad in ('B', 'KB', 'MB', 'GB'):
+        if tam < 1024 or unidad == 'GB':
+            return f"{tam:.1f} {unidad}" if unidad != 'B' else f"{tam} B"
+        tam /= 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Busca archivos en MEDIA_ROOT que ya no están registrados en la base de datos "
+        "(p. ej. tras borrar usuarios o anexos). Por defecto solo reporta; con --borrar los elimina."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--borrar', action='store_true', help="Elimina los huérfanos (sin esto es simulación).")
+        parser.add_argument('--carpetas', default=','.join(CARPETAS),
+                            help="Carpetas de MEDIA_ROOT a revisar, separadas por comas.")
+        parser.add_argument('--lote', type=int, default=10000, help="Archivos por lote.")
+        parser.add_argument('--antiguedad-min', type=int, default=60,
+                            help="Ignora archivos modificados hace menos de estos minutos (cargas en curso).")
+
+    def handle(self, *args, **options):
+        carpetas = [c.strip().strip('/') for c in options['carpetas'].split(',') if c.strip()]
+        if any('..' in c.split('/') for c in carpetas):
+            raise CommandError("Las carpetas deben estar dentro de MEDIA_ROOT.")
+
+        try:
+            with bloqueo_mantenimiento():
+                archivos, bytes_totales, errores = self._limpiar(carpetas, options)
+        except MantenimientoEnCurso as e:
+            raise CommandError(str(e))
+
+        if options['borrar']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Se borraron {archivos} archivos huérfanos ({_legible(bytes_totales)} liberados)"
+                + (f"; {errores} con error." if errores else ".")
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"Simulación: {archivos} archivos huérfanos ({_legible(bytes_totales)}) se borrarían. "
+                f"Usa --borrar para eliminarlos."
+            ))
+
+    def _limpiar(self, carpetas, options):
+        archivos = bytes_totales = errores = 0
+        for huerfanos in buscar_huerfanos(carpetas, max(1, options['lote']), options['antiguedad_min']):
+            for ruta, tam in huerfanos:
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"  {ruta} ({_legible(tam)})")
+                if options['borrar']:
+                    try:
+                        os.remove(default_storage.path(ruta))
+                    except OSError as e:
+                        errores += 1
+                        self.stderr.write(f"No se pudo borrar {ruta}: {e}")
+                        continue
+                archivos += 1
+                bytes_totales += tam
+        return archivos, bytes_totales, errores
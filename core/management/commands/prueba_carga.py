@@ -0,0 +1,66 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import carga
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga contra un servidor en ejecución: entidades subiendo documentos y "
+        "revisores validando. Usa las entidades creadas con generar_datos_sinteticos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument('--entidades', type=int, default=20, help="Entidades concurrentes.")
+        parser.add_argument('--revisores', type=int, default=2, help="Revisores concurrentes.")
+        parser.add_argument('--duracion', type=int, default=60, help="Segundos de prueba.")
+        parser.add_argument('--prefijo', default='bench', help="Prefijo de los usuarios sintéticos.")
+        parser.add_argument('--admin', required=True,
+                            help="Superusuario para los revisores (descargan los reportes por entidad).")
+        parser.add_argument('--admin-contrasena', required=True)
+        parser.add_argument('--archivos', type=int, default=2, help="PDFs por carga.")
+        parser.add_argument('--tam-kb', type=int, default=200, help="Tamaño de cada PDF.")
+        parser.add_argument('--pausa', type=float, default=0.5, help="Pausa media entre acciones (s).")
+        parser.add_argument('--json', help="Guarda el resumen en este archivo.")
+
+    def handle(self, *args, **options):
+        usuarios = [f"{options['prefijo']}_{i:05d}" for i in range(options['entidades'])]
+        if not usuarios and not options['revisores']:
+            raise CommandError("Se necesita al menos una entidad o un revisor.")
+
+        self.stdout.write(
+            f"{len(usuarios)} entidades y {options['revisores']} revisores contra {options['url']} "
+            f"durante {options['duracion']} s..."
+        )
+        try:
+            registro, segundos = carga.ejecutar(
+                options['url'], usuarios, options['admin'], options['admin_contrasena'],
+                revisores=options['revisores'], duracion=options['duracion'],
+                archivos=options['archivos'], tam_kb=options['tam_kb'], pausa=options['pausa'],
+            )
+        except carga.ErrorPreparacion as e:
+            raise CommandError(str(e))
+        filas = registro.resumen(segundos)
+        if not filas:
+            raise CommandError("No se completó ninguna petición; ¿está corriendo el servidor?")
+
+        self.stdout.write(
+            f"\n{'Endpoint':<26}{'Peticiones':>11}{'Errores':>9}{'%Error':>8}{'Req/s':>8}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        )
+        for f in filas:
+            self.stdout.write(
+                f"{f['endpoint']:<26}{f['peticiones']:>11}{f['errores']:>9}"
+                f"{f['errores'] / f['peticiones'] * 100:>7.1f}%{f['por_segundo']:>8}"
+                f"{f['p50_ms']:>9}{f['p95_ms']:>9}{f['p99_ms']:>9}"
+            )
+        total = sum(f['peticiones'] for f in filas)
+        errores = sum(f['errores'] for f in filas)
+        self.stdout.write(f"\nTotal: {total} peticiones en {segundos:.1f} s ({total / segundos:.1f} req/s), "
+                          f"{errores} errores")
+
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as archivo:
+                json.dump({'segundos': round(segundos, 2), 'endpoints': filas}, archivo, indent=2, ensure_ascii=False)
@@ -0,0 +1,106 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Línea de ``python -X importtime``: "import time:  self | cumulative | módulo"
+_RE_LINEA = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+PESADOS = 'numpy,pandas,matplotlib,reportlab'
+
+
+def medir(modulo):
+    """Importa ``modulo`` tras ``django.setup()`` en un intérprete nuevo.
+
+    Regresa ``{módulo: (propio_us, acumulado_us)}`` solo con los módulos de
+    primer nivel del árbol (los que importó directamente alguien del proyecto
+    cuentan con su acumulado) y el total de microsegundos.
+    """
+    codigo = f'import django; django.setup(); import {modulo}'
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=str(settings.BASE_DIR), env=dict(os.environ), capture_output=True, text=True,
+    )
+    if proceso.returncode:
+        raise CommandError(f"No se pudo importar {modulo}:\n{proceso.stderr[-2000:]}")
+
+    modulos, total = {}, 0
+    for linea in proceso.stderr.splitlines():
+        coincide = _RE_LINEA.match(linea)
+        if not coincide:
+            continue
+        propio, acumulado, nombre = int(coincide[1]), int(coincide[2]), coincide[4]
+        total += propio
+        # Un módulo puede aparecer una sola vez; se guarda su acumulado
+        modulos[nombre] = (propio, acumulado)
+    return modulos, total
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide con 'python -X importtime' el costo de arrancar Django e importar las URLs "
+        "(lo que paga cada worker) e indica qué dependencias pesadas se cargaron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modulo', default='core.urls', help="Módulo a importar tras django.setup().")
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--pesados', default=PESADOS,
+                            help="Paquetes que NO deberían cargarse al arrancar (separados por comas).")
+        parser.add_argument('--top', type=int, default=10, help="Cuántos módulos mostrar por tiempo acumulado.")
+        parser.add_argument('--estricto', action='store_true',
+                            help="Falla si se cargó alguno de los paquetes pesados.")
+        parser.add_argument('--json', action='store_true', help="Imprime el resultado en JSON.")
+
+    def handle(self, *args, **options):
+        pesados = [p.strip() for p in options['pesados'].split(',') if p.strip()]
+        mediciones = [medir(options['modulo']) for _ in range(max(1, options['repeticiones']))]
+        modulos = mediciones[-1][0]
+        total_ms = statistics.median(total for _, total in mediciones) / 1000
+        modulo_ms = statistics.median(m.get(options['modulo'], (0, 0))[1] for m, _ in mediciones) / 1000
+
+        cargados = {
+            paquete: round(modulos[paquete][1] / 1000, 1)
+            for paquete in pesados if paquete in modulos
+        }
+        # Los más costosos entre los paquetes de primer nivel (sin punto)
+        top = sorted(
+            ((nombre, acumulado) for nombre, (_, acumulado) in modulos.items() if '.' not in nombre),
+            key=lambda m: m[1], reverse=True,
+        )[:options['top']]
+
+        resultado = {
+            'modulo': options['modulo'],
+            'total_ms': round(total_ms, 1),
+            'modulo_ms': round(modulo_ms, 1),
+            'pesados_cargados': cargados,
+            'top': [{'modulo': nombre, 'ms': round(us / 1000, 1)} for nombre, us in top],
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultado, ensure_ascii=False, indent=2))
+        else:
+            self.stdout.write(
+                f"Arranque (django.setup + import {options['modulo']}): {resultado['total_ms']} ms "
+                f"(mediana de {len(mediciones)}); {options['modulo']}: {resultado['modulo_ms']} ms"
+            )
+            self.stdout.write("Paquetes con mayor tiempo acumulado:")
+            for fila in resultado['top']:
+                self.stdout.write(f"  {fila['modulo']:<30} {fila['ms']:>8.1f} ms")
+            if cargados:
+                self.stdout.write(self.style.WARNING(
+                    "Dependencias pesadas cargadas al arrancar: "
+                    + ', '.join(f'{p} ({ms} ms)' for p, ms in cargados.items())
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Ninguna dependencia pesada ({', '.join(pesados)}) se cargó al arrancar."
+                ))
+
+        if options['estricto'] and cargados:
+            raise CommandError(f"Se cargaron dependencias pesadas: {', '.join(cargados)}")
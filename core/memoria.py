@@ -0,0 +1,119 @@
+# --------------------
+# Presupuesto de memoria por vista
+# --------------------
+# Algunas vistas (ZIP de respaldos, respaldar anexos, reportes PDF) pueden
+# inflar la memoria del worker hasta que el sistema lo mata, junto con las
+# peticiones de otros usuarios que estuviera atendiendo.
+#
+# ``PresupuestoMemoriaMiddleware`` (core/middleware.py) fija para la petición
+# el límite configurado en ``PRESUPUESTOS_MEMORIA_MB`` (por nombre de URL).
+# Los ciclos pesados llaman a ``verificar_presupuesto()``, que compara el
+# crecimiento de la memoria residente (RSS) del proceso desde el inicio de la
+# petición contra el límite y lanza ``PresupuestoMemoriaExcedido``; el
+# middleware la convierte en un mensaje y una redirección.
+#
+# Si tracemalloc está activo (p. ej. una petición muestreada por las métricas)
+# también se usa el pico de memoria trazada.
+#
+# Alcance:
+#
+# - Los reportes que corren en el pool (``REPORTES_FUERA_DE_PROCESO``) llevan
+#   el presupuesto de la petición que los encola y se miden dentro del worker
+#   (core/renderizado.py), que genera un reporte a la vez.
+# - En las respuestas en flujo (exportación masiva de reportes) el middleware
+#   mantiene el presupuesto mientras se genera el contenido; como la
+#   respuesta ya empezó, al excederse se registra y se corta la descarga.
+# - RSS y tracemalloc son del proceso completo: con un servidor que atiende
+#   varias peticiones por proceso (hilos) la medición incluye también la
+#   memoria de las demás. El límite es exacto con workers de una petición a
+#   la vez (p. ej. gunicorn ``sync``) y en los workers de reportes.
+#
+# IMPORTANTE: sin importaciones de modelos; lo usan también los procesos de
+# core/renderizado.py.
+import os
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+class PresupuestoMemoriaExcedido(Exception):
+    def __init__(self, vista, usado_mb, limite_mb):
+        self.vista = vista
+        self.usado_mb = usado_mb
+        self.limite_mb = limite_mb
+        super().__init__(f"{vista}: {usado_mb:.0f} MB usados, límite {limite_mb} MB")
+
+    def __reduce__(self):
+        # Se lanza también en los workers de reportes y viaja de regreso por pickle
+        return type(self), (self.vista, self.usado_mb, self.limite_mb)
+
+
+def rss_mb():
+    """Memoria residente actual del proceso en MB (0 si no se puede medir)."""
+    try:
+        with open('/proc/self/statm') as statm:
+            paginas = int(statm.read().split()[1])
+        return paginas * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    # ru_maxrss es el pico (KB en Linux, bytes en macOS); sirve como cota superior
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def iniciar_presupuesto(vista, limite_mb):
+    """Activa el presupuesto para la petición en curso (hilo actual)."""
+    _local.presupuesto = (vista, limite_mb, rss_mb())
+
+
+def terminar_presupuesto():
+    _local.presupuesto = None
+
+
+def presupuesto_activo():
+    """Presupuesto del hilo actual (para heredarlo a un flujo o a un worker), o ``None``."""
+    return getattr(_local, 'presupuesto', None)
+
+
+@contextmanager
+def presupuesto_heredado(presupuesto):
+    """Aplica en este hilo un presupuesto tomado con ``presupuesto_activo()``."""
+    anterior = getattr(_local, 'presupuesto', None)
+    _local.presupuesto = presupuesto
+    try:
+        yield
+    finally:
+        _local.presupuesto = anterior
+
+
+def memoria_usada_mb():
+    """Memoria usada desde que inició el presupuesto (0 si no hay presupuesto activo)."""
+    presupuesto = getattr(_local, 'presupuesto', None)
+    if presupuesto is None:
+        return 0
+    usado = rss_mb() - presupuesto[2]
+    if tracemalloc.is_tracing():
+        usado = max(usado, tracemalloc.get_traced_memory()[1] / (1024 * 1024))
+    return usado
+
+
+def verificar_presupuesto():
+    """Lanza ``PresupuestoMemoriaExcedido`` si la petición superó su presupuesto.
+
+    No hace nada si la vista no tiene presupuesto configurado, así que puede
+    llamarse desde cualquier ciclo (también dentro de los procesos de reportes).
+    """
+    presupuesto = getattr(_local, 'presupuesto', None)
+    if presupuesto is None:
+        return
+    vista, limite_mb, _ = presupuesto
+    usado = memoria_usada_mb()
+    if usado > limite_mb:
+        raise PresupuestoMemoriaExcedido(vista, usado, limite_mb)
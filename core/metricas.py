@@ -0,0 +1,184 @@
+# --------------------
+# Métricas por vista (formato de texto de Prometheus)
+# --------------------
+# ``MetricasMiddleware`` (core/middleware.py) llama a ``registrar`` al final de
+# cada petición. Cada hilo escribe en su propia tabla de series, así que
+# registrar no toma ningún lock; ``exportar`` suma las tablas de todos los
+# hilos al momento de la consulta. Las tablas de los hilos que ya terminaron
+# (servidores que crean un hilo por petición o reciclan su pool) se suman a
+# una tabla común y se descartan, así que su número no crece con el tiempo.
+#
+# La memoria de las peticiones muestreadas es el pico de tracemalloc, que
+# traza todo el proceso: incluye lo que asignaron otros hilos mientras tanto.
+#
+# Los contadores son por proceso: con varios workers de gunicorn cada uno
+# reporta lo suyo (Prometheus los distingue por instancia y los suma).
+import threading
+import time
+from bisect import bisect_left
+
+# Límites (segundos) de los buckets del histograma de latencia
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_inicio_proceso = time.time()
+_local = threading.local()
+_tablas = []                     # [(hilo, tabla)] de los hilos vivos
+_retiradas = {}                  # series de los hilos que ya terminaron
+_tablas_lock = threading.Lock()  # no se usa al registrar, salvo en la primera petición de cada hilo
+
+
+class _Serie:
+    __slots__ = ('solicitudes', 'duracion', 'buckets', 'consultas', 'consultas_seg', 'bytes',
+                 'muestras_memoria', 'memoria_suma', 'memoria_max')
+
+    def __init__(self):
+        self.solicitudes = 0
+        self.duracion = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.consultas = 0
+        self.consultas_seg = 0.0
+        self.bytes = 0
+        self.muestras_memoria = 0
+        self.memoria_suma = 0
+        self.memoria_max = 0
+
+
+def _sumar(destino, tabla):
+    for clave, serie in tabla.copy().items():
+        acumulada = destino.setdefault(clave, _Serie())
+        acumulada.solicitudes += serie.solicitudes
+        acumulada.duracion += serie.duracion
+        acumulada.buckets = [a + b for a, b in zip(acumulada.buckets, serie.buckets)]
+        acumulada.consultas += serie.consultas
+        acumulada.consultas_seg += serie.consultas_seg
+        acumulada.bytes += serie.bytes
+        acumulada.muestras_memoria += serie.muestras_memoria
+        acumulada.memoria_suma += serie.memoria_suma
+        acumulada.memoria_max = max(acumulada.memoria_max, serie.memoria_max)
+
+
+def _retirar_terminados():
+    """Pasa a ``_retiradas`` las tablas de los hilos que ya terminaron (con el lock tomado)."""
+    vivas = []
+    for hilo, tabla in _tablas:
+        if hilo.is_alive():
+            vivas.append((hilo, tabla))
+        else:
+            _sumar(_retiradas, tabla)
+    _tablas[:] = vivas
+
+
+def _tabla():
+    tabla = getattr(_local, 'tabla', None)
+    if tabla is None:
+        tabla = _local.tabla = {}
+        with _tablas_lock:
+            _retirar_terminados()
+            _tablas.append((threading.current_thread(), tabla))
+    return tabla
+
+
+def registrar(vista, metodo, estado, duracion, consultas, consultas_seg, tam, memoria_pico=None):
+    """Suma una petición a las series de ``(vista, metodo, estado)`` del hilo actual."""
+    tabla = _tabla()
+    clave = (vista, metodo, str(estado))
+    serie = tabla.get(clave)
+    if serie is None:
+        serie = tabla[clave] = _Serie()
+    serie.solicitudes += 1
+    serie.duracion += duracion
+    serie.buckets[bisect_left(BUCKETS, duracion)] += 1
+    serie.consultas += consultas
+    serie.consultas_seg += consultas_seg
+    serie.bytes += tam
+    if memoria_pico is not None:
+        serie.muestras_memoria += 1
+        serie.memoria_suma += memoria_pico
+        serie.memoria_max = max(serie.memoria_max, memoria_pico)
+
+
+def _acumular():
+    """Suma las tablas de todos los hilos en ``{clave: _Serie}``."""
+    total = {}
+    with _tablas_lock:
+        _retirar_terminados()
+        _sumar(total, _retiradas)
+        tablas = [tabla for _, tabla in _tablas]
+    for tabla in tablas:
+        _sumar(total, tabla)
+    return total
+
+
+def _etiquetas(**valores):
+    def escapar(valor):
+        return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{escapar(v)}"' for k, v in valores.items()) + '}'
+
+
+def exportar():
+    """Todas las métricas del proceso en formato de texto de Prometheus."""
+    series = sorted(_acumular().items())
+    lineas = []
+
+    def metrica(nombre, tipo, ayuda, muestras):
+        lineas.append(f'# HELP {nombre} {ayuda}')
+        lineas.append(f'# TYPE {nombre} {tipo}')
+        lineas.extend(muestras)
+
+    metrica('semujeres_http_solicitudes_total', 'counter', 'Peticiones atendidas por vista, método y estado.', [
+        f'semujeres_http_solicitudes_total{_etiquetas(vista=v, metodo=m, estado=e)} {s.solicitudes}'
+        for (v, m, e), s in series
+    ])
+
+    histograma = []
+    for (v, m, e), s in series:
+        acumulado = 0
+        for limite, n in zip(BUCKETS + ('+Inf',), s.buckets):
+            acumulado += n
+            histograma.append(
+                f'semujeres_http_duracion_segundos_bucket{_etiquetas(vista=v, metodo=m, estado=e, le=limite)} {acumulado}'
+            )
+        histograma.append(f'semujeres_http_duracion_segundos_sum{_etiquetas(vista=v, metodo=m, estado=e)} {s.duracion:.6f}')
+        histograma.append(f'semujeres_http_duracion_segundos_count{_etiquetas(vista=v, metodo=m, estado=e)} {s.solicitudes}')
+    metrica('semujeres_http_duracion_segundos', 'histogram', 'Latencia de la vista (sin el cuerpo en flujo).', histograma)
+
+    metrica('semujeres_db_consultas_total', 'counter', 'Queries ejecutados por la vista.', [
+        f'semujeres_db_consultas_total{_etiquetas(vista=v, metodo=m, estado=e)} {s.consultas}'
+        for (v, m, e), s in series
+    ])
+    metrica('semujeres_db_duracion_segundos_total', 'counter', 'Tiempo acumulado en la base de datos.', [
+        f'semujeres_db_duracion_segundos_total{_etiquetas(vista=v, metodo=m, estado=e)} {s.consultas_seg:.6f}'
+        for (v, m, e), s in series
+    ])
+    metrica('semujeres_http_respuesta_bytes_total', 'counter', 'Bytes de respuesta (según Content-Length en flujos).', [
+        f'semujeres_http_respuesta_bytes_total{_etiquetas(vista=v, metodo=m, estado=e)} {s.bytes}'
+        for (v, m, e), s in series
+    ])
+
+    # tracemalloc traza el proceso completo: el nombre lo deja claro
+    memoria = []
+    for (v, m, e), s in series:
+        if s.muestras_memoria:
+            memoria.append(f'semujeres_proceso_memoria_pico_bytes_sum{_etiquetas(vista=v, metodo=m, estado=e)} {s.memoria_suma}')
+            memoria.append(f'semujeres_proceso_memoria_pico_bytes_count{_etiquetas(vista=v, metodo=m, estado=e)} {s.muestras_memoria}')
+    metrica('semujeres_proceso_memoria_pico_bytes', 'summary',
+            'Pico de memoria trazada del proceso durante la petición, incluye otros hilos (peticiones muestreadas).',
+            memoria)
+    metrica('semujeres_proceso_memoria_pico_max_bytes', 'gauge',
+            'Mayor pico de memoria trazada del proceso observado durante una petición.', [
+                f'semujeres_proceso_memoria_pico_max_bytes{_etiquetas(vista=v, metodo=m, estado=e)} {s.memoria_max}'
+                for (v, m, e), s in series if s.muestras_memoria
+            ])
+
+    metrica('semujeres_proceso_inicio_segundos', 'gauge', 'Inicio del proceso (época Unix).', [
+        f'semujeres_proceso_inicio_segundos {_inicio_proceso:.0f}'
+    ])
+    return '\n'.join(lineas) + '\n'
+
+
+def reiniciar():
+    """Borra las series acumuladas (útil en pruebas)."""
+    with _tablas_lock:
+        _retiradas.clear()
+        for _, tabla in _tablas:
+            tabla.clear()
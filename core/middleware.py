@@ -0,0 +1,182 @@
+# --------------------
+# Middleware
+# --------------------
+import logging
+import random
+import threading
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import connection
+from django.http import FileResponse
+from django.shortcuts import redirect
+from django.utils.http import url_has_allowed_host_and_scheme
+
+from . import metricas, perfilado
+from .memoria import (
+    PresupuestoMemoriaExcedido,
+    iniciar_presupuesto,
+    presupuesto_activo,
+    presupuesto_heredado,
+    terminar_presupuesto,
+)
+
+logger = logging.getLogger(__name__)
+
+_METODOS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+class _ContadorConsultas:
+    """``execute_wrapper`` que cuenta los queries de la petición y su tiempo."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.segundos += time.perf_counter() - inicio
+            self.consultas += 1
+
+
+class MetricasMiddleware:
+    """Registra latencia, queries, tamaño de respuesta y (muestreado) memoria por vista.
+
+    Las vistas se identifican por el nombre de su URL; las peticiones que no
+    coinciden con ninguna ruta se agrupan como ``sin_ruta``. Para las
+    respuestas en flujo solo se mide hasta que la vista regresa.
+
+    tracemalloc hace lento al proceso completo mientras está activo, así que
+    solo se activa en una fracción ``METRICAS_MUESTREO_MEMORIA`` de las
+    peticiones y en una a la vez. El pico medido es del proceso completo
+    (incluye a los demás hilos mientras dura la petición).
+    """
+
+    _trazando = threading.Lock()
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.activo = getattr(settings, 'METRICAS_ACTIVAS', True)
+        self.muestreo = getattr(settings, 'METRICAS_MUESTREO_MEMORIA', 0.01)
+
+    def __call__(self, request):
+        if not self.activo:
+            return self.get_response(request)
+
+        trazar = (self.muestreo and random.random() < self.muestreo
+                  and not tracemalloc.is_tracing() and self._trazando.acquire(blocking=False))
+        if trazar:
+            tracemalloc.start()
+        contador = _ContadorConsultas()
+        inicio = time.perf_counter()
+        try:
+            with connection.execute_wrapper(contador):
+                response = self.get_response(request)
+        finally:
+            duracion = time.perf_counter() - inicio
+            pico = None
+            if trazar:
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self._trazando.release()
+
+        match = request.resolver_match
+        vista = (match.view_name or 'sin_nombre') if match else 'sin_ruta'
+        if response.streaming:
+            tam = int(response.get('Content-Length') or 0)
+        else:
+            tam = len(response.content)
+        metricas.registrar(
+            vista, request.method if request.method in _METODOS else 'OTRO', response.status_code, duracion,
+            contador.consultas, contador.segundos, tam, pico,
+        )
+        return response
+
+
+class PerfiladoMiddleware:
+    """Perfila con cProfile las peticiones de administradores que lo piden (ver core/perfilado.py).
+
+    Va después de AuthenticationMiddleware para conocer al usuario.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if perfilado.solicitado(request):
+            user = request.user
+            if user.is_authenticated and (user.is_superuser or user.rol == 'admin'):
+                return perfilado.perfilar(request, self.get_response)
+        return self.get_response(request)
+
+
+class PresupuestoMemoriaMiddleware:
+    """Aplica ``PRESUPUESTOS_MEMORIA_MB`` a las vistas configuradas (ver core/memoria.py).
+
+    Si la vista excede su presupuesto se registra el evento (vista,
+    parámetros y memoria usada) y se regresa al usuario a la página anterior
+    con un mensaje, en lugar de dejar que el worker se quede sin memoria.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.presupuestos = getattr(settings, 'PRESUPUESTOS_MEMORIA_MB', {})
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+            presupuesto = presupuesto_activo()
+            # Un archivo ya generado no crece; el contenido que se genera al enviarse sí
+            if presupuesto is not None and response.streaming and not isinstance(response, FileResponse):
+                response.streaming_content = self._en_flujo(request, response.streaming_content, presupuesto)
+            return response
+        finally:
+            terminar_presupuesto()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        limite = self.presupuestos.get(request.resolver_match.url_name)
+        if limite:
+            iniciar_presupuesto(request.resolver_match.url_name, limite)
+
+    def _registrar(self, request, exception):
+        logger.warning(
+            "Presupuesto de memoria excedido en %s: %.0f MB (límite %s MB). GET=%s POST(campos)=%s kwargs=%s",
+            exception.vista, exception.usado_mb, exception.limite_mb,
+            request.GET.dict(), sorted(request.POST.keys()), request.resolver_match.kwargs,
+        )
+
+    def _en_flujo(self, request, contenido, presupuesto):
+        # El presupuesto sigue vigente mientras se genera cada bloque. La
+        # respuesta ya empezó, así que no hay redirección posible: se registra
+        # y la excepción corta la conexión (el cliente ve la descarga fallida
+        # en lugar de un archivo incompleto que parece válido).
+        iterador = iter(contenido)
+        while True:
+            with presupuesto_heredado(presupuesto):
+                try:
+                    bloque = next(iterador)
+                except StopIteration:
+                    return
+                except PresupuestoMemoriaExcedido as error:
+                    self._registrar(request, error)
+                    raise
+            yield bloque
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, PresupuestoMemoriaExcedido):
+            return None
+        self._registrar(request, exception)
+        messages.error(
+            request,
+            "La operación se canceló porque requería demasiada memoria. "
+            "Intenta con menos datos (por ejemplo, filtrando por año o entidad).",
+        )
+        anterior = request.META.get('HTTP_REFERER', '')
+        if anterior and url_has_allowed_host_and_scheme(anterior, {request.get_host()}, request.is_secure()):
+            return redirect(anterior)
+        return redirect('admin_revision_documentacion')
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_retencion_respaldos'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='anexohistorico',
+            index=models.Index(fields=['-fecha_subida', '-id'], name='historico_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='anexohistorico',
+            index=models.Index(fields=['entidad', 'anexo_requerido', '-fecha_subida'], name='historico_grupo_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_indices_historico'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='anexohistorico',
+            name='hash_contenido',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_hash_contenido_historico'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tareafondo',
+            name='tipo',
+            field=models.CharField(choices=[('purgar_respaldos', 'Purga de respaldos'), ('compactar_respaldos', 'Retención de respaldos'), ('eliminar_usuario', 'Eliminación de usuario')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_baja_usuarios'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tareafondo',
+            name='fecha_avance',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:43
+
+import core.almacenamiento
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_tareafondo_fecha_avance'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='anexohistorico',
+            name='archivo',
+            field=models.FileField(db_index=True, max_length=255, upload_to=core.almacenamiento.subir_historico),
+        ),
+        migrations.AlterField(
+            model_name='anexousuario',
+            name='archivo',
+            field=models.FileField(blank=True, db_index=True, max_length=255, null=True, upload_to=core.almacenamiento.subir_anexo_usuario),
+        ),
+        migrations.AlterField(
+            model_name='documento',
+            name='archivo',
+            field=models.FileField(blank=True, db_index=True, max_length=255, null=True, upload_to=core.almacenamiento.subir_documento),
+        ),
+    ]
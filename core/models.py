@@ -1,7 +1,11 @@
+from datetime import timedelta
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
+from .almacenamiento import nombre_visible, subir_anexo_usuario, subir_documento, subir_historico
 
 
 # ----------------------------
@@ -73,7 +77,7 @@ class AnexoRequerido(models.Model):
 class Documento(models.Model):
     usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     anexo = models.ForeignKey(AnexoRequerido, on_delete=models.CASCADE)
-    archivo = models.FileField(upload_to='documentos/', blank=True, null=True)
+    archivo = models.FileField(upload_to=subir_documento, max_length=255, blank=True, null=True, db_index=True)
     fecha_subida = models.DateField(auto_now_add=True)
     estado = models.CharField(max_length=10, choices=ESTADOS, default='pendiente')
     observaciones = models.TextField(blank=True)
@@ -83,21 +87,91 @@ class Documento(models.Model):
 
     def __str__(self):
         return f"{self.usuario.username} - {self.anexo.nombre}"
+
+    @property
+    def nombre_archivo(self):
+        # Nombre con que se subió, sin carpetas ni token (ver core/almacenamiento.py)
+        return nombre_visible(self.archivo.name if self.archivo else '')
     
 
 class AnexoHistorico(models.Model):
     entidad = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     anexo_requerido = models.ForeignKey('AnexoRequerido', on_delete=models.CASCADE)
-    archivo = models.FileField(upload_to='anexos_historicos/')
+    archivo = models.FileField(upload_to=subir_historico, max_length=255, db_index=True)
     fecha_subida = models.DateTimeField(auto_now_add=True)
+    # SHA-256 del archivo; se calcula la primera vez que se compara (core/respaldos.py).
+    # El respaldo es una copia que nunca se modifica, así que no hay que invalidarlo.
+    hash_contenido = models.CharField(max_length=64, blank=True, default='', editable=False)
+
+    class Meta:
+        indexes = [
+            # Listado paginado de vista_respaldo_anexos
+            models.Index(fields=['-fecha_subida', '-id'], name='historico_fecha_idx'),
+            # Filtro por entidad y particiones de la compactación (core/respaldos.py)
+            models.Index(fields=['entidad', 'anexo_requerido', '-fecha_subida'], name='historico_grupo_idx'),
+        ]
 
 
 class AnexoUsuario(models.Model):
     usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     anexo_requerido = models.ForeignKey(AnexoRequerido, on_delete=models.CASCADE)
-    archivo = models.FileField(upload_to='anexos/', null=True, blank=True)
+    archivo = models.FileField(upload_to=subir_anexo_usuario, max_length=255, null=True, blank=True, db_index=True)
     estado = models.CharField(max_length=20, default='pendiente')
     observaciones = models.TextField(blank=True, null=True)
 
     def __str__(self):
         return f"{self.usuario} - {self.anexo_requerido}"
+
+
+# ----------------------------
+# Tareas en segundo plano (ver core/tareas.py)
+# ----------------------------
+class TareaFondo(models.Model):
+    TIPOS = [
+        ('purgar_respaldos', 'Purga de respaldos'),
+        ('compactar_respaldos', 'Retención de respaldos'),
+        ('eliminar_usuario', 'Eliminación de usuario'),
+    ]
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('en_curso', 'En curso'),
+        ('terminada', 'Terminada'),
+        ('fallida', 'Fallida'),
+    ]
+
+    tipo = models.CharField(max_length=30, choices=TIPOS)
+    parametros = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=10, choices=ESTADOS, default='pendiente')
+    total = models.PositiveIntegerField(default=0)
+    procesados = models.PositiveIntegerField(default=0)
+    mensaje = models.TextField(blank=True)
+    creada_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+    # Último avance reportado (core/tareas.py: avanzar); sirve para detectar tareas abandonadas
+    fecha_avance = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-fecha_creacion']
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.id} ({self.estado})"
+
+    @property
+    def abandonada(self):
+        """Pendiente o en curso pero sin avanzar en TAREAS_FONDO_ABANDONO_MIN minutos.
+
+        Pasa cuando el worker que la ejecutaba se reinició; basta con lanzarla de nuevo.
+        """
+        if self.estado not in ('pendiente', 'en_curso'):
+            return False
+        ultimo = self.fecha_avance or self.fecha_inicio or self.fecha_creacion
+        limite = timedelta(minutes=getattr(settings, 'TAREAS_FONDO_ABANDONO_MIN', 15))
+        return ultimo is not None and timezone.now() - ultimo > limite
+
+    @property
+    def porcentaje(self):
+        if self.estado == 'terminada':
+            return 100
+        return round(self.procesados / self.total * 100) if self.total else 0
@@ -0,0 +1,174 @@
+# --------------------
+# Perfilado de peticiones bajo demanda
+# --------------------
+# Un administrador marca una petición con el encabezado ``X-Perfilar: 1`` o el
+# parámetro ``?perfilar=1``. ``PerfiladoMiddleware`` (core/middleware.py) la
+# ejecuta bajo cProfile, registra cada query con su duración y guarda en
+# ``PERFILES_DIR``:
+#
+# - ``<id>.prof``     estadísticas de cProfile (se abren con pstats o snakeviz)
+# - ``<id>.sql.txt``  queries en orden, con duración y parámetros
+# - ``<id>.txt``      resumen: funciones con mayor tiempo acumulado
+# - ``<id>.json``     datos para la página de perfiles
+#
+# Las peticiones sin marca no pagan nada más que revisar el encabezado.
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+# Extensiones de los artefactos que se pueden descargar
+ARTEFACTOS = {
+    'prof': ('.prof', 'application/octet-stream'),
+    'sql': ('.sql.txt', 'text/plain; charset=utf-8'),
+    'resumen': ('.txt', 'text/plain; charset=utf-8'),
+}
+
+_ID_VALIDO = re.compile(r'^\d{8}_\d{6}_[0-9a-f]{8}$')
+
+# cProfile no admite dos perfiles activos a la vez en el mismo proceso
+_perfilando = threading.Lock()
+
+
+def directorio():
+    return str(getattr(settings, 'PERFILES_DIR', os.path.join(settings.BASE_DIR, 'perfiles')))
+
+
+def solicitado(request):
+    """¿La petición pide perfilado? (no revisa permisos)."""
+    return request.headers.get('X-Perfilar') == '1' or request.GET.get('perfilar') == '1'
+
+
+class _RegistroSQL:
+    """``execute_wrapper`` que guarda cada query con su duración."""
+
+    def __init__(self):
+        self.consultas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas.append((time.perf_counter() - inicio, sql, params))
+
+
+def perfilar(request, get_response):
+    """Ejecuta la petición bajo cProfile y guarda los artefactos.
+
+    Regresa la respuesta con el encabezado ``X-Perfil`` (id del perfil). Si ya
+    hay otro perfil en curso la petición se atiende sin perfilar.
+    """
+    if not _perfilando.acquire(blocking=False):
+        response = get_response(request)
+        response['X-Perfil'] = 'ocupado'
+        return response
+    try:
+        perfil = cProfile.Profile()
+        registro = _RegistroSQL()
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(registro):
+            perfil.enable()
+            try:
+                response = get_response(request)
+            finally:
+                perfil.disable()
+        duracion = time.perf_counter() - inicio
+    finally:
+        _perfilando.release()
+
+    response['X-Perfil'] = guardar(request, response, perfil, registro.consultas, duracion)
+    return response
+
+
+def guardar(request, response, perfil, consultas, duracion):
+    """Escribe los artefactos del perfil y regresa su id."""
+    ahora = timezone.localtime()
+    perfil_id = f"{ahora.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    base = os.path.join(directorio(), perfil_id)
+    os.makedirs(directorio(), exist_ok=True)
+
+    perfil.dump_stats(base + '.prof')
+
+    tiempo_sql = sum(c[0] for c in consultas)
+    with open(base + '.sql.txt', 'w', encoding='utf-8') as archivo:
+        archivo.write(f"{request.method} {request.get_full_path()}\n")
+        archivo.write(f"{len(consultas)} queries, {tiempo_sql * 1000:.1f} ms en base de datos\n\n")
+        for i, (segundos, sql, params) in enumerate(consultas, 1):
+            archivo.write(f"#{i}  {segundos * 1000:.2f} ms\n{sql}\n")
+            if params:
+                archivo.write(f"-- params: {params!r}\n")
+            archivo.write('\n')
+
+    resumen = io.StringIO()
+    estadisticas = pstats.Stats(perfil, stream=resumen)
+    estadisticas.strip_dirs().sort_stats('cumulative').print_stats(60)
+    with open(base + '.txt', 'w', encoding='utf-8') as archivo:
+        archivo.write(resumen.getvalue())
+
+    match = request.resolver_match
+    with open(base + '.json', 'w', encoding='utf-8') as archivo:
+        json.dump({
+            'id': perfil_id,
+            'fecha': ahora.isoformat(timespec='seconds'),
+            'usuario': request.user.get_username(),
+            'metodo': request.method,
+            'ruta': request.get_full_path(),
+            'vista': match.view_name if match else '',
+            'estado': response.status_code,
+            'duracion_ms': round(duracion * 1000, 1),
+            'consultas': len(consultas),
+            'consultas_ms': round(tiempo_sql * 1000, 1),
+        }, archivo, ensure_ascii=False)
+
+    _depurar()
+    return perfil_id
+
+
+def _depurar():
+    """Conserva solo los ``PERFILES_MAXIMO`` perfiles más recientes."""
+    maximo = getattr(settings, 'PERFILES_MAXIMO', 50)
+    for perfil in listar()[maximo:]:
+        borrar(perfil['id'])
+
+
+def listar():
+    """Metadatos de los perfiles guardados, del más reciente al más antiguo."""
+    carpeta = directorio()
+    if not os.path.isdir(carpeta):
+        return []
+    perfiles = []
+    for entrada in os.scandir(carpeta):
+        if entrada.name.endswith('.json'):
+            try:
+                with open(entrada.path, encoding='utf-8') as archivo:
+                    perfiles.append(json.load(archivo))
+            except (OSError, ValueError):
+                continue
+    return sorted(perfiles, key=lambda p: p['id'], reverse=True)
+
+
+def ruta_artefacto(perfil_id, tipo):
+    """Ruta del artefacto o ``None`` si el id o el tipo no son válidos o no existe."""
+    if tipo not in ARTEFACTOS or not _ID_VALIDO.match(perfil_id):
+        return None
+    ruta = os.path.join(directorio(), perfil_id + ARTEFACTOS[tipo][0])
+    return ruta if os.path.exists(ruta) else None
+
+
+def borrar(perfil_id):
+    if not _ID_VALIDO.match(perfil_id):
+        return
+    for extension in [e for e, _ in ARTEFACTOS.values()] + ['.json']:
+        ruta = os.path.join(directorio(), perfil_id + extension)
+        if os.path.exists(ruta):
+            os.remove(ruta)
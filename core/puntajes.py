@@ -0,0 +1,139 @@
+# --------------------
+# Motor de puntajes de cumplimiento
+# --------------------
+# Construye una sola vez la matriz entidad × anexo con el estado de cada
+# documento (int8) y calcula para TODAS las entidades, en una pasada
+# vectorizada, tres puntajes:
+#
+# - general:     % de anexos validados (todos pesan igual, como antes)
+# - obligatorios: % de anexos obligatorios validados
+# - ponderado:   % validado donde cada anexo pesa según AnexoRequerido.obligatorio
+#
+# Las vistas y reportes usan ``obtener_puntajes()``, que guarda el resultado en
+# la caché; ``core/signals.py`` la invalida cuando cambian documentos o anexos.
+import numpy as np
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .consultas import columnas
+from .models import AnexoRequerido, Documento, Usuario
+
+CLAVE_CACHE = 'core:puntajes'
+
+# Códigos de estado en la matriz
+SIN_DOCUMENTO = 0
+SIN_ARCHIVO = 1
+EN_REVISION = 2
+RECHAZADO = 3
+VALIDADO = 4
+
+
+def construir_matriz():
+    """Regresa ``(entidad_ids, anexo_ids, obligatorio, matriz)``.
+
+    ``matriz`` tiene forma ``(entidades, anexos)`` y dtype ``int8`` con los
+    códigos de estado de este módulo.
+    """
+    entidad_ids = np.array(
+        Usuario.objects.filter(rol='usuario', is_active=True).order_by('id').values_list('id', flat=True),
+        dtype=np.int64,
+    )
+    anexos = list(AnexoRequerido.objects.order_by('id').values_list('id', 'obligatorio'))
+    anexo_ids = np.array([a for a, _ in anexos], dtype=np.int64)
+    obligatorio = np.array([o for _, o in anexos], dtype=bool)
+
+    matriz = np.zeros((len(entidad_ids), len(anexo_ids)), dtype=np.int8)
+    usuario, anexo, estado, archivo = columnas(
+        Documento.objects.filter(usuario__rol='usuario', usuario__is_active=True)
+        .values_list('usuario_id', 'anexo_id', 'estado', 'archivo'),
+        (np.int64, np.int64, object, object),
+    )
+    if len(usuario) and len(anexo_ids):
+        con_archivo = (archivo != None) & (archivo != '')  # noqa: E711 (comparación elemento a elemento)
+        codigos = np.select(
+            [estado == 'validado', estado == 'rechazado', con_archivo],
+            [VALIDADO, RECHAZADO, EN_REVISION],
+            default=SIN_ARCHIVO,
+        ).astype(np.int8)
+        matriz[np.searchsorted(entidad_ids, usuario), np.searchsorted(anexo_ids, anexo)] = codigos
+
+    return entidad_ids, anexo_ids, obligatorio, matriz
+
+
+def calcular_puntajes(entidad_ids, obligatorio, matriz):
+    """Puntajes de todas las entidades a partir de la matriz de estados.
+
+    Regresa un diccionario ``{entidad_id: {'general', 'obligatorios', 'ponderado',
+    'validados', 'obligatorios_validados'}}`` más la clave ``'global'`` con
+    los mismos puntajes calculados sobre todas las entidades.
+    """
+    peso_obligatorio = getattr(settings, 'PUNTAJE_PESO_OBLIGATORIO', 2.0)
+    peso_opcional = getattr(settings, 'PUNTAJE_PESO_OPCIONAL', 1.0)
+    pesos = np.where(obligatorio, peso_obligatorio, peso_opcional)
+
+    validado = (matriz == VALIDADO)
+    total_anexos = matriz.shape[1]
+    total_obligatorios = int(obligatorio.sum())
+
+    validados = validado.sum(axis=1)
+    obligatorios_validados = validado[:, obligatorio].sum(axis=1)
+    peso_validado = validado @ pesos
+
+    def pct(numerador, denominador):
+        if not denominador:
+            return np.zeros(len(numerador))
+        return np.round(numerador / denominador * 100, 2)
+
+    general = pct(validados, total_anexos)
+    obligatorios = pct(obligatorios_validados, total_obligatorios)
+    ponderado = pct(peso_validado, pesos.sum())
+
+    resultado = {
+        int(eid): {
+            'general': float(g),
+            'obligatorios': float(o),
+            'ponderado': float(p),
+            'validados': int(v),
+            'obligatorios_validados': int(ov),
+        }
+        for eid, g, o, p, v, ov in zip(
+            entidad_ids.tolist(), general, obligatorios, ponderado, validados, obligatorios_validados
+        )
+    }
+
+    entidades = len(entidad_ids)
+    resultado['global'] = {
+        'general': float(pct(validados.sum(keepdims=True), total_anexos * entidades)[0]),
+        'obligatorios': float(pct(obligatorios_validados.sum(keepdims=True), total_obligatorios * entidades)[0]),
+        'ponderado': float(pct(peso_validado.sum(keepdims=True), pesos.sum() * entidades)[0]),
+        'validados': int(validados.sum()),
+        'obligatorios_validados': int(obligatorios_validados.sum()),
+    }
+    return resultado
+
+
+def obtener_puntajes():
+    """Puntajes de todas las entidades (desde la caché si están vigentes)."""
+    puntajes = cache.get(CLAVE_CACHE)
+    if puntajes is None:
+        entidad_ids, _, obligatorio, matriz = construir_matriz()
+        puntajes = calcular_puntajes(entidad_ids, obligatorio, matriz)
+        cache.set(CLAVE_CACHE, puntajes, getattr(settings, 'PUNTAJE_CACHE_SEGUNDOS', 300))
+    return puntajes
+
+
+def puntajes_de(entidad_id, puntajes=None):
+    """Puntajes de una entidad (ceros si no es una entidad, p. ej. un administrador).
+
+    ``puntajes`` es la tabla de ``obtener_puntajes()`` si ya se tiene, para no
+    leerla de la caché en cada entidad de un ciclo. Una entidad que aún no
+    aparece en ella (creada después de calcularla) también recibe ceros.
+    """
+    return (obtener_puntajes() if puntajes is None else puntajes).get(entidad_id) or {
+        'general': 0, 'obligatorios': 0, 'ponderado': 0, 'validados': 0, 'obligatorios_validados': 0,
+    }
+
+
+def invalidar():
+    cache.delete(CLAVE_CACHE)
@@ -0,0 +1,327 @@
+# --------------------
+# Renderizado de reportes en procesos de trabajo
+# --------------------
+# IMPORTANTE: este módulo no importa modelos a nivel de módulo. Los procesos
+# se crean con 'spawn' (no heredan conexiones abiertas a la base de datos) y
+# deben poder importar estas funciones ANTES de ejecutar django.setup().
+#
+# matplotlib y ReportLab guardan cachés (fuentes, figuras, hojas de estilo)
+# que hacen crecer la memoria del proceso que genera los reportes. Por eso los
+# reportes se generan en un pool pequeño y dedicado cuyos procesos se reciclan
+# cada cierto número de trabajos o al pasar un límite de memoria; el proceso
+# web solo recibe el PDF terminado. Si un worker muere (p. ej. lo mata el
+# OOM killer) o un reporte excede el tiempo límite, el pool se reemplaza para
+# que los reportes siguientes no fallen también.
+import atexit
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, TimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .descargas import abrir_temporal, archivo_temporal
+from .memoria import (
+    PresupuestoMemoriaExcedido,
+    iniciar_presupuesto,
+    presupuesto_activo,
+    rss_mb,
+    terminar_presupuesto,
+    verificar_presupuesto,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ErrorReporte(Exception):
+    """El reporte no se pudo generar en el pool (worker caído o tiempo excedido)."""
+
+    def __init__(self, mensaje, reintentable=False):
+        super().__init__(mensaje)
+        self.reintentable = reintentable
+
+
+def inicializar_worker():
+    """Prepara Django dentro de un proceso de trabajo recién creado."""
+    import django
+    django.setup()
+
+
+def _ejecutar_medido(presupuesto, funcion, *args):
+    """Ejecuta ``funcion`` en el worker y regresa ``(resultado, rss_mb)``.
+
+    ``presupuesto`` es ``(vista, limite_mb)`` de la petición que encoló el
+    trabajo; el crecimiento se mide aquí, desde el inicio del trabajo.
+    """
+    if presupuesto:
+        iniciar_presupuesto(*presupuesto)
+    try:
+        resultado = funcion(*args)
+        verificar_presupuesto()
+        return resultado, rss_mb()
+    finally:
+        terminar_presupuesto()
+        # La figura de pyplot es estado global del proceso: no dejamos nada abierto
+        if 'matplotlib.pyplot' in sys.modules:
+            sys.modules['matplotlib.pyplot'].close('all')
+
+
+# --------------------
+# Trabajos: escriben el reporte en ``salida`` y regresan el nombre de descarga
+# --------------------
+def reporte_general(salida):
+    from .reportes import generar_reporte_general
+    return generar_reporte_general(salida)
+
+
+def reporte_anexos(salida):
+    from .reportes import generar_reporte_anexos
+    return generar_reporte_anexos(salida)
+
+
+def reporte_entidad(salida, entidad_id):
+    from .models import Usuario
+    from .reportes import generar_reporte_entidad
+    return generar_reporte_entidad(Usuario.objects.get(id=entidad_id), salida)
+
+
+def _generar_en_disco(trabajo, *args):
+    """En el worker: escribe el reporte en un temporal en disco y regresa ``(nombre, ruta)``.
+
+    Así el proceso web no recibe el PDF completo por el pipe; solo la ruta.
+    """
+    destino = tempfile.NamedTemporaryFile(prefix='reporte_', suffix='.pdf', delete=False)
+    try:
+        with destino:
+            nombre = trabajo(destino, *args)
+    except BaseException:
+        os.remove(destino.name)
+        raise
+    return nombre, destino.name
+
+
+# --------------------
+# Pool dedicado con reciclaje de workers
+# --------------------
+class PoolReportes:
+    """Pool de procesos para generar reportes fuera del proceso web.
+
+    Cada worker se reemplaza después de ``max_trabajos`` reportes. Si algún
+    worker termina un reporte con más de ``max_rss_mb`` de memoria residente,
+    se reemplaza el pool completo: los trabajos en curso terminan en el pool
+    anterior y los nuevos van al pool nuevo.
+    """
+
+    def __init__(self, workers=2, max_trabajos=50, max_rss_mb=400, timeout=120):
+        self.workers = workers
+        self.max_trabajos = max_trabajos
+        self.max_rss_mb = max_rss_mb
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _obtener_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=inicializar_worker,
+                    max_tasks_per_child=self.max_trabajos,
+                )
+            return self._pool
+
+    def _reciclar(self, pool, terminar=False):
+        """Reemplaza ``pool`` por uno nuevo; con ``terminar`` mata también sus procesos."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        # shutdown() suelta la referencia a los procesos: se toman antes
+        procesos = list((getattr(pool, '_processes', None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=terminar)
+        if terminar:
+            # Un worker colgado no se detiene con shutdown(); los trabajos de
+            # otras peticiones en ese pool reciben BrokenProcessPool y se
+            # reintentan en el pool nuevo.
+            for proceso in procesos:
+                proceso.terminate()
+
+    def enviar(self, funcion, *args):
+        """Encola ``funcion`` en el pool y regresa el futuro (ver ``resultado``).
+
+        El trabajo lleva el presupuesto de memoria de la petición en curso, si
+        tiene (ver core/memoria.py).
+        """
+        presupuesto = presupuesto_activo()
+        presupuesto = presupuesto and presupuesto[:2]
+        pool = self._obtener_pool()
+        try:
+            futuro = pool.submit(_ejecutar_medido, presupuesto, funcion, *args)
+        except (BrokenProcessPool, RuntimeError):
+            # Roto o ya cerrado por otro hilo: un pool nuevo
+            self._reciclar(pool)
+            pool = self._obtener_pool()
+            futuro = pool.submit(_ejecutar_medido, presupuesto, funcion, *args)
+        futuro.pool = pool
+        return futuro
+
+    def resultado(self, futuro, timeout=None):
+        """Resultado de un futuro de ``enviar``; recicla el pool si se rompió o se colgó."""
+        try:
+            resultado, memoria = futuro.result(timeout=timeout)
+        except BrokenProcessPool:
+            logger.warning("Un worker de reportes terminó inesperadamente; se reemplaza el pool")
+            self._reciclar(futuro.pool)
+            raise ErrorReporte("El proceso que generaba el reporte terminó inesperadamente.", reintentable=True)
+        except TimeoutError:
+            logger.warning("Un reporte excedió %s s; se reemplaza el pool", timeout)
+            futuro.cancel()
+            self._reciclar(futuro.pool, terminar=True)
+            raise ErrorReporte("El reporte tardó demasiado en generarse.")
+        except PresupuestoMemoriaExcedido:
+            # El worker quedó crecido: no lo reutilizamos
+            self._reciclar(futuro.pool)
+            raise
+        if self.max_rss_mb and memoria > self.max_rss_mb:
+            self._reciclar(futuro.pool)
+        return resultado
+
+    def ejecutar(self, funcion, *args):
+        try:
+            return self.resultado(self.enviar(funcion, *args), timeout=self.timeout)
+        except ErrorReporte as error:
+            if not error.reintentable:
+                raise
+        # El pool se rompió (quizá por el reporte de otra petición): un intento más en uno nuevo
+        return self.resultado(self.enviar(funcion, *args), timeout=self.timeout)
+
+    def cerrar(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_pool_reportes = None
+_pool_exportacion = None
+_pool_lock = threading.Lock()
+
+
+def _crear_pool(workers):
+    pool = PoolReportes(
+        workers=workers,
+        max_trabajos=getattr(settings, 'REPORTES_POOL_MAX_TRABAJOS', 50),
+        max_rss_mb=getattr(settings, 'REPORTES_POOL_MAX_RSS_MB', 400),
+        timeout=getattr(settings, 'REPORTES_POOL_TIMEOUT', 120),
+    )
+    atexit.register(pool.cerrar)
+    return pool
+
+
+def obtener_pool():
+    """Pool compartido por todo el proceso web (se crea en el primer uso)."""
+    global _pool_reportes
+    with _pool_lock:
+        if _pool_reportes is None:
+            _pool_reportes = _crear_pool(getattr(settings, 'REPORTES_POOL_WORKERS', 2))
+        return _pool_reportes
+
+
+def workers_exportacion():
+    """Procesos para las exportaciones masivas: ``REPORTES_EXPORTACION_WORKERS`` o uno por núcleo."""
+    return getattr(settings, 'REPORTES_EXPORTACION_WORKERS', None) or os.cpu_count() or 1
+
+
+def obtener_pool_exportacion():
+    """Pool de las exportaciones masivas, aparte del de los reportes individuales.
+
+    Se dimensiona con ``workers_exportacion()`` para aprovechar todos los
+    núcleos sin que el pool de los reportes individuales crezca igual.
+    """
+    global _pool_exportacion
+    with _pool_lock:
+        if _pool_exportacion is None:
+            _pool_exportacion = _crear_pool(workers_exportacion())
+        return _pool_exportacion
+
+
+def renderizar(trabajo, *args):
+    """Genera un reporte y regresa ``(nombre, archivo)`` con el archivo listo para leerse.
+
+    Según ``REPORTES_FUERA_DE_PROCESO`` el trabajo corre en el pool o aquí
+    mismo; en ambos casos el PDF no se mantiene completo en la memoria del
+    proceso web (ver ``core/descargas.py``).
+    """
+    if not getattr(settings, 'REPORTES_FUERA_DE_PROCESO', False):
+        archivo = archivo_temporal()
+        try:
+            nombre = trabajo(archivo, *args)
+            verificar_presupuesto()
+        except BaseException:
+            archivo.close()
+            raise
+        archivo.seek(0)
+        return nombre, archivo
+    nombre, ruta = obtener_pool().ejecutar(_generar_en_disco, trabajo, *args)
+    return nombre, abrir_temporal(ruta)
+
+
+def exportar_reportes_entidades(entidad_ids):
+    """Genera en paralelo los reportes de ``entidad_ids``.
+
+    Produce tuplas ``(nombre, archivo)`` conforme cada reporte termina, sin
+    esperar a que el lote completo esté listo. Cada archivo se cierra en
+    cuanto el consumidor pide el siguiente.
+
+    Usa el pool de exportaciones (``obtener_pool_exportacion``) y tiene a lo
+    más ``workers_exportacion()`` reportes encolados a la vez: N entidades se
+    generan de ``workers`` en ``workers``. Varias exportaciones simultáneas se
+    reparten los mismos procesos en lugar de crear cada una los suyos.
+    """
+    if not getattr(settings, 'REPORTES_FUERA_DE_PROCESO', False):
+        for eid in entidad_ids:
+            nombre, archivo = renderizar(reporte_entidad, eid)
+            with archivo:
+                yield nombre, archivo
+        return
+
+    pool = obtener_pool_exportacion()
+    pendientes = iter(entidad_ids)
+    en_curso = set()
+    try:
+        while True:
+            while len(en_curso) < pool.workers:
+                eid = next(pendientes, None)
+                if eid is None:
+                    break
+                en_curso.add(pool.enviar(_generar_en_disco, reporte_entidad, eid))
+            if not en_curso:
+                break
+            listos, _ = wait(en_curso, timeout=pool.timeout, return_when=FIRST_COMPLETED)
+            if not listos:
+                # Ninguno terminó a tiempo: el pool está colgado
+                pool._reciclar(next(iter(en_curso)).pool, terminar=True)
+                raise ErrorReporte("Los reportes tardaron demasiado en generarse.")
+            for futuro in listos:
+                en_curso.discard(futuro)
+                nombre, ruta = pool.resultado(futuro)
+                with abrir_temporal(ruta) as archivo:
+                    yield nombre, archivo
+    finally:
+        # Si el cliente cancela la descarga (o algo falla) no seguimos generando
+        # reportes y borramos los temporales que ya no se van a enviar
+        for futuro in en_curso:
+            futuro.cancel()
+            futuro.add_done_callback(_borrar_temporal)
+
+
+def _borrar_temporal(futuro):
+    if futuro.cancelled() or futuro.exception() is not None:
+        return
+    (_, ruta), _ = futuro.result()
+    if os.path.exists(ruta):
+        os.remove(ruta)
@@ -0,0 +1,636 @@
+# --------------------
+# Generación de reportes PDF
+# --------------------
+# Las funciones de este módulo no dependen del ``request``: escriben el PDF
+# en el objeto tipo archivo que reciben y regresan el nombre sugerido para la
+# descarga. Así pueden usarse igual desde las vistas que desde los procesos
+# de trabajo (ver ``core/renderizado.py``).
+import io
+from datetime import datetime
+
+import matplotlib
+import numpy as np
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
+
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import tendencias
+from .memoria import verificar_presupuesto
+from .models import AnexoRequerido, Documento, Usuario
+from .puntajes import obtener_puntajes, puntajes_de
+
+
+# Meses en español: strftime('%B') depende del locale del sistema (casi
+# siempre en inglés en los servidores)
+MESES = (
+    'enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
+    'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre',
+)
+
+
+def fecha_larga(fecha):
+    """``fecha`` como ``'05 de marzo de 2026'``."""
+    return f"{fecha.day:02d} de {MESES[fecha.month - 1]} de {fecha.year}"
+
+
+# --- Función auxiliar para Encabezado y Pie de Página ---
+def draw_footer_header(canvas, doc):
+    canvas.saveState()
+    
+    # Colores
+    VINO = colors.HexColor('#691C32')
+    
+    # --- ENCABEZADO ---
+    # Línea superior decorativa
+    canvas.setStrokeColor(VINO)
+    canvas.setLineWidth(3)
+    canvas.line(30, letter[1] - 40, letter[0] - 30, letter[1] - 40)
+    
+    # Texto pequeño arriba
+    canvas.setFont('Helvetica-Bold', 8)
+    canvas.setFillColor(colors.gray)
+    canvas.drawString(40, letter[1] - 30, "PLATAFORMA INTEGRAL DE GESTIÓN DOCUMENTAL")
+
+    # --- PIE DE PÁGINA ---
+    canvas.setLineWidth(1)
+    canvas.line(30, 50, letter[0] - 30, 50) # Línea abajo
+    
+    canvas.setFont('Helvetica', 8)
+    canvas.setFillColor(colors.gray)
+    canvas.drawString(30, 35, "Secretaría de las Mujeres del Estado de Zacatecas")
+    
+    # Número de página
+    page_num = canvas.getPageNumber()
+    canvas.drawRightString(letter[0] - 40, 35, f"Pág. {page_num}")
+    
+    canvas.restoreState()
+
+
+def grafica_tendencias(max_grupos=8):
+    """Gráfica de líneas con la evolución semanal por entidad federativa (None si no hay datos)."""
+    datos = tendencias.calcular_tendencias('entidad_federativa')
+    if len(datos['semanas']) == 0:
+        return None
+
+    semanas = datos['semanas'].astype('O')
+    porcentaje = datos['porcentaje']
+    # Solo los grupos con mayor avance para que la gráfica sea legible
+    orden = np.argsort(porcentaje[:, -1])[::-1][:max_grupos]
+
+    fig, ax = plt.subplots(figsize=(7, 4))
+    for i in orden:
+        ax.plot(semanas, porcentaje[i], linewidth=1, label=str(datos['grupos'][i]))
+    ax.plot(semanas, tendencias.porcentaje_total(datos), color='#691C32', linewidth=2.5, label='Total')
+    ax.set_ylim(0, 100)
+    ax.set_ylabel('% validado')
+    ax.set_title('Evolución semanal del cumplimiento', fontsize=10, color='#691C32', fontweight='bold')
+    ax.legend(fontsize=7, loc='upper left')
+    fig.autofmt_xdate()
+    plt.tight_layout()
+
+    img_buf = io.BytesIO()
+    plt.savefig(img_buf, format='png', dpi=100)
+    plt.close(fig)
+    img_buf.seek(0)
+    return Image(img_buf, width=450, height=260)
+
+
+def generar_reporte_general(salida):
+    """Escribe en ``salida`` el reporte ejecutivo general y regresa el nombre del archivo."""
+    # Entidades activas: las que se están dando de baja (core/bajas.py) ya no cuentan
+    documentos = Documento.objects.filter(usuario__is_active=True)
+
+    # 2. Configuración de Colores Institucionales
+    # Guinda oficial aproximado y Dorado
+    COLOR_VINO = colors.HexColor('#691C32') 
+    COLOR_DORADO = colors.HexColor('#BC955C')
+    COLOR_GRIS_TXT = colors.HexColor('#404040')
+    
+    # Colores para Matplotlib (hex strings)
+    HEX_VINO = '#691C32'
+    HEX_DORADO = '#BC955C'
+    HEX_GRIS = '#9E9E9E'
+
+    # 3. Configuración del Documento
+    doc = SimpleDocTemplate(
+        salida,
+        pagesize=letter,
+        rightMargin=40, leftMargin=40,
+        topMargin=60, bottomMargin=50
+    )
+
+    # 4. Estilos de Texto
+    styles = getSampleStyleSheet()
+    
+    style_titulo = ParagraphStyle(
+        'TituloPersonalizado',
+        parent=styles['Heading1'],
+        fontName='Helvetica-Bold',
+        fontSize=18,
+        textColor=COLOR_VINO,
+        alignment=TA_CENTER,
+        spaceAfter=10
+    )
+    
+    style_subtitulo = ParagraphStyle(
+        'SubTituloPersonalizado',
+        parent=styles['Heading2'],
+        fontName='Helvetica',
+        fontSize=12,
+        textColor=COLOR_DORADO,
+        alignment=TA_CENTER,
+        spaceAfter=20
+    )
+
+    style_header_tabla = ParagraphStyle(
+        'HeaderTabla',
+        fontName='Helvetica-Bold',
+        fontSize=10,
+        textColor=colors.white,
+        alignment=TA_CENTER
+    )
+
+    style_celda = ParagraphStyle(
+        'CeldaTabla',
+        fontName='Helvetica',
+        fontSize=9,
+        textColor=COLOR_GRIS_TXT,
+        alignment=TA_CENTER,
+        leading=11  # Espaciado entre líneas
+    )
+    
+    # Estilo especial para celdas de texto largo (alineado a la izquierda)
+    style_celda_left = ParagraphStyle(
+        'CeldaTablaLeft',
+        parent=style_celda,
+        alignment=TA_LEFT
+    )
+
+    elements = []
+    
+    # --- CONTENIDO ---
+
+    # Título Principal
+    elements.append(Paragraph("Secretaría de las Mujeres", style_titulo))
+    elements.append(Paragraph("Reporte Ejecutivo de Cumplimiento Documental", style_subtitulo))
+    
+    ahora = datetime.now()
+    fecha_str = ahora.strftime("%d/%m/%Y a las %H:%M hrs")
+    elements.append(Paragraph(f"<b>Fecha de corte:</b> {fecha_str}", style_celda))
+    elements.append(Spacer(1, 20))
+
+    # --- CALCULOS CORREGIDOS (General) ---
+    entidades = Usuario.objects.filter(rol='usuario', is_active=True)
+    total_entidades = entidades.count()
+    
+    # 1. Documentos esperados
+    # OJO: Si tu sistema crea los registros vacíos desde el inicio, usa:
+    total_esperado = documentos.count()
+    # SI NO crea registros vacíos (solo se crean al subir), lo "esperado" sería:
+    # total_esperado = total_entidades * AnexoRequerido.objects.count()
+
+    # 2. Contamos directamente por estatus (Más seguro)
+    total_validados = documentos.filter(estado='validado').count()
+    total_rechazados = documentos.filter(estado='rechazado').count()
+    
+    # IMPORTANTE: Usa el nombre exacto de tu estatus en la BD ('pendiente', 'en_revision', etc.)
+    total_en_revision = documentos.filter(estado='pendiente').count()
+    
+    # 3. Total subidos (los que ya tienen archivo)
+    total_subidos = documentos.exclude(archivo='').count()
+    
+    # 4. Porcentajes (motor de puntajes: general, solo obligatorios y ponderado)
+    puntajes = obtener_puntajes()
+    puntaje_global = puntajes['global']
+
+    # --- TABLA RESUMEN EJECUTIVO ---
+    # Usamos Paragraph dentro de la tabla para mejor formato
+    data_resumen = [
+        [Paragraph('Indicador', style_header_tabla), Paragraph('Valor', style_header_tabla)],
+        ['Total de Entidades', total_entidades],
+        ['Documentos Esperados (Total)', total_esperado],
+        ['Documentos Cargados', total_subidos],
+        ['Documentos Validados', total_validados],
+        ['Documentos con Observaciones', total_rechazados],
+        ['Pendientes de Revisión', total_en_revision],
+        ['% Obligatorios Validados', f"{puntaje_global['obligatorios']:.1f}%"],
+        ['Puntaje Ponderado', f"{puntaje_global['ponderado']:.1f}%"],
+        ['% Avance Global', f"{puntaje_global['general']:.1f}%"]
+    ]
+
+    t_resumen = Table(data_resumen, colWidths=[300, 100])
+    t_resumen.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), COLOR_VINO), # Encabezado Guinda
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, -1), (-1, -1), colors.whitesmoke), # Fila final gris claro
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'), # Fila final negrita
+    ]))
+    
+    elements.append(t_resumen)
+    elements.append(Spacer(1, 25))
+
+    # --- GRAFICOS (Matplotlib Limpio) ---
+    # Preparamos datos
+    labels = ['Validados', 'Con Observaciones', 'En Revisión', 'Faltantes']
+    # Faltantes = Esperados - Subidos
+    total_faltantes = total_esperado - total_subidos
+    sizes = [total_validados, total_rechazados, total_en_revision, total_faltantes]
+    colors_pie = [HEX_DORADO, '#D32F2F', '#FFA000', '#E0E0E0'] # Dorado, Rojo, Ambar, Gris claro
+
+    # Filtrar datos con valor 0 para que no salgan en el gráfico
+    final_labels = []
+    final_sizes = []
+    final_colors = []
+    for l, s, c in zip(labels, sizes, colors_pie):
+        if s > 0:
+            final_labels.append(l)
+            final_sizes.append(s)
+            final_colors.append(c)
+
+    if final_sizes:
+        plt.figure(figsize=(6, 3)) # Ancho, Alto (pulgadas)
+        # Donut Chart (más moderno que el Pie normal)
+        plt.pie(final_sizes, labels=final_labels, colors=final_colors, autopct='%1.1f%%', 
+                startangle=140, pctdistance=0.85, textprops={'fontsize': 8})
+        
+        # Círculo blanco al centro para hacer la "Dona"
+        centre_circle = plt.Circle((0,0),0.70,fc='white')
+        fig = plt.gcf()
+        fig.gca().add_artist(centre_circle)
+        
+        plt.title('Estatus Documental Global', fontsize=10, color=HEX_VINO, fontweight='bold')
+        plt.axis('equal')
+        plt.tight_layout()
+
+        img_buf = io.BytesIO()
+        plt.savefig(img_buf, format='png', dpi=100)
+        plt.close()
+        img_buf.seek(0)
+        elements.append(Image(img_buf, width=400, height=200))
+        elements.append(Spacer(1, 20))
+
+
+    # --- TABLA DETALLADA POR ENTIDAD ---
+    elements.append(Paragraph("Desglose por Entidad", ParagraphStyle('h3', parent=styles['Normal'], fontSize=14, textColor=COLOR_VINO, spaceAfter=10)))
+
+    # Encabezados
+    data_entidades = [[
+        Paragraph('Entidad', style_header_tabla),
+        Paragraph('Cargados', style_header_tabla),
+        Paragraph('Validados', style_header_tabla),
+        Paragraph('Obs.', style_header_tabla),
+        Paragraph('Avance', style_header_tabla),
+        Paragraph('Oblig.', style_header_tabla)
+    ]]
+
+    # Un solo query con los conteos de todas las entidades
+    conteos = entidades.annotate(
+        cargados=Count('documento', filter=Q(documento__archivo__gt='')),
+        rechazados=Count('documento', filter=Q(documento__estado='rechazado')),
+    ).order_by('username')
+
+    for ent in conteos:
+        puntaje = puntajes_de(ent.id, puntajes)
+        cargados = ent.cargados
+        validados = puntaje['validados']
+        rechazados = ent.rechazados
+        pct = puntaje['general']
+        
+        # Color del texto de avance según porcentaje
+        color_avance = "black"
+        if pct == 100: color_avance = "green"
+        elif pct < 50: color_avance = "red"
+
+        # IMPORTANTE: Usamos Paragraph(ent.username) para que si el nombre es largo, se ajuste y no rompa la tabla
+        row = [
+            Paragraph(ent.username, style_celda_left), # Alineado izquierda
+            Paragraph(str(cargados), style_celda),
+            Paragraph(str(validados), style_celda),
+            Paragraph(str(rechazados), style_celda),
+            Paragraph(f"<font color={color_avance}>{pct:.0f}%</font>", style_celda),
+            Paragraph(f"{puntaje['obligatorios']:.0f}%", style_celda)
+        ]
+        data_entidades.append(row)
+
+    # Definimos anchos fijos para forzar el ajuste de texto
+    col_widths = [180, 60, 60, 50, 60, 60]
+    
+    t_entidades = Table(data_entidades, colWidths=col_widths, repeatRows=1)
+    t_entidades.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), COLOR_VINO),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'), # Centrado vertical
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.whitesmoke]), # Filas acebradas
+    ]))
+
+    elements.append(t_entidades)
+
+    # --- EVOLUCIÓN SEMANAL (por entidad federativa) ---
+    grafica = grafica_tendencias()
+    if grafica is not None:
+        elements.append(PageBreak())
+        elements.append(Paragraph("Evolución del Cumplimiento", ParagraphStyle('h3', parent=styles['Normal'], fontSize=14, textColor=COLOR_VINO, spaceAfter=10)))
+        elements.append(Paragraph("Porcentaje acumulado de documentos validados por semana.", style_celda))
+        elements.append(Spacer(1, 10))
+        elements.append(grafica)
+
+    verificar_presupuesto()
+    # 5. Función para construir el PDF
+    doc.build(elements, onFirstPage=draw_footer_header, onLaterPages=draw_footer_header)
+
+    return f"Reporte_Semujer_{slugify(fecha_str)}.pdf"
+
+
+def conteos_por_anexo():
+    """Anexos con sus documentos cargados, validados, rechazados y pendientes.
+
+    Un solo query (GROUP BY anexo). Como el reporte general y la matriz de
+    puntajes, solo cuenta entidades activas: las cuentas de administración y
+    las que se están dando de baja (core/bajas.py) quedan fuera.
+    """
+    activas = Q(documento__usuario__is_active=True, documento__usuario__rol='usuario')
+    return AnexoRequerido.objects.annotate(
+        cargados=Count('documento', filter=activas & Q(documento__archivo__gt='')),
+        cumplieron=Count('documento', filter=activas & Q(documento__estado='validado')),
+        rechazados=Count('documento', filter=activas & Q(documento__estado='rechazado')),
+        pendientes=Count('documento', filter=activas & Q(documento__estado='pendiente', documento__archivo__gt='')),
+    ).order_by('nombre')
+
+
+def generar_reporte_anexos(salida):
+    """Escribe en ``salida`` el reporte de cumplimiento por anexo y regresa el nombre del archivo."""
+    anexos = conteos_por_anexo()
+
+    nombres, cumplieron = [], []
+    pdf = SimpleDocTemplate(salida, pagesize=letter)
+    styles = getSampleStyleSheet()
+    style_celda = ParagraphStyle('CeldaAnexo', parent=styles['Normal'], fontSize=9, leading=11)
+    elements = []
+
+    fecha_str = fecha_larga(timezone.localtime())
+    elements.append(Paragraph("Reporte de Cumplimiento de Anexos", styles['Title']))
+    elements.append(Paragraph(f"Fecha de generación: {fecha_str}", styles['Normal']))
+    elements.append(Spacer(1, 20))
+
+    # Tabla resumen
+    tabla_data = [["Anexo", "Descripción", "Cargados", "Validados", "Rechazados", "Pendientes"]]
+    for anexo in anexos:
+        nombres.append(anexo.nombre)
+        cumplieron.append(anexo.cumplieron)
+        tabla_data.append([
+            Paragraph(anexo.nombre, style_celda),
+            Paragraph(anexo.descripcion or "—", style_celda),
+            anexo.cargados,
+            anexo.cumplieron,
+            anexo.rechazados,
+            anexo.pendientes,
+        ])
+
+    tabla = Table(tabla_data, colWidths=[130, 170, 55, 55, 60, 60], hAlign='LEFT', repeatRows=1)
+    tabla.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#7B1F26")),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (2, 1), (-1, -1), 'CENTER'),
+    ]))
+    elements.append(Paragraph("Detalle de cumplimiento por anexo:", styles['Heading2']))
+    elements.append(tabla)
+    elements.append(Spacer(1, 20))
+
+    # Gráfico (entidades que cumplieron por anexo)
+    if nombres:
+        alto = max(3, 0.35 * len(nombres))
+        fig, ax = plt.subplots(figsize=(6, alto))
+        ax.barh(nombres, cumplieron, color="#7B1F26")
+        ax.invert_yaxis()  # mismo orden que la tabla
+        ax.set_xlabel("Número de entidades")
+        ax.set_title("Cumplimiento por anexo")
+        plt.tight_layout()
+        img_buffer = io.BytesIO()
+        plt.savefig(img_buffer, format='png')
+        plt.close(fig)
+        img_buffer.seek(0)
+        elements.append(Image(img_buffer, width=400, height=400 * alto / 6))
+
+    verificar_presupuesto()
+    pdf.build(elements)
+
+    return f"Reporte_Anexos_{slugify(fecha_str)}.pdf"
+
+
+# --- Encabezado y pie de página del reporte individual ---
+def draw_footer_header_entidad(canvas, doc):
+    canvas.saveState()
+    VINO = colors.HexColor('#691C32')
+
+    # Header (Línea y Texto)
+    canvas.setStrokeColor(VINO)
+    canvas.setLineWidth(3)
+    canvas.line(40, letter[1] - 40, letter[0] - 40, letter[1] - 40)
+
+    canvas.setFont('Helvetica-Bold', 8)
+    canvas.setFillColor(colors.gray)
+    canvas.drawString(40, letter[1] - 30, "PLATAFORMA INTEGRAL DE GESTIÓN DOCUMENTAL")
+
+    # Footer (Línea, Texto y Paginado)
+    canvas.setLineWidth(1)
+    canvas.line(40, 50, letter[0] - 40, 50)
+
+    canvas.setFont('Helvetica', 8)
+    canvas.setFillColor(colors.gray)
+    canvas.drawString(40, 35, "Secretaría de las Mujeres del Estado de Zacatecas")
+
+    page_num = canvas.getPageNumber()
+    canvas.drawRightString(letter[0] - 40, 35, f"Pág. {page_num}")
+
+    canvas.restoreState()
+
+
+def generar_reporte_entidad(entidad, salida):
+    """Escribe en ``salida`` el reporte individual de ``entidad`` y regresa el nombre del archivo."""
+    # Configuración de Colores
+    COLOR_VINO = colors.HexColor('#691C32')
+    COLOR_DORADO = colors.HexColor('#BC955C')
+    COLOR_GRIS_TXT = colors.HexColor('#404040')
+    HEX_DORADO = '#BC955C'
+    HEX_VINO = '#691C32'
+
+    # IMPORTANTE: Usamos la variable 'pdf' para el objeto del reporte
+    pdf = SimpleDocTemplate(
+        salida,
+        pagesize=letter,
+        rightMargin=40, leftMargin=40,
+        topMargin=60, bottomMargin=50
+    )
+
+    styles = getSampleStyleSheet()
+
+    # Estilos Personalizados
+    style_titulo = ParagraphStyle('Titulo', parent=styles['Heading1'], fontName='Helvetica-Bold', fontSize=16, textColor=COLOR_VINO, alignment=TA_CENTER, spaceAfter=5)
+    style_subtitulo = ParagraphStyle('SubTitulo', parent=styles['Heading2'], fontName='Helvetica', fontSize=12, textColor=COLOR_DORADO, alignment=TA_CENTER, spaceAfter=15)
+    style_header_tabla = ParagraphStyle('HeaderTabla', fontName='Helvetica-Bold', fontSize=10, textColor=colors.white, alignment=TA_CENTER)
+    style_celda = ParagraphStyle('CeldaTabla', fontName='Helvetica', fontSize=9, textColor=COLOR_GRIS_TXT, alignment=TA_CENTER, leading=11)
+
+    # Estilo clave para que el nombre del anexo no se corte
+    style_celda_left = ParagraphStyle('CeldaTablaLeft', parent=style_celda, alignment=TA_LEFT)
+
+    elements = []
+
+    # --- CONTENIDO ---
+    elements.append(Paragraph("Secretaría de las Mujeres", style_titulo))
+    elements.append(Paragraph(f"Reporte Individual: {entidad.username}", style_subtitulo))
+
+    ahora = datetime.now()
+    fecha_str = ahora.strftime("%d/%m/%Y")
+    elements.append(Paragraph(f"<b>Fecha de emisión:</b> {fecha_str}", style_celda))
+    elements.append(Spacer(1, 20))
+
+    # --- CÁLCULOS ---
+    anexos_requeridos = AnexoRequerido.objects.all()
+    docs_entidad = Documento.objects.filter(usuario=entidad)
+
+    total_esperados = anexos_requeridos.count()
+
+    # Contamos DIRECTAMENTE de la base de datos para evitar números negativos
+    en_revision = docs_entidad.filter(estado='pendiente').count()
+    validados = docs_entidad.filter(estado='validado').count()
+    rechazados = docs_entidad.filter(estado='rechazado').count()
+
+    # Total subidos es la suma real de lo que tienes (o usa exclude(archivo='') )
+    total_subidos = docs_entidad.exclude(archivo='').count()
+
+    # Faltantes
+    faltantes = total_esperados - total_subidos
+    if faltantes < 0: faltantes = 0
+
+    puntaje = puntajes_de(entidad.id)
+
+    # --- TABLA RESUMEN ---
+    data_resumen = [
+        [Paragraph('Indicador', style_header_tabla), Paragraph('Valor', style_header_tabla)],
+        ['Documentos Requeridos', total_esperados],
+        ['Documentos Cargados', total_subidos],
+        ['Documentos Validados', validados],
+        ['Con Observaciones', rechazados],
+        ['En Proceso de Revisión', en_revision],
+        ['Pendientes de Carga', faltantes],
+        ['% Obligatorios Validados', f"{puntaje['obligatorios']:.1f}%"],
+        ['Puntaje Ponderado', f"{puntaje['ponderado']:.1f}%"],
+        ['% Cumplimiento Validado', f"{puntaje['general']:.1f}%"]
+    ]
+
+    t_resumen = Table(data_resumen, colWidths=[250, 100])
+    t_resumen.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), COLOR_VINO),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, -1), (-1, -1), colors.whitesmoke),
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ]))
+    elements.append(t_resumen)
+    elements.append(Spacer(1, 20))
+
+    # --- GRÁFICO (Dona) ---
+    labels = ['Validados', 'Observaciones', 'En Revisión', 'Faltantes']
+    sizes = [validados, rechazados, en_revision, faltantes]
+    colors_pie = [HEX_DORADO, '#D32F2F', '#FFA000', '#E0E0E0']
+
+    f_labels, f_sizes, f_colors = [], [], []
+    for l, s, c in zip(labels, sizes, colors_pie):
+        if s > 0:
+            f_labels.append(l)
+            f_sizes.append(s)
+            f_colors.append(c)
+
+    if f_sizes:
+        plt.figure(figsize=(6, 3))
+        plt.pie(f_sizes, labels=f_labels, colors=f_colors, autopct='%1.1f%%',
+                startangle=140, pctdistance=0.85, textprops={'fontsize': 8})
+        plt.gca().add_artist(plt.Circle((0,0),0.70,fc='white'))
+        plt.title('Estado Actual de la Documentación', fontsize=10, color=HEX_VINO, fontweight='bold')
+        plt.axis('equal')
+        plt.tight_layout()
+
+        img_buf = io.BytesIO()
+        plt.savefig(img_buf, format='png', dpi=100)
+        plt.close()
+        img_buf.seek(0)
+        elements.append(Image(img_buf, width=400, height=200))
+        elements.append(Spacer(1, 20))
+
+    # --- TABLA DETALLE ---
+    elements.append(Paragraph("Desglose por Anexo", ParagraphStyle('h3', parent=styles['Normal'], fontSize=14, textColor=COLOR_VINO, spaceAfter=10)))
+
+    data_detalle = [[
+        Paragraph('#', style_header_tabla),
+        Paragraph('Nombre del Anexo', style_header_tabla),
+        Paragraph('Estatus', style_header_tabla)
+    ]]
+
+    # Un solo query para todos los documentos de la entidad (antes era uno por anexo)
+    docs_por_anexo = {d.anexo_id: d for d in docs_entidad}
+
+    for idx, anexo in enumerate(anexos_requeridos, start=1):
+        # Usamos 'doc_obj' para no confundir con variables externas
+        doc_obj = docs_por_anexo.get(anexo.id)
+        estado_texto = "Pendiente de Carga"
+        color_texto = "grey"
+
+        if doc_obj:
+            if doc_obj.archivo:
+                if doc_obj.estado == 'validado':
+                    estado_texto = "VALIDADO"
+                    color_texto = "green"
+                elif doc_obj.estado == 'rechazado':
+                    estado_texto = "CON OBSERVACIONES"
+                    color_texto = "red"
+                else:
+                    estado_texto = "En Revisión"
+                    color_texto = "#FF8F00"
+            else:
+                estado_texto = "Sin Archivo"
+                color_texto = "grey"
+
+        row = [
+            str(idx),
+            # Paragraph permite que el texto largo baje de línea
+            Paragraph(anexo.nombre, style_celda_left),
+            Paragraph(f"<font color={color_texto}><b>{estado_texto}</b></font>", style_celda)
+        ]
+        data_detalle.append(row)
+
+    col_widths = [30, 280, 130]
+    t_detalle = Table(data_detalle, colWidths=col_widths, repeatRows=1)
+    t_detalle.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), COLOR_VINO),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (0, 0), (0, -1), 'CENTER'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.whitesmoke]),
+    ]))
+
+    elements.append(t_detalle)
+
+    # --- GENERAR PDF ---
+    verificar_presupuesto()
+    pdf.build(elements, onFirstPage=draw_footer_header_entidad, onLaterPages=draw_footer_header_entidad)
+
+    return f"Reporte_{entidad.username}_{slugify(fecha_str)}.pdf"
@@ -0,0 +1,234 @@
+# --------------------
+# Mantenimiento del histórico de anexos (AnexoHistorico)
+# --------------------
+# Trabajos que corren como TareaFondo (ver core/tareas.py) y comparación
+# entre dos fechas del histórico.
+import hashlib
+import logging
+from concurrent.futures import wait
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Window
+from django.db.models.functions import ExtractYear, RowNumber
+from django.utils import timezone
+
+from . import tareas
+from .models import AnexoHistorico, TareaFondo
+
+logger = logging.getLogger(__name__)
+
+
+def filtrar_respaldos(anio=None, entidad_id=None, anexo_id=None):
+    respaldos = AnexoHistorico.objects.all()
+    if anio:
+        respaldos = respaldos.filter(fecha_subida__year=int(anio))
+    if entidad_id:
+        respaldos = respaldos.filter(entidad_id=int(entidad_id))
+    if anexo_id:
+        respaldos = respaldos.filter(anexo_requerido_id=int(anexo_id))
+    return respaldos
+
+
+def _borrar_lote(filas):
+    """Borra los registros ``(id, archivo)`` en una transacción y después sus archivos."""
+    with transaction.atomic():
+        AnexoHistorico.objects.filter(id__in=[pk for pk, _ in filas]).delete()
+    wait(tareas.borrar_archivos([ruta for _, ruta in filas if ruta]))
+
+
+def purgar_respaldos(tarea):
+    """Borra los respaldos que cumplen ``tarea.parametros`` (``anio``, ``entidad_id``).
+
+    Recorre los ids por lotes; en cada lote borra los registros en una
+    transacción y después sus archivos en paralelo (pool de core/tareas.py),
+    así que si se interrumpe a la mitad no quedan registros sin archivo.
+    """
+    lote = getattr(settings, 'RESPALDOS_PURGA_LOTE', 1000)
+    respaldos = filtrar_respaldos(**tarea.parametros).order_by('id')
+    tareas.avanzar(tarea, 0, total=respaldos.count())
+
+    procesados = ultimo = 0
+    while True:
+        filas = list(respaldos.filter(id__gt=ultimo).values_list('id', 'archivo')[:lote])
+        if not filas:
+            break
+        ultimo = filas[-1][0]
+        _borrar_lote(filas)
+        procesados += len(filas)
+        tareas.avanzar(tarea, procesados)
+
+    return f"Se eliminaron {procesados} respaldos y sus archivos."
+
+
+# --------------------
+# Política de retención
+# --------------------
+# Por cada (entidad, anexo) se conservan las ``ultimas`` versiones más
+# recientes y, si ``una_por_anio``, la más reciente de cada año; el resto se
+# borra.
+#
+# Cada corrida guarda en sus parámetros una marca: la política aplicada y el
+# id más alto del histórico cuando empezó. La siguiente corrida con la misma
+# política solo revisa los grupos con respaldos posteriores a esa marca; los
+# demás ya cumplían y no cambiaron (aunque conserven más de ``ultimas`` por
+# las copias anuales). Sin marca, o con otra política, se revisa todo.
+def politica_retencion(parametros=None):
+    """``(ultimas, una_por_anio)`` de RESPALDOS_RETENCION; ``parametros`` lo sobrescribe."""
+    retencion = {**(getattr(settings, 'RESPALDOS_RETENCION', None) or {}), **(parametros or {})}
+    return retencion.get('ultimas'), retencion.get('una_por_anio', True)
+
+
+def excedentes(entidad_ids, ultimas, una_por_anio=True):
+    """``(id, archivo)`` de los respaldos de ``entidad_ids`` que la política no conserva."""
+    grupo = [F('entidad_id'), F('anexo_requerido_id')]
+    orden = [F('fecha_subida').desc(), F('id').desc()]
+    respaldos = AnexoHistorico.objects.filter(entidad_id__in=entidad_ids).annotate(
+        reciente=Window(RowNumber(), partition_by=grupo, order_by=orden),
+    )
+    condicion = Q(reciente__gt=ultimas)
+    if una_por_anio:
+        respaldos = respaldos.annotate(
+            del_anio=Window(RowNumber(), partition_by=grupo + [ExtractYear('fecha_subida')], order_by=orden),
+        )
+        condicion &= Q(del_anio__gt=1)
+    return list(respaldos.filter(condicion).values_list('id', 'archivo'))
+
+
+def _marca_anterior(tarea, politica):
+    """Id hasta el que la última compactación terminada aplicó ``politica`` (0 si no hay)."""
+    anterior = (
+        TareaFondo.objects.filter(tipo='compactar_respaldos', estado='terminada')
+        .exclude(id=tarea.id).order_by('-fecha_fin', '-id').first()
+    )
+    marca = (anterior.parametros or {}).get('marca') if anterior else None
+    if not marca or marca.get('politica') != politica:
+        return 0
+    return marca.get('hasta_id') or 0
+
+
+def compactar_respaldos(tarea):
+    """Aplica la política de retención a los grupos que la exceden, por lotes de entidades.
+
+    Con ``parametros['completa']`` revisa todos los grupos aunque haya una marca.
+    """
+    ultimas, una_por_anio = politica_retencion(tarea.parametros)
+    if not ultimas:
+        return "No hay política de retención configurada (RESPALDOS_RETENCION)."
+    lote = getattr(settings, 'RESPALDOS_COMPACTACION_ENTIDADES', 50)
+
+    # La marca se toma antes de elegir los grupos: lo que llegue durante la
+    # corrida queda para la siguiente
+    politica = [ultimas, una_por_anio]
+    hasta_id = AnexoHistorico.objects.aggregate(maximo=Max('id'))['maximo'] or 0
+    desde_id = 0 if tarea.parametros.get('completa') else _marca_anterior(tarea, politica)
+    tarea.parametros = {**tarea.parametros, 'marca': {'politica': politica, 'hasta_id': hasta_id}}
+    TareaFondo.objects.filter(id=tarea.id).update(parametros=tarea.parametros)
+
+    entidad_ids = sorted(set(
+        AnexoHistorico.objects.values('entidad_id', 'anexo_requerido_id')
+        .annotate(versiones=Count('id'), ultimo_id=Max('id'))
+        .filter(versiones__gt=ultimas, ultimo_id__gt=desde_id)
+        .values_list('entidad_id', flat=True)
+    ))
+    tareas.avanzar(tarea, 0, total=len(entidad_ids))
+
+    borrados = 0
+    for i in range(0, len(entidad_ids), lote):
+        filas = excedentes(entidad_ids[i:i + lote], ultimas, una_por_anio)
+        for j in range(0, len(filas), 1000):
+            _borrar_lote(filas[j:j + 1000])
+        borrados += len(filas)
+        tareas.avanzar(tarea, min(i + lote, len(entidad_ids)))
+
+    return f"Se eliminaron {borrados} respaldos fuera de la política de retención."
+
+
+# --------------------
+# Diferencias entre dos fechas
+# --------------------
+# El estado del histórico en una fecha es, por (entidad, anexo), el respaldo
+# más reciente hasta el final de ese día. Si en ambas fechas es el mismo
+# registro no cambió; si son registros distintos se comparan por
+# hash_contenido, que se calcula una sola vez y queda guardado.
+ESTADOS_DIFERENCIA = [
+    ('agregado', 'Agregado'),
+    ('eliminado', 'Eliminado'),
+    ('cambiado', 'Cambiado'),
+    ('sin_cambios', 'Sin cambios'),
+]
+
+
+def _lotes(ids, tam=500):
+    ids = list(ids)
+    for i in range(0, len(ids), tam):
+        yield ids[i:i + tam]
+
+
+def hash_archivo(ruta):
+    digest = hashlib.sha256()
+    with default_storage.open(ruta, 'rb') as archivo:
+        for bloque in archivo.chunks():
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def calcular_hashes(respaldo_ids):
+    """``{id: hash_contenido}``; calcula y guarda los que aún no están (vacío si no se pudo leer)."""
+    hashes = {}
+    for lote in _lotes(respaldo_ids):
+        respaldos = list(AnexoHistorico.objects.filter(id__in=lote).only('id', 'archivo', 'hash_contenido'))
+        nuevos = []
+        for respaldo in respaldos:
+            if not respaldo.hash_contenido:
+                try:
+                    respaldo.hash_contenido = hash_archivo(respaldo.archivo.name)
+                    nuevos.append(respaldo)
+                except OSError:
+                    logger.warning("No se pudo leer el respaldo %s (%s)", respaldo.id, respaldo.archivo.name)
+            hashes[respaldo.id] = respaldo.hash_contenido
+        AnexoHistorico.objects.bulk_update(nuevos, ['hash_contenido'], batch_size=500)
+    return hashes
+
+
+def instantanea(fecha):
+    """``{(entidad_id, anexo_id): respaldo_id}`` con el estado del histórico al cierre de ``fecha``."""
+    hasta = timezone.make_aware(datetime.combine(fecha + timedelta(days=1), time.min))
+    filas = (
+        AnexoHistorico.objects.filter(fecha_subida__lt=hasta)
+        .annotate(reciente=Window(
+            RowNumber(), partition_by=[F('entidad_id'), F('anexo_requerido_id')],
+            order_by=[F('fecha_subida').desc(), F('id').desc()],
+        ))
+        .filter(reciente=1).values_list('entidad_id', 'anexo_requerido_id', 'id')
+    )
+    return {(entidad_id, anexo_id): pk for entidad_id, anexo_id, pk in filas}
+
+
+def diferencias(fecha_a, fecha_b):
+    """Lista de ``{'entidad_id', 'anexo_id', 'estado', 'respaldo_a', 'respaldo_b'}`` entre dos fechas."""
+    antes, despues = instantanea(fecha_a), instantanea(fecha_b)
+
+    distintos = {pk for clave in antes.keys() & despues.keys()
+                 if antes[clave] != despues[clave] for pk in (antes[clave], despues[clave])}
+    hashes = calcular_hashes(distintos)
+
+    resultado = []
+    for clave in sorted(antes.keys() | despues.keys()):
+        a, b = antes.get(clave), despues.get(clave)
+        if a is None:
+            estado = 'agregado'
+        elif b is None:
+            estado = 'eliminado'
+        elif a == b or (hashes.get(a) and hashes.get(a) == hashes.get(b)):
+            estado = 'sin_cambios'
+        else:
+            # Sin hash (archivo ilegible) se reporta como cambiado
+            estado = 'cambiado'
+        resultado.append({
+            'entidad_id': clave[0], 'anexo_id': clave[1], 'estado': estado,
+            'respaldo_a': a, 'respaldo_b': b,
+        })
+    return resultado
@@ -0,0 +1,46 @@
+# --------------------
+# Señales: invalidación de cachés derivadas de los documentos
+# --------------------
+# Cada registro guardado o borrado invalida los puntajes. Los borrados por
+# lotes (p. ej. core/bajas.py) usan ``invalidacion_agrupada`` para invalidar
+# una sola vez por lote en lugar de una vez por registro.
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import AnexoRequerido, Documento, Usuario
+
+_local = threading.local()
+
+
+def _invalidar():
+    # Import local: los puntajes usan NumPy y no se necesita al arrancar
+    from .puntajes import invalidar
+    invalidar()
+
+
+@contextmanager
+def invalidacion_agrupada():
+    """Dentro del bloque (en este hilo) las señales solo anotan; al salir se invalida una vez."""
+    externo = getattr(_local, 'agrupando', False)
+    if not externo:
+        _local.agrupando, _local.pendiente = True, False
+    try:
+        yield
+    finally:
+        if not externo:
+            _local.agrupando = False
+            if _local.pendiente:
+                _invalidar()
+
+
+@receiver([post_save, post_delete], sender=Documento)
+@receiver([post_save, post_delete], sender=AnexoRequerido)
+@receiver([post_save, post_delete], sender=Usuario)
+def invalidar_puntajes(sender, **kwargs):
+    if getattr(_local, 'agrupando', False):
+        _local.pendiente = True
+        return
+    _invalidar()
@@ -0,0 +1,165 @@
+# --------------------
+# Tareas en segundo plano dentro del proceso web
+# --------------------
+# Borrar miles de archivos dentro de la petición la hace lenta, y borrarlos
+# antes de confirmar la transacción deja disco y base a medias si algo falla
+# después. ``borrar_al_confirmar`` espera a que la transacción se confirme
+# (``transaction.on_commit``; si se revierte no se borra nada) y reparte el
+# trabajo por lotes en un pool de hilos de tamaño fijo.
+#
+# Los trabajos largos (p. ej. purgar respaldos o dar de baja a un usuario) se
+# registran como ``TareaFondo``: ``lanzar`` crea el registro y, al confirmar la
+# transacción, lo ejecuta en otro pool de hilos. El trabajo reporta su avance con
+# ``avanzar`` y la página correspondiente lo consulta en ``estado_tarea``.
+#
+# IMPORTANTE: los hilos viven en el proceso web. Si el worker se reinicia,
+# una tarea 'en_curso' queda así; los trabajos procesan por lotes lo que aún
+# existe, así que basta con lanzarlos de nuevo. ``TareaFondo.abandonada``
+# detecta esas tareas (sin avance en TAREAS_FONDO_ABANDONO_MIN minutos).
+import atexit
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import TareaFondo
+
+logger = logging.getLogger(__name__)
+
+# Función que ejecuta cada tipo de TareaFondo; recibe la tarea
+TRABAJOS = {
+    'purgar_respaldos': 'core.respaldos.purgar_respaldos',
+    'compactar_respaldos': 'core.respaldos.compactar_respaldos',
+    'eliminar_usuario': 'core.bajas.eliminar_usuario',
+}
+
+# Rutas por tarea enviada al pool
+LOTE_BORRADO = 200
+
+_pool = None
+_pool_tareas = None
+_pool_lock = threading.Lock()
+_pendientes = set()
+
+
+def _obtener_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ARCHIVOS_BORRADO_HILOS', 4),
+                thread_name_prefix='borrado_archivos',
+            )
+            # Al salir el worker se terminan los borrados pendientes
+            atexit.register(_pool.shutdown, wait=True)
+        return _pool
+
+
+def _borrar_lote(rutas):
+    borrados = 0
+    for ruta in rutas:
+        try:
+            default_storage.delete(ruta)
+            borrados += 1
+        except OSError:
+            logger.exception("No se pudo borrar %s", ruta)
+    return borrados
+
+
+def borrar_archivos(rutas):
+    """Envía al pool el borrado de ``rutas`` y regresa los futuros."""
+    pool = _obtener_pool()
+    futuros = []
+    for i in range(0, len(rutas), LOTE_BORRADO):
+        futuro = pool.submit(_borrar_lote, rutas[i:i + LOTE_BORRADO])
+        with _pool_lock:
+            _pendientes.add(futuro)
+        futuro.add_done_callback(_terminado)
+        futuros.append(futuro)
+    return futuros
+
+
+def _terminado(futuro):
+    with _pool_lock:
+        _pendientes.discard(futuro)
+
+
+def borrar_al_confirmar(rutas, using=None):
+    """Borra ``rutas`` en segundo plano cuando se confirme la transacción en curso."""
+    rutas = [r for r in rutas if r]
+    if rutas:
+        transaction.on_commit(lambda: borrar_archivos(rutas), using=using)
+
+
+def esperar(timeout=None):
+    """Espera a que terminen los borrados enviados hasta ahora (pruebas, comandos)."""
+    with _pool_lock:
+        pendientes = list(_pendientes)
+    wait(pendientes, timeout=timeout)
+
+
+# --------------------
+# TareaFondo
+# --------------------
+def _obtener_pool_tareas():
+    global _pool_tareas
+    with _pool_lock:
+        if _pool_tareas is None:
+            _pool_tareas = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'TAREAS_FONDO_HILOS', 2),
+                thread_name_prefix='tareas_fondo',
+            )
+            atexit.register(_pool_tareas.shutdown, wait=False, cancel_futures=True)
+        return _pool_tareas
+
+
+def lanzar(tipo, parametros=None, usuario=None):
+    """Registra una tarea y la ejecuta en segundo plano al confirmar la transacción."""
+    tarea = TareaFondo.objects.create(
+        tipo=tipo, parametros=parametros or {},
+        creada_por=usuario if usuario is not None and usuario.is_authenticated else None,
+    )
+    transaction.on_commit(lambda: _obtener_pool_tareas().submit(_ejecutar_en_hilo, tarea.id))
+    return tarea
+
+
+def ejecutar(tarea_id):
+    """Corre la tarea en el hilo actual y deja registrado cómo terminó."""
+    tarea = TareaFondo.objects.get(id=tarea_id)
+    ahora = timezone.now()
+    TareaFondo.objects.filter(id=tarea_id).update(estado='en_curso', fecha_inicio=ahora, fecha_avance=ahora)
+    try:
+        mensaje = import_string(TRABAJOS[tarea.tipo])(tarea)
+    except Exception as e:
+        logger.exception("Falló la tarea %s", tarea_id)
+        TareaFondo.objects.filter(id=tarea_id).update(
+            estado='fallida', mensaje=str(e)[:1000], fecha_fin=timezone.now(),
+        )
+    else:
+        TareaFondo.objects.filter(id=tarea_id).update(
+            estado='terminada', mensaje=mensaje or '', fecha_fin=timezone.now(),
+        )
+
+
+def _ejecutar_en_hilo(tarea_id):
+    try:
+        ejecutar(tarea_id)
+    except Exception:
+        logger.exception("No se pudo ejecutar la tarea %s", tarea_id)
+    finally:
+        # Cada hilo abre sus propias conexiones: no las dejamos colgadas
+        connections.close_all()
+
+
+def avanzar(tarea, procesados, total=None):
+    """Guarda el avance de ``tarea`` (un UPDATE; no toca los demás campos)."""
+    tarea.procesados = procesados
+    campos = {'procesados': procesados, 'fecha_avance': timezone.now()}
+    if total is not None:
+        tarea.total = campos['total'] = total
+    TareaFondo.objects.filter(id=tarea.id).update(**campos)
@@ -0,0 +1,125 @@
+# --------------------
+# Tendencias de cumplimiento (series semanales)
+# --------------------
+# Las series se reconstruyen a partir de las fechas de carga: Documento
+# (ciclo actual) y AnexoHistorico (respaldos de ciclos anteriores). Cada
+# fuente se trae con UN solo query columnar y el resto (agrupar por semana,
+# contar y acumular) se hace con operaciones vectorizadas de NumPy.
+#
+# Nota: el sistema no guarda eventos de cambio de estado, así que un documento
+# validado cuenta como validado desde la semana en que se registró.
+import numpy as np
+
+from django.db.models import Count
+from django.utils import timezone
+
+from .consultas import columnas, texto
+from .models import AnexoHistorico, AnexoRequerido, Documento, Usuario
+
+# Días desde la época (1970-01-01, jueves) al primer lunes: las semanas inician en lunes
+_LUNES = 4
+
+# Agrupaciones disponibles: campo de Usuario por el que se agrupa
+AGRUPACIONES = {
+    'entidad': 'username',
+    'entidad_federativa': 'entidad_federativa',
+}
+
+
+def _dias_locales(instantes):
+    """Instantes UTC (``datetime64[s]``) a días locales desde la época.
+
+    Se usa el desfase actual de TIME_ZONE para todo el arreglo; para agrupar
+    por semana basta con esa aproximación.
+    """
+    desfase = int(timezone.localtime().utcoffset().total_seconds())
+    return (instantes.astype(np.int64) + desfase) // 86400
+
+
+def calcular_tendencias(por='entidad_federativa'):
+    """Series semanales acumuladas por grupo.
+
+    Regresa un diccionario con:
+
+    - ``semanas``: lunes de cada semana (``datetime64[D]``), forma ``(W,)``
+    - ``grupos``: etiqueta de cada grupo, forma ``(G,)``
+    - ``cargados``, ``validados``, ``respaldos``: conteos acumulados ``(G, W)``
+    - ``porcentaje``: % validado acumulado respecto a lo esperado ``(G, W)``
+    - ``esperados``: documentos esperados por grupo ``(G,)``
+    - ``esperados_total``: documentos esperados de todas las entidades
+    """
+    campo = AGRUPACIONES[por]
+
+    grupo_doc, estado_doc, fecha_doc = columnas(
+        Documento.objects.filter(usuario__rol='usuario', usuario__is_active=True, archivo__gt='')
+        .annotate(dia=texto('fecha_subida'))
+        .values_list(f'usuario__{campo}', 'estado', 'dia'),
+        (object, object, 'datetime64[D]'),
+    )
+    grupo_hist, instante_hist = columnas(
+        AnexoHistorico.objects.filter(entidad__rol='usuario', entidad__is_active=True)
+        .annotate(instante=texto('fecha_subida'))
+        .values_list(f'entidad__{campo}', 'instante'),
+        (object, 'datetime64[s]'),
+    )
+
+    vacio = np.zeros((0, 0), dtype=np.int64)
+    if not len(fecha_doc) and not len(instante_hist):
+        return {
+            'por': por, 'semanas': np.array([], dtype='datetime64[D]'), 'grupos': np.array([], dtype=str),
+            'cargados': vacio, 'validados': vacio, 'respaldos': vacio,
+            'porcentaje': vacio.astype(float), 'esperados': np.array([], dtype=np.int64),
+            'esperados_total': 0,
+        }
+
+    # Semana (desde la época) de cada evento
+    sem_doc = (fecha_doc.astype(np.int64) - _LUNES) // 7
+    sem_hist = (_dias_locales(instante_hist) - _LUNES) // 7
+    semanas = np.concatenate([sem_doc, sem_hist])
+    primera, ultima = semanas.min(), semanas.max()
+    total_semanas = int(ultima - primera + 1)
+
+    # Grupos como códigos enteros (codificación por diccionario)
+    grupos, codigos = np.unique(np.concatenate([grupo_doc, grupo_hist]).astype(str), return_inverse=True)
+    cod_doc, cod_hist = codigos[:len(grupo_doc)], codigos[len(grupo_doc):]
+    total_grupos = len(grupos)
+
+    def acumulado(codigo, semana):
+        indice = codigo * total_semanas + (semana - primera)
+        conteo = np.bincount(indice, minlength=total_grupos * total_semanas)
+        return conteo.reshape(total_grupos, total_semanas).cumsum(axis=1)
+
+    es_validado = estado_doc == 'validado'
+    cargados = acumulado(cod_doc, sem_doc)
+    validados = acumulado(cod_doc[es_validado], sem_doc[es_validado])
+    respaldos = acumulado(cod_hist, sem_hist)
+
+    # Documentos esperados por grupo = entidades del grupo × anexos requeridos
+    entidades_por_grupo = dict(
+        Usuario.objects.filter(rol='usuario', is_active=True).values_list(campo).annotate(n=Count('id')).order_by()
+    )
+    entidades = np.array([entidades_por_grupo.get(g, 0) for g in grupos], dtype=np.int64)
+    total_anexos = AnexoRequerido.objects.count()
+    esperados = entidades * total_anexos
+    with np.errstate(divide='ignore', invalid='ignore'):
+        porcentaje = np.where(esperados[:, None] > 0, validados / esperados[:, None] * 100, 0.0)
+
+    return {
+        'por': por,
+        'semanas': (np.arange(primera, ultima + 1) * 7 + _LUNES).astype('datetime64[D]'),
+        'grupos': grupos,
+        'cargados': cargados,
+        'validados': validados,
+        'respaldos': respaldos,
+        'porcentaje': porcentaje,
+        'esperados': esperados,
+        'esperados_total': sum(entidades_por_grupo.values()) * total_anexos,
+    }
+
+
+def porcentaje_total(tendencias):
+    """% validado acumulado de todos los grupos juntos, forma ``(W,)``."""
+    esperados = tendencias['esperados_total']
+    if not esperados:
+        return np.zeros(len(tendencias['semanas']))
+    return tendencias['validados'].sum(axis=0) / esperados * 100
@@ -0,0 +1,129 @@
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from core import tareas
+from core.models import AnexoRequerido, Documento, Usuario
+
+CONTENIDO = b'%PDF-1.4\n' + bytes(range(256)) * 40
+
+
+@override_settings(
+    MEDIA_ENVIO='django',
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class ServirArchivoTests(TestCase):
+    """Archivos subidos: permisos, rangos de bytes y GET condicional."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media = tempfile.mkdtemp(prefix='test_media_')
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.duena = Usuario.objects.create_user(username='duena', correo='duena@ejemplo.test', password='x')
+        self.otra = Usuario.objects.create_user(username='otra', correo='otra@ejemplo.test', password='x')
+        self.admin = Usuario.objects.create_user(
+            username='admin', correo='admin@ejemplo.test', password='x', rol='admin',
+        )
+        anexo = AnexoRequerido.objects.create(nombre='Anexo 1')
+        self.ruta = default_storage.save('documentos/anexo.pdf', ContentFile(CONTENIDO))
+        Documento.objects.create(usuario=self.duena, anexo=anexo, archivo=self.ruta)
+        self.url = '/media/' + self.ruta
+
+    def _leer(self, respuesta):
+        return b''.join(respuesta.streaming_content)
+
+    def test_permisos(self):
+        self.assertEqual(self.client.get(self.url).status_code, 302)  # sin sesión: al login
+        self.client.force_login(self.otra)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.client.force_login(self.duena)
+        respuesta = self.client.get(self.url)
+        self.assertEqual(self._leer(respuesta), CONTENIDO)
+        self.assertEqual(respuesta['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.client.get('/media/documentos/no_registrado.pdf').status_code, 404)
+
+    def test_rangos(self):
+        self.client.force_login(self.duena)
+        respuesta = self.client.get(self.url, HTTP_RANGE='bytes=0-99')
+        self.assertEqual(respuesta.status_code, 206)
+        self.assertEqual(respuesta['Content-Range'], f'bytes 0-99/{len(CONTENIDO)}')
+        self.assertEqual(self._leer(respuesta), CONTENIDO[:100])
+
+        respuesta = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(self._leer(respuesta), CONTENIDO[-10:])
+
+        respuesta = self.client.get(self.url, HTTP_RANGE=f'bytes={len(CONTENIDO)}-')
+        self.assertEqual(respuesta.status_code, 416)
+        self.assertEqual(respuesta['Content-Range'], f'bytes */{len(CONTENIDO)}')
+
+        # If-Range con un ETag viejo: se envía el archivo completo
+        respuesta = self.client.get(self.url, HTTP_RANGE='bytes=0-99', HTTP_IF_RANGE='"viejo"')
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_get_condicional(self):
+        self.client.force_login(self.duena)
+        etag = self.client.get(self.url)['ETag']
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta['ETag'], etag)
+
+    @override_settings(MEDIA_ENVIO='x-accel')
+    def test_envio_delegado(self):
+        self.client.force_login(self.duena)
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta['X-Accel-Redirect'], '/media-protegida/' + self.ruta)
+        self.assertEqual(respuesta.content, b'')
+
+    def test_limpiar_anexos_borra_al_confirmar(self):
+        documento = Documento.objects.get()
+        ruta = documento.archivo.name
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post('/limpiar_anexos/')
+        documento.refresh_from_db()
+        self.assertFalse(documento.archivo)
+        self.assertEqual(documento.estado, 'pendiente')
+        # El archivo sigue en disco hasta que se confirma la transacción
+        self.assertTrue(default_storage.exists(ruta))
+        for callback in callbacks:
+            callback()
+        tareas.esperar(timeout=10)
+        self.assertFalse(default_storage.exists(ruta))
+
+    def test_documentos_en_zip_por_entidad(self):
+        import io
+        import zipfile
+
+        self.client.force_login(self.admin)
+        respuesta = self.client.get('/reporte/documentos/zip/', {'entidad': self.duena.id})
+        self.assertEqual(respuesta['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(io.BytesIO(self._leer(respuesta))) as zip_file:
+            self.assertEqual(zip_file.namelist(), ['duena/anexo-1.pdf'])
+            self.assertEqual(zip_file.read('duena/anexo-1.pdf'), CONTENIDO)
+
+        respuesta = self.client.get('/reporte/documentos/zip/', {'entidad': self.otra.id})
+        self.assertRedirects(respuesta, '/revision/', fetch_redirect_response=False)
+
+        # "Anexo 1" y "Anexo-1" quedan iguales con slugify: no se repite la entrada
+        ruta = default_storage.save('documentos/otro.pdf', ContentFile(b'%PDF otro'))
+        Documento.objects.create(
+            usuario=self.duena, anexo=AnexoRequerido.objects.create(nombre='Anexo-1'), archivo=ruta,
+        )
+        respuesta = self.client.get('/reporte/documentos/zip/', {'entidad': self.duena.id})
+        with zipfile.ZipFile(io.BytesIO(self._leer(respuesta))) as zip_file:
+            self.assertEqual(sorted(zip_file.namelist()), ['duena/anexo-1-2.pdf', 'duena/anexo-1.pdf'])
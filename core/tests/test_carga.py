@@ -0,0 +1,40 @@
+from django.test import LiveServerTestCase, SimpleTestCase
+
+from core import carga
+from core.models import Usuario
+
+
+class VerificarRevisorTests(LiveServerTestCase):
+    """El escenario de revisor no arranca con un usuario que recibiría redirecciones."""
+
+    def setUp(self):
+        Usuario.objects.create_superuser(username='super', correo='super@ejemplo.test', password='clave-prueba')
+        Usuario.objects.create_user(username='admin', correo='admin@ejemplo.test', password='clave-prueba',
+                                    rol='admin')
+
+    def test_superusuario_pasa(self):
+        carga.verificar_revisor(self.live_server_url, 'super', 'clave-prueba')
+
+    def test_admin_sin_superusuario_falla_antes_de_la_prueba(self):
+        with self.assertRaisesMessage(carga.ErrorPreparacion, 'superusuario'):
+            carga.verificar_revisor(self.live_server_url, 'admin', 'clave-prueba')
+        with self.assertRaisesMessage(carga.ErrorPreparacion, 'iniciar sesión'):
+            carga.verificar_revisor(self.live_server_url, 'super', 'otra')
+
+
+class PercentilTests(SimpleTestCase):
+    """Percentil por rango más cercano: el valor en la posición ceil(p/100 · n)."""
+
+    def test_multiplos_exactos_y_redondeo_hacia_arriba(self):
+        diez, veinte = list(range(1, 11)), list(range(1, 21))
+        self.assertEqual(carga.percentil(diez, 50), 5)
+        self.assertEqual(carga.percentil(veinte, 95), 19)
+        self.assertEqual(carga.percentil(veinte, 99), 20)
+        self.assertEqual(carga.percentil(diez, 51), 6)
+        self.assertEqual(carga.percentil(list(range(1, 101)), 7), 7)  # 7/100 · 100 no es exacto en flotante
+
+    def test_extremos(self):
+        self.assertEqual(carga.percentil([], 50), 0)
+        self.assertEqual(carga.percentil([7], 99), 7)
+        self.assertEqual(carga.percentil([1, 2, 3], 0), 1)
+        self.assertEqual(carga.percentil([1, 2, 3], 100), 3)
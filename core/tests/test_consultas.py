@@ -0,0 +1,117 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import urls
+from core.datos_sinteticos import generar_datos
+from core.models import AnexoRequerido, Documento, TareaFondo, Usuario
+
+from .utils import RegistroConsultas, describir_crecimiento
+
+# Escalas (entidades, anexos): el número de queries debe ser el mismo en ambas
+CHICA = (3, 2)
+GRANDE = (8, 5)
+
+# Rutas que se prueban con POST (acciones); el resto con GET
+RUTAS_POST = {
+    'eliminar_usuario', 'eliminar_anexo', 'eliminar_todos_anexos',
+    'limpiar_anexos', 'respaldar_anexos', 'limpiar_respaldo',
+}
+# Quién hace la petición (por defecto un administrador)
+RUTAS_ENTIDAD = {'usuario_dashboard', 'cambiar_contrasena'}
+RUTAS_ANONIMAS = {'login', 'olvido_contrasena', ''}
+# Parámetros GET extra para que la petición no dependa del tamaño de los datos
+CONSULTAS_EXTRA = {
+    'exportar_reportes_entidades': lambda c: f"?entidad={c['entidad_id']}",
+    'diferencias_respaldos': lambda c: "?a=2000-01-01&b=2100-01-01&todos=1",
+}
+
+
+def _nombre(patron):
+    return patron.name or str(patron.pattern)
+
+
+@override_settings(
+    REPORTES_FUERA_DE_PROCESO=False,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class PresupuestoConsultasTests(TestCase):
+    """Cada ruta de core/urls.py hace el mismo número de queries con pocos o muchos datos."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media = tempfile.mkdtemp(prefix='test_media_')
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media, ignore_errors=True)
+        super().tearDownClass()
+
+    def _sembrar(self, entidades, anexos):
+        admin = Usuario.objects.create_superuser(
+            username='admin_prueba', correo='admin@ejemplo.test', password='x', rol='admin',
+        )
+        generar_datos(entidades, anexos, respaldos=0.5, tam_kb=1, semilla=0)
+        entidad = Usuario.objects.filter(rol='usuario').order_by('id').first()
+        return {
+            'admin': admin,
+            'entidad': entidad,
+            'entidad_id': entidad.id,
+            'usuario_id': entidad.id,
+            'anexo_id': AnexoRequerido.objects.order_by('id').values_list('id', flat=True).first(),
+            'perfil_id': '20240101_000000_00000000',
+            'tipo': 'sql',
+            'tarea_id': TareaFondo.objects.create(tipo='purgar_respaldos').id,
+            'ruta': Documento.objects.exclude(archivo='').exclude(archivo__isnull=True)
+            .order_by('id').values_list('archivo', flat=True).first() or 'documentos/no_existe.pdf',
+        }
+
+    def _medir(self, patron, escala):
+        """Siembra ``escala``, hace la petición y deshace todo; regresa el registro de queries."""
+        nombre = _nombre(patron)
+        with transaction.atomic():
+            contexto = self._sembrar(*escala)
+            cliente = Client()
+            if nombre in RUTAS_ENTIDAD:
+                cliente.force_login(contexto['entidad'])
+            elif nombre not in RUTAS_ANONIMAS:
+                cliente.force_login(contexto['admin'])
+
+            kwargs = {k: contexto[k] for k in patron.pattern.converters}
+            url = reverse(patron.name, kwargs=kwargs) if patron.name else '/' + str(patron.pattern)
+            if nombre in CONSULTAS_EXTRA:
+                url += CONSULTAS_EXTRA[nombre](contexto)
+
+            cache.clear()
+            with RegistroConsultas() as registro:
+                respuesta = cliente.post(url) if nombre in RUTAS_POST else cliente.get(url)
+                if respuesta.streaming:
+                    for _ in respuesta.streaming_content:
+                        pass
+                respuesta.close()
+            transaction.set_rollback(True)
+
+        self.assertLess(respuesta.status_code, 500, f'{nombre}: respuesta {respuesta.status_code}')
+        return registro
+
+    def test_consultas_no_crecen_con_los_datos(self):
+        for patron in urls.urlpatterns:
+            nombre = _nombre(patron)
+            with self.subTest(ruta=nombre):
+                chico = self._medir(patron, CHICA)
+                grande = self._medir(patron, GRANDE)
+                self.assertEqual(
+                    len(chico), len(grande),
+                    f'{nombre}: {len(chico)} queries con {CHICA[0]}x{CHICA[1]} y '
+                    f'{len(grande)} con {GRANDE[0]}x{GRANDE[1]} (entidades x anexos).\n'
+                    f'Sitios que crecieron:\n{describir_crecimiento(chico, grande)}',
+                )
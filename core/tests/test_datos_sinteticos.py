@@ -0,0 +1,37 @@
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.datos_sinteticos import generar_datos, limpiar_datos
+from core.models import AnexoHistorico, Documento, Usuario
+
+
+class DatosSinteticosTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp(prefix='test_media_')
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=media)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+    def test_fechas_repartidas_sin_tocar_auto_now_add(self):
+        creados = generar_datos(4, 5, respaldos=1.0, tam_kb=1, dias=90, prefijo='prueba', semilla=1)
+        self.assertEqual(creados['documentos'], 20)
+
+        hoy = timezone.now().date()
+        fechas = set(Documento.objects.values_list('fecha_subida', flat=True))
+        self.assertGreater(len(fechas), 1)
+        self.assertTrue(all(hoy - timedelta(days=90) <= f <= hoy for f in fechas))
+        # Los respaldos son anteriores a su documento
+        limite = timezone.now() - timedelta(days=89)
+        self.assertTrue(all(f < limite for f in AnexoHistorico.objects.values_list('fecha_subida', flat=True)))
+        # El campo conserva auto_now_add para el resto del proceso
+        self.assertTrue(Documento._meta.get_field('fecha_subida').auto_now_add)
+        self.assertTrue(AnexoHistorico._meta.get_field('fecha_subida').auto_now_add)
+
+        limpiar_datos('prueba')
+        self.assertFalse(Usuario.objects.filter(username__startswith='prueba_').exists())
@@ -0,0 +1,56 @@
+import csv
+import io
+import zipfile
+
+from django.test import TestCase
+
+from core.models import AnexoRequerido, Documento, Usuario
+
+
+class MatrizCumplimientoTests(TestCase):
+    """Matriz entidad × anexo en CSV (en flujo) y XLSX."""
+
+    def setUp(self):
+        anexo_a = AnexoRequerido.objects.create(nombre='A')
+        anexo_b = AnexoRequerido.objects.create(nombre='B')
+        una = Usuario.objects.create_user(
+            username='una', correo='una@ejemplo.test', password='x', entidad_federativa='Zacatecas',
+        )
+        Documento.objects.create(usuario=una, anexo=anexo_a, estado='validado', archivo='documentos/1/a.pdf')
+        Documento.objects.create(usuario=una, anexo=anexo_b, estado='pendiente', archivo='documentos/1/b.pdf')
+        otra = Usuario.objects.create_user(username='otra', correo='otra@ejemplo.test', password='x')
+        Documento.objects.create(usuario=otra, anexo=anexo_b, estado='rechazado', archivo='documentos/2/b.pdf')
+        Usuario.objects.create_user(username='sin_documentos', correo='sin@ejemplo.test', password='x')
+        baja = Usuario.objects.create_user(username='baja', correo='baja@ejemplo.test', password='x', is_active=False)
+        Documento.objects.create(usuario=baja, anexo=anexo_a, estado='validado')
+
+        admin = Usuario.objects.create_user(username='admin', correo='admin@ejemplo.test', password='x', rol='admin')
+        self.client.force_login(admin)
+
+    def test_csv_una_fila_por_entidad_activa(self):
+        response = self.client.get('/reporte/matriz/')
+        self.assertTrue(response.streaming)
+        self.assertIn('.csv', response['Content-Disposition'])
+        texto = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(texto.startswith('﻿'))  # BOM para Excel
+
+        filas = list(csv.reader(io.StringIO(texto.lstrip('﻿'))))
+        self.assertEqual(filas[0], ['Entidad', 'Entidad federativa', 'A', 'B',
+                                    'Cargados', 'Validados', 'Rechazados', 'Pendientes', '% Validado'])
+        self.assertEqual(filas[1:], [
+            ['una', 'Zacatecas', 'validado', 'pendiente', '2', '1', '0', '1', '50.0'],
+            ['otra', '', '', 'rechazado', '1', '0', '1', '0', '0.0'],
+            ['sin_documentos', '', '', '', '0', '0', '0', '0', '0.0'],
+        ])
+
+    def test_xlsx(self):
+        response = self.client.get('/reporte/matriz/?formato=xlsx')
+        self.assertIn('.xlsx', response['Content-Disposition'])
+        contenido = b''.join(response.streaming_content)
+        self.assertEqual(int(response['Content-Length']), len(contenido))
+        with zipfile.ZipFile(io.BytesIO(contenido)) as libro:
+            # constant_memory escribe las cadenas dentro de la hoja
+            hoja = libro.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertEqual(hoja.count('<row '), 4)  # encabezado y tres entidades activas
+        self.assertIn('sin_documentos', hoja)
+        self.assertNotIn('baja', hoja)
@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.almacenamiento import es_fragmentada, nombre_visible
+from core.models import AnexoHistorico, AnexoRequerido, AnexoUsuario, Documento, Usuario
+
+
+class FragmentarMediaTests(TestCase):
+    """Migración de los archivos planos al esquema <carpeta>/<entidad>/<hh>/<token>_<nombre>."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp(prefix='test_media_')
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=media)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.entidad = Usuario.objects.create_user(username='una', correo='una@ejemplo.test', password='x')
+        anexo = AnexoRequerido.objects.create(nombre='Anexo 1')
+        # Registros con las rutas planas de antes de core/almacenamiento.py
+        self.registros = [
+            (Documento.objects.create(usuario=self.entidad, anexo=anexo), 'documentos', b'documento'),
+            (AnexoHistorico(entidad=self.entidad, anexo_requerido=anexo), 'anexos_historicos', b'respaldo'),
+            (AnexoUsuario.objects.create(usuario=self.entidad, anexo_requerido=anexo), 'anexos', b'anexo'),
+        ]
+        for registro, carpeta, contenido in self.registros:
+            registro.archivo.name = default_storage.save(f'{carpeta}/informe.pdf', ContentFile(contenido))
+            registro.save()
+        self.faltante = Documento.objects.create(
+            usuario=self.entidad, anexo=AnexoRequerido.objects.create(nombre='Anexo 2'),
+            archivo='documentos/no_existe.pdf',
+        )
+
+    def _fragmentar(self):
+        salida = StringIO()
+        call_command('fragmentar_media', stdout=salida)
+        return salida.getvalue()
+
+    def test_mueve_archivos_y_actualiza_rutas(self):
+        anteriores = {registro.archivo.name for registro, _, _ in self.registros}
+        salida = self._fragmentar()
+
+        for registro, carpeta, contenido in self.registros:
+            registro.refresh_from_db()
+            ruta = registro.archivo.name
+            self.assertTrue(es_fragmentada(carpeta, ruta), ruta)
+            self.assertTrue(ruta.startswith(f'{carpeta}/{self.entidad.id}/'))
+            self.assertEqual(nombre_visible(ruta), 'informe.pdf')
+            with default_storage.open(ruta, 'rb') as archivo:
+                self.assertEqual(archivo.read(), contenido)
+        self.assertFalse(any(default_storage.exists(ruta) for ruta in anteriores))
+
+        self.faltante.refresh_from_db()
+        self.assertEqual(self.faltante.archivo.name, 'documentos/no_existe.pdf')
+        self.assertIn('documentos: 1 movidos, 1 rutas actualizadas, 1 sin archivo en disco', salida)
+
+    def test_segunda_corrida_no_cambia_nada(self):
+        self._fragmentar()
+        rutas = [type(r).objects.get(id=r.id).archivo.name for r, _, _ in self.registros]
+
+        salida = self._fragmentar()
+        self.assertEqual([type(r).objects.get(id=r.id).archivo.name for r, _, _ in self.registros], rutas)
+        self.assertIn('documentos: 0 movidos, 0 rutas actualizadas, 1 sin archivo en disco', salida)
+        self.assertIn('historicos: 0 movidos, 0 rutas actualizadas', salida)
+        self.assertIn('anexos: 0 movidos, 0 rutas actualizadas', salida)
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from core.almacenamiento import bloqueo_mantenimiento
+from core.huerfanos import buscar_huerfanos
+from core.models import AnexoRequerido, Documento, Usuario
+
+
+class HuerfanosTests(TestCase):
+    """Archivos de MEDIA_ROOT sin registro: cuáles se reportan y cuáles se conservan."""
+
+    def _archivo(self, ruta, horas=0):
+        ruta = default_storage.save(ruta, ContentFile(b'%PDF'))
+        if horas:
+            antes = time.time() - horas * 3600
+            os.utime(default_storage.path(ruta), (antes, antes))
+        return ruta
+
+    def setUp(self):
+        # MEDIA_ROOT propio por prueba: se recorre completo
+        media = tempfile.mkdtemp(prefix='test_media_')
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=media)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        entidad = Usuario.objects.create_user(username='una', correo='una@ejemplo.test', password='x')
+        documento = Documento.objects.create(usuario=entidad, anexo=AnexoRequerido.objects.create(nombre='Anexo 1'))
+        self.referenciado = self._archivo('documentos/1/aa/aaaaaaaa_vigente.pdf', horas=5)
+        Documento.objects.filter(id=documento.id).update(archivo=self.referenciado)
+        self.huerfano = self._archivo('documentos/1/bb/bbbbbbbb_borrado.pdf', horas=5)
+        self.reciente = self._archivo('anexos/1/cc/cccccccc_cargando.pdf')
+
+    def _encontrados(self, **opciones):
+        return sorted(ruta for lote in buscar_huerfanos(**opciones) for ruta, _ in lote)
+
+    def test_solo_reporta_huerfanos_antiguos(self):
+        self.assertEqual(self._encontrados(), [self.huerfano])
+        self.assertEqual(self._encontrados(antiguedad_min=0), sorted([self.huerfano, self.reciente]))
+
+    def test_confirma_en_la_base_antes_de_reportar(self):
+        # Referencias tomadas antes de que se registrara el archivo (p. ej. una
+        # ruta actualizada a mitad del recorrido): la nueva consulta lo conserva
+        with mock.patch('core.huerfanos.referenciados', return_value=np.array([], dtype=np.uint64)):
+            self.assertEqual(self._encontrados(lote=1), [self.huerfano])
+
+    def test_comando_borra_solo_los_huerfanos(self):
+        call_command('limpiar_huerfanos', stdout=StringIO())
+        self.assertTrue(default_storage.exists(self.huerfano))  # sin --borrar es simulación
+
+        call_command('limpiar_huerfanos', '--borrar', stdout=StringIO())
+        self.assertFalse(default_storage.exists(self.huerfano))
+        self.assertTrue(default_storage.exists(self.referenciado))
+        self.assertTrue(default_storage.exists(self.reciente))
+
+    def test_no_corre_a_la_vez_que_otro_mantenimiento(self):
+        with bloqueo_mantenimiento():
+            with self.assertRaisesMessage(CommandError, 'en curso'):
+                call_command('limpiar_huerfanos', '--borrar', stdout=StringIO())
+        self.assertTrue(default_storage.exists(self.huerfano))
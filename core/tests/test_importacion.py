@@ -0,0 +1,31 @@
+import io
+import json
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from core.models import Usuario
+
+
+class ImportacionDiferidaTests(TestCase):
+    """Arrancar Django e importar las URLs no debe cargar dependencias pesadas."""
+
+    def _medir(self, *argumentos):
+        salida = io.StringIO()
+        call_command('tiempo_importacion', '--repeticiones', '1', '--json', *argumentos, stdout=salida)
+        return json.loads(salida.getvalue())
+
+    def test_urls_sin_dependencias_pesadas(self):
+        resultado = self._medir('--estricto')
+        self.assertEqual(resultado['modulo'], 'core.urls')
+        self.assertEqual(resultado['pesados_cargados'], {})
+
+    def test_estricto_falla_si_se_cargan(self):
+        self.assertIn('numpy', self._medir('--modulo', 'core.puntajes')['pesados_cargados'])
+        with self.assertRaisesMessage(CommandError, 'numpy'):
+            self._medir('--modulo', 'core.puntajes', '--estricto')
+
+    def test_superusuario_sin_rol_admin_entra_a_la_revision(self):
+        admin = Usuario.objects.create_superuser(username='admin', correo='admin@ejemplo.test', password='x')
+        self.client.force_login(admin)
+        self.assertEqual(self.client.get('/revision/').status_code, 200)
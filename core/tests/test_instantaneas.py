@@ -0,0 +1,62 @@
+import io
+import os
+import tempfile
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from django.test import TestCase
+
+from core import instantaneas
+from core.models import AnexoHistorico, AnexoRequerido, Documento, Usuario
+
+
+class InstantaneasTests(TestCase):
+    """Instantánea .npz columnar: escritura, lectura con memmap y decodificación."""
+
+    def setUp(self):
+        anexo = AnexoRequerido.objects.create(nombre='A', obligatorio=True)
+        self.una = Usuario.objects.create_user(
+            username='una', correo='una@ejemplo.test', password='x', entidad_federativa='Zacatecas',
+        )
+        documento = Documento.objects.create(usuario=self.una, anexo=anexo, estado='validado', archivo='documentos/a.pdf')
+        Documento.objects.filter(id=documento.id).update(fecha_subida=date(2026, 2, 3))
+        respaldo = AnexoHistorico.objects.create(entidad=self.una, anexo_requerido=anexo, archivo='anexos_historicos/a.pdf')
+        AnexoHistorico.objects.filter(id=respaldo.id).update(fecha_subida=datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+
+        destino = tempfile.NamedTemporaryFile(suffix='.npz', delete=False)
+        destino.close()
+        self.addCleanup(os.remove, destino.name)
+        instantaneas.escribir_instantanea(destino.name)
+        self.ruta = destino.name
+
+    def test_columnas_con_memmap(self):
+        tablas = instantaneas.cargar_instantanea(self.ruta)
+
+        usuarios, documentos, historico = tablas['usuarios'], tablas['documentos'], tablas['historico']
+        self.assertIsInstance(documentos['usuario_id'], np.memmap)
+        self.assertEqual(documentos['usuario_id'].dtype, np.int32)
+        self.assertEqual(usuarios['username'].tolist(), ['una'])
+        self.assertEqual(instantaneas.decodificar(usuarios, 'entidad_federativa').tolist(), ['Zacatecas'])
+        self.assertEqual(instantaneas.decodificar(documentos, 'estado').tolist(), ['validado'])
+        self.assertEqual(documentos['con_archivo'].tolist(), [True])
+        self.assertEqual(documentos['fecha_subida'].tolist(), [date(2026, 2, 3)])
+        self.assertEqual(historico['fecha_subida'].astype(str).tolist(), ['2026-01-02T03:04:05'])
+        self.assertEqual(tablas['anexos']['obligatorio'].tolist(), [True])
+        self.assertEqual(tablas['meta']['version'].tolist(), [instantaneas.VERSION])
+
+    def test_sin_memmap_da_los_mismos_datos(self):
+        mapeada = instantaneas.cargar_instantanea(self.ruta)
+        leida = instantaneas.cargar_instantanea(self.ruta, mmap=False)
+        self.assertEqual(set(mapeada), set(leida))
+        for tabla, columnas in leida.items():
+            for columna, arreglo in columnas.items():
+                np.testing.assert_array_equal(mapeada[tabla][columna], arreglo)
+
+    def test_descarga(self):
+        admin = Usuario.objects.create_user(username='admin', correo='admin@ejemplo.test', password='x', rol='admin')
+        self.client.force_login(admin)
+        response = self.client.get('/reporte/instantanea/')
+        self.assertIn('.npz', response['Content-Disposition'])
+        with np.load(io.BytesIO(b''.join(response.streaming_content))) as datos:
+            self.assertEqual(datos['usuarios__username'].tolist(), ['una', 'admin'])
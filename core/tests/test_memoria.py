@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.messages import get_messages
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from core.memoria import (
+    PresupuestoMemoriaExcedido,
+    iniciar_presupuesto,
+    presupuesto_activo,
+    presupuesto_heredado,
+    verificar_presupuesto,
+)
+from core.middleware import PresupuestoMemoriaMiddleware
+from core.models import AnexoRequerido, Documento, Usuario
+from core.renderizado import PoolReportes
+
+
+# Trabajo para los workers (a nivel de módulo: se importa en procesos 'spawn')
+def _inflar(mb):
+    datos = b'x' * (mb * 1024 * 1024)
+    verificar_presupuesto()
+    return len(datos)
+
+
+class PresupuestoVistaTests(TestCase):
+    """La vista que excede su presupuesto regresa con un mensaje en lugar de seguir creciendo."""
+
+    def test_excedido_redirige_con_mensaje(self):
+        admin = Usuario.objects.create_superuser(username='admin', correo='admin@ejemplo.test', password='x')
+        entidad = Usuario.objects.create_user(username='una', correo='una@ejemplo.test', password='x')
+        Documento.objects.create(
+            usuario=entidad, anexo=AnexoRequerido.objects.create(nombre='Anexo 1'),
+            archivo='documentos/1/ab/abcdef12_a.pdf',
+        )
+        self.client.force_login(admin)
+
+        with mock.patch('core.memoria.memoria_usada_mb', return_value=10_000), \
+                self.assertLogs('core.middleware', 'WARNING'):
+            response = self.client.post('/respaldar_anexos/')
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('demasiada memoria', str(list(get_messages(response.wsgi_request))[0]))
+        self.assertIsNone(presupuesto_activo())
+
+
+class PresupuestoFlujoTests(SimpleTestCase):
+    """El presupuesto sigue vigente mientras se genera una respuesta en flujo."""
+
+    def test_flujo_conserva_el_presupuesto_y_corta_al_excederse(self):
+        vistos = []
+
+        def contenido():
+            vistos.append(presupuesto_activo())
+            yield b'a'
+            raise PresupuestoMemoriaExcedido('exportar', 500, 300)
+
+        def vista(request):
+            iniciar_presupuesto('exportar', 300)  # lo que hace process_view
+            return StreamingHttpResponse(contenido())
+
+        request = RequestFactory().get('/')
+        request.resolver_match = SimpleNamespace(url_name='exportar', kwargs={})
+        response = PresupuestoMemoriaMiddleware(vista)(request)
+        self.assertIsNone(presupuesto_activo())
+
+        bloques = iter(response)
+        self.assertEqual(next(bloques), b'a')
+        self.assertEqual(vistos[0][:2], ('exportar', 300))
+        with self.assertLogs('core.middleware', 'WARNING'), self.assertRaises(PresupuestoMemoriaExcedido):
+            next(bloques)
+        self.assertIsNone(presupuesto_activo())
+
+
+class PresupuestoWorkerTests(SimpleTestCase):
+    """Los reportes del pool se miden con el presupuesto de la petición que los encola."""
+
+    def setUp(self):
+        self.pool = PoolReportes(workers=1, max_trabajos=10, max_rss_mb=0, timeout=60)
+        self.addCleanup(self.pool.cerrar)
+
+    def test_presupuesto_se_aplica_en_el_worker(self):
+        self.assertEqual(self.pool.ejecutar(_inflar, 1), 1024 * 1024)  # sin presupuesto
+        anterior = self.pool._pool
+
+        with presupuesto_heredado(('reporte_general_pdf', 20, 0)):
+            with self.assertRaises(PresupuestoMemoriaExcedido) as error:
+                self.pool.ejecutar(_inflar, 64)
+            self.assertEqual(self.pool.ejecutar(_inflar, 1), 1024 * 1024)
+
+        self.assertEqual(error.exception.vista, 'reporte_general_pdf')
+        self.assertEqual(error.exception.limite_mb, 20)
+        self.assertIsNot(self.pool._pool, anterior)  # el worker crecido se reemplazó
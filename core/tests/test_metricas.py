@@ -0,0 +1,53 @@
+import threading
+
+from django.test import SimpleTestCase, override_settings
+
+from core import metricas
+
+
+class MetricasTests(SimpleTestCase):
+    """Series por vista acumuladas por hilo y exportadas en formato de Prometheus."""
+
+    def setUp(self):
+        metricas.reiniciar()
+
+    def _en_hilo(self, *args):
+        hilo = threading.Thread(target=metricas.registrar, args=args)
+        hilo.start()
+        hilo.join()
+
+    def test_exporta_contadores_histograma_y_memoria(self):
+        metricas.registrar('prueba', 'GET', 200, 0.02, 3, 0.004, 100)
+        metricas.registrar('prueba', 'GET', 200, 3.0, 1, 0.001, 50, memoria_pico=2048)
+
+        texto = metricas.exportar()
+        etiquetas = 'vista="prueba",metodo="GET",estado="200"'
+        self.assertIn(f'semujeres_http_solicitudes_total{{{etiquetas}}} 2', texto)
+        self.assertIn(f'semujeres_http_duracion_segundos_bucket{{{etiquetas},le="0.025"}} 1', texto)
+        self.assertIn(f'semujeres_http_duracion_segundos_bucket{{{etiquetas},le="+Inf"}} 2', texto)
+        self.assertIn(f'semujeres_db_consultas_total{{{etiquetas}}} 4', texto)
+        self.assertIn(f'semujeres_http_respuesta_bytes_total{{{etiquetas}}} 150', texto)
+        self.assertIn(f'semujeres_proceso_memoria_pico_bytes_count{{{etiquetas}}} 1', texto)
+        self.assertIn(f'semujeres_proceso_memoria_pico_max_bytes{{{etiquetas}}} 2048', texto)
+
+    def test_tablas_de_hilos_terminados_se_retiran_sin_perder_series(self):
+        for _ in range(20):
+            self._en_hilo('hilos', 'GET', 200, 0.01, 0, 0.0, 10)
+        metricas.registrar('hilos', 'GET', 200, 0.01, 0, 0.0, 10)
+
+        texto = metricas.exportar()
+        self.assertIn('semujeres_http_solicitudes_total{vista="hilos",metodo="GET",estado="200"} 21', texto)
+        self.assertTrue(all(hilo.is_alive() for hilo, _ in metricas._tablas))
+        self.assertLessEqual(len(metricas._tablas), threading.active_count())
+
+
+class EndpointMetricasTests(SimpleTestCase):
+
+    @override_settings(METRICAS_TOKEN='secreto')
+    def test_requiere_token_o_administrador(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer otro').status_code, 403)
+
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'semujeres_proceso_inicio_segundos', response.content)
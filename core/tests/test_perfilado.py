@@ -0,0 +1,62 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from core import perfilado
+from core.models import Usuario
+
+
+class PerfiladoTests(TestCase):
+    """Perfilado bajo demanda: solo para administradores que lo piden."""
+
+    def setUp(self):
+        carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, carpeta, ignore_errors=True)
+        ajustes = override_settings(PERFILES_DIR=carpeta, PERFILES_MAXIMO=2)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.admin = Usuario.objects.create_user(username='admin', correo='admin@ejemplo.test', password='x', rol='admin')
+        self.entidad = Usuario.objects.create_user(username='una', correo='una@ejemplo.test', password='x')
+
+    def test_peticion_marcada_guarda_los_artefactos(self):
+        self.client.force_login(self.admin)
+        response = self.client.get('/reporte/tendencias/', HTTP_X_PERFILAR='1')
+        perfil_id = response['X-Perfil']
+
+        [perfil] = perfilado.listar()
+        self.assertEqual(perfil['id'], perfil_id)
+        self.assertEqual(perfil['usuario'], 'admin')
+        self.assertEqual(perfil['vista'], 'tendencias_cumplimiento')
+        self.assertEqual(perfil['estado'], 200)
+        self.assertGreater(perfil['consultas'], 0)
+        for tipo in perfilado.ARTEFACTOS:
+            self.assertIsNotNone(perfilado.ruta_artefacto(perfil_id, tipo))
+        with open(perfilado.ruta_artefacto(perfil_id, 'sql'), encoding='utf-8') as archivo:
+            self.assertTrue(archivo.readline().startswith('GET /reporte/tendencias/'))
+
+        response = self.client.get(f'/perfiles/{perfil_id}/resumen/')
+        self.assertIn(f'perfil_{perfil_id}.txt', response['Content-Disposition'])
+
+    def test_sin_marca_o_sin_permiso_no_se_perfila(self):
+        self.client.force_login(self.admin)
+        self.assertNotIn('X-Perfil', self.client.get('/perfiles/'))
+
+        self.client.force_login(self.entidad)
+        self.assertNotIn('X-Perfil', self.client.get('/perfiles/?perfilar=1'))
+        self.assertEqual(perfilado.listar(), [])
+
+    def test_solo_se_conservan_los_mas_recientes(self):
+        self.client.force_login(self.admin)
+        ids = [self.client.get('/perfiles/?perfilar=1')['X-Perfil'] for _ in range(3)]
+        self.assertEqual([p['id'] for p in perfilado.listar()], sorted(ids, reverse=True)[:2])
+
+        self.client.post('/perfiles/', {'perfil_id': perfilado.listar()[0]['id']})
+        self.assertEqual(len(perfilado.listar()), 1)
+
+    def test_ids_y_tipos_invalidos(self):
+        self.assertIsNone(perfilado.ruta_artefacto('../settings', 'prof'))
+        self.assertIsNone(perfilado.ruta_artefacto('20260101_000000_abcdef01', 'json'))
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get('/perfiles/20260101_000000_abcdef01/prof/').status_code, 404)
@@ -0,0 +1,73 @@
+import io
+
+from django.test import TestCase, override_settings
+
+from core import puntajes, reportes
+from core.models import AnexoRequerido, Documento, Usuario
+
+
+@override_settings(PUNTAJE_PESO_OBLIGATORIO=2.0, PUNTAJE_PESO_OPCIONAL=1.0)
+class PuntajesTests(TestCase):
+    """Puntaje general, de obligatorios y ponderado para todas las entidades a la vez."""
+
+    def setUp(self):
+        puntajes.invalidar()
+        a = AnexoRequerido.objects.create(nombre='A', obligatorio=True)
+        b = AnexoRequerido.objects.create(nombre='B', obligatorio=False)
+        c = AnexoRequerido.objects.create(nombre='C', obligatorio=True)
+        self.una = Usuario.objects.create_user(username='una', correo='una@ejemplo.test', password='x')
+        self.otra = Usuario.objects.create_user(username='otra', correo='otra@ejemplo.test', password='x')
+        self.admin = Usuario.objects.create_user(
+            username='admin', correo='admin@ejemplo.test', password='x', rol='admin',
+        )
+        Documento.objects.create(usuario=self.una, anexo=a, estado='validado', archivo='documentos/a.pdf')
+        Documento.objects.create(usuario=self.una, anexo=b, estado='validado', archivo='documentos/b.pdf')
+        Documento.objects.create(usuario=self.una, anexo=c, estado='rechazado', archivo='documentos/c.pdf')
+        self.pendiente = Documento.objects.create(usuario=self.otra, anexo=a, estado='pendiente')
+        Documento.objects.create(usuario=self.otra, anexo=b, estado='validado', archivo='documentos/b2.pdf')
+
+    def test_puntajes_por_entidad_y_global(self):
+        resultado = puntajes.obtener_puntajes()
+        self.assertEqual(resultado[self.una.id], {
+            'general': 66.67, 'obligatorios': 50.0, 'ponderado': 60.0,  # pesos 2 + 1 de 5
+            'validados': 2, 'obligatorios_validados': 1,
+        })
+        self.assertEqual(resultado[self.otra.id]['general'], 33.33)
+        self.assertEqual(resultado[self.otra.id]['obligatorios'], 0.0)
+        self.assertEqual(resultado[self.otra.id]['ponderado'], 20.0)
+        self.assertEqual(resultado['global'], {
+            'general': 50.0, 'obligatorios': 25.0, 'ponderado': 40.0,
+            'validados': 3, 'obligatorios_validados': 1,
+        })
+        # Un administrador no es entidad: ceros
+        self.assertEqual(puntajes.puntajes_de(self.admin.id)['general'], 0)
+
+    def test_cambio_de_documento_invalida_la_cache(self):
+        self.assertEqual(puntajes.puntajes_de(self.otra.id)['validados'], 1)
+        with self.assertNumQueries(0):
+            puntajes.obtener_puntajes()
+
+        self.pendiente.estado = 'validado'
+        self.pendiente.save()
+        self.assertEqual(puntajes.puntajes_de(self.otra.id)['obligatorios'], 50.0)
+
+    def test_matriz_de_estados(self):
+        entidad_ids, anexo_ids, obligatorio, matriz = puntajes.construir_matriz()
+        self.assertEqual(entidad_ids.tolist(), [self.una.id, self.otra.id])
+        self.assertEqual(obligatorio.tolist(), [True, False, True])
+        self.assertEqual(matriz.tolist(), [
+            [puntajes.VALIDADO, puntajes.VALIDADO, puntajes.RECHAZADO],
+            [puntajes.SIN_ARCHIVO, puntajes.VALIDADO, puntajes.SIN_DOCUMENTO],
+        ])
+
+    def test_entidad_que_no_esta_en_la_cache_recibe_ceros(self):
+        tabla = puntajes.obtener_puntajes()
+        # Creada sin señales: la caché no se invalidó y no la incluye
+        [nueva] = Usuario.objects.bulk_create([Usuario(username='nueva', correo='nueva@ejemplo.test')])
+        self.assertNotIn(nueva.id, puntajes.obtener_puntajes())
+        self.assertEqual(puntajes.puntajes_de(nueva.id, tabla)['validados'], 0)
+        self.assertEqual(puntajes.puntajes_de(self.una.id, tabla), tabla[self.una.id])
+
+        salida = io.BytesIO()
+        reportes.generar_reporte_general(salida)
+        self.assertTrue(salida.getvalue().startswith(b'%PDF'))
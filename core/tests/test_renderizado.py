@@ -0,0 +1,56 @@
+import os
+import time
+
+from django.test import SimpleTestCase
+
+from core.renderizado import ErrorReporte, PoolReportes
+
+
+# Trabajos para los workers (a nivel de módulo: se importan en procesos 'spawn')
+def _eco(valor):
+    return valor
+
+
+def _morir():
+    os._exit(1)
+
+
+def _dormir(segundos):
+    time.sleep(segundos)
+
+
+class PoolReportesTests(SimpleTestCase):
+    """Reciclaje del pool de reportes cuando un worker muere, se cuelga o crece de más."""
+
+    def setUp(self):
+        self.pool = PoolReportes(workers=1, max_trabajos=10, max_rss_mb=0, timeout=60)
+        self.addCleanup(self.pool.cerrar)
+
+    def test_worker_muerto_no_rompe_los_siguientes_reportes(self):
+        self.assertEqual(self.pool.ejecutar(_eco, 1), 1)
+        with self.assertLogs('core.renderizado', 'WARNING') as registro, self.assertRaises(ErrorReporte):
+            self.pool.ejecutar(_morir)  # muere también en el reintento
+        self.assertEqual(len(registro.records), 2)
+        self.assertEqual(self.pool.ejecutar(_eco, 2), 2)
+
+    def test_reporte_colgado_recicla_el_pool(self):
+        self.pool.ejecutar(_eco, 1)  # arranca el worker (django.setup) antes de medir el tiempo
+        colgado = self.pool._pool
+        procesos = list(colgado._processes.values())
+
+        self.pool.timeout = 1
+        with self.assertLogs('core.renderizado', 'WARNING'), self.assertRaises(ErrorReporte) as error:
+            self.pool.ejecutar(_dormir, 60)
+        self.assertFalse(error.exception.reintentable)
+        self.assertIsNot(self.pool._pool, colgado)
+        for proceso in procesos:
+            proceso.join(timeout=10)
+            self.assertFalse(proceso.is_alive())
+
+        self.pool.timeout = 60
+        self.assertEqual(self.pool.ejecutar(_eco, 3), 3)
+
+    def test_recicla_al_pasar_el_limite_de_memoria(self):
+        self.pool.max_rss_mb = 1
+        self.pool.ejecutar(_eco, 1)
+        self.assertIsNone(self.pool._pool)
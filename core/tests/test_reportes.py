@@ -0,0 +1,164 @@
+import io
+import os
+import tempfile
+import zipfile
+from concurrent.futures import Future
+from datetime import date, datetime
+from unittest import mock
+
+from django.http import FileResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from core import renderizado, reportes
+from core.descargas import abrir_temporal, archivo_temporal
+from core.models import AnexoRequerido, Documento, Usuario
+
+
+class ReporteAnexosTests(TestCase):
+
+    def test_fecha_en_espanol_en_el_reporte_y_el_nombre(self):
+        self.assertEqual(reportes.fecha_larga(date(2026, 1, 9)), '09 de enero de 2026')
+        self.assertEqual(reportes.fecha_larga(date(2026, 12, 31)), '31 de diciembre de 2026')
+
+        AnexoRequerido.objects.create(nombre='Anexo 1')
+        marzo = timezone.make_aware(datetime(2026, 3, 5, 10, 30))
+        salida = io.BytesIO()
+        with mock.patch('core.reportes.timezone.localtime', return_value=marzo):
+            nombre = reportes.generar_reporte_anexos(salida)
+
+        self.assertEqual(nombre, 'Reporte_Anexos_05-de-marzo-de-2026.pdf')
+        self.assertTrue(salida.getvalue().startswith(b'%PDF'))
+
+    def test_conteos_solo_de_entidades_activas(self):
+        anexo = AnexoRequerido.objects.create(nombre='Anexo 1')
+        una = Usuario.objects.create_user(username='una', correo='una@ejemplo.test', password='x')
+        baja = Usuario.objects.create_user(username='baja', correo='baja@ejemplo.test', password='x', is_active=False)
+        admin = Usuario.objects.create_user(username='admin', correo='admin@ejemplo.test', password='x', rol='admin')
+        Documento.objects.create(usuario=una, anexo=anexo, estado='validado', archivo='documentos/a.pdf')
+        Documento.objects.create(usuario=baja, anexo=anexo, estado='validado', archivo='documentos/b.pdf')
+        Documento.objects.create(usuario=admin, anexo=anexo, estado='rechazado', archivo='documentos/c.pdf')
+
+        [conteo] = reportes.conteos_por_anexo()
+        self.assertEqual(
+            (conteo.cargados, conteo.cumplieron, conteo.rechazados, conteo.pendientes), (1, 1, 0, 0),
+        )
+
+
+@override_settings(REPORTES_FUERA_DE_PROCESO=False)
+class ExportarReportesEntidadesTests(TestCase):
+    """ZIP con el reporte individual de cada entidad (en el proceso de la prueba)."""
+
+    def setUp(self):
+        AnexoRequerido.objects.create(nombre='Anexo 1')
+        self.una = Usuario.objects.create_user(username='una', correo='una@ejemplo.test', password='x')
+        self.otra = Usuario.objects.create_user(
+            username='otra', correo='otra@ejemplo.test', password='x', entidad_federativa='Zacatecas',
+        )
+        Usuario.objects.create_user(username='baja', correo='baja@ejemplo.test', password='x', is_active=False)
+        admin = Usuario.objects.create_superuser(
+            username='admin', correo='admin@ejemplo.test', password='x', rol='admin',
+        )
+        self.client.force_login(admin)
+
+    def _nombres(self, consulta=''):
+        response = self.client.get(f'/reporte/entidades/zip/{consulta}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archivo_zip:
+            self.assertIsNone(archivo_zip.testzip())
+            return sorted(nombre.split('_')[1] for nombre in archivo_zip.namelist())
+
+    def test_un_reporte_por_entidad_activa(self):
+        self.assertEqual(self._nombres(), ['otra', 'una'])
+
+    def test_filtros_por_entidad_y_entidad_federativa(self):
+        self.assertEqual(self._nombres(f'?entidad={self.una.id}'), ['una'])
+        self.assertEqual(self._nombres('?entidad_federativa=Zacatecas'), ['otra'])
+
+    def test_sin_entidades_regresa_con_mensaje(self):
+        response = self.client.get('/reporte/entidades/zip/?entidad_federativa=Sonora')
+        self.assertRedirects(response, '/revision/', fetch_redirect_response=False)
+
+
+class _PoolFalso:
+    """Registra cuántos reportes hay encolados a la vez; cada uno termina al enviarse."""
+
+    timeout = 60
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.en_curso = self.maximo = 0
+        self.enviados = []
+
+    def enviar(self, funcion, trabajo, eid):
+        self.en_curso += 1
+        self.maximo = max(self.maximo, self.en_curso)
+        self.enviados.append(eid)
+        with tempfile.NamedTemporaryFile(delete=False) as destino:
+            destino.write(str(eid).encode())
+        futuro = Future()
+        futuro.set_result(((f'Reporte_{eid}.pdf', destino.name), 0))
+        return futuro
+
+    def resultado(self, futuro):
+        self.en_curso -= 1
+        return futuro.result()[0]
+
+
+@override_settings(REPORTES_FUERA_DE_PROCESO=True)
+class ExportacionParalelaTests(SimpleTestCase):
+    """La exportación masiva reparte N entidades en su propio pool, de workers en workers."""
+
+    def test_encola_hasta_el_limite_de_workers(self):
+        pool = _PoolFalso(workers=3)
+        with mock.patch('core.renderizado.obtener_pool_exportacion', return_value=pool):
+            generados = {
+                nombre: archivo.read() for nombre, archivo in renderizado.exportar_reportes_entidades(range(1, 8))
+            }
+
+        self.assertEqual(pool.enviados, list(range(1, 8)))
+        self.assertEqual(pool.maximo, 3)
+        self.assertEqual(generados['Reporte_7.pdf'], b'7')
+
+    def test_workers_por_nucleo_o_por_ajuste(self):
+        with mock.patch('core.renderizado.os.cpu_count', return_value=12):
+            with self.settings(REPORTES_EXPORTACION_WORKERS=None):
+                self.assertEqual(renderizado.workers_exportacion(), 12)
+            with self.settings(REPORTES_EXPORTACION_WORKERS=4):
+                self.assertEqual(renderizado.workers_exportacion(), 4)
+
+
+@override_settings(REPORTES_FUERA_DE_PROCESO=False)
+class DescargaReporteTests(TestCase):
+    """Los PDF se entregan desde un temporal con FileResponse, no desde la memoria."""
+
+    def test_reporte_como_archivo_adjunto_con_longitud(self):
+        AnexoRequerido.objects.create(nombre='Anexo 1')
+        entidad = Usuario.objects.create_user(username='una', correo='una@ejemplo.test', password='x')
+        admin = Usuario.objects.create_superuser(
+            username='admin', correo='admin@ejemplo.test', password='x', rol='admin',
+        )
+        self.client.force_login(admin)
+
+        response = self.client.get(f'/reporte/entidad/{entidad.id}/pdf/')
+        self.assertIsInstance(response, FileResponse)
+        contenido = b''.join(response.streaming_content)
+        self.assertTrue(contenido.startswith(b'%PDF'))
+        self.assertEqual(int(response['Content-Length']), len(contenido))
+        self.assertIn('attachment; filename="Reporte_una_', response['Content-Disposition'])
+
+    @override_settings(REPORTES_SPOOL_MAX_BYTES=1024)
+    def test_temporal_pasa_a_disco_al_crecer(self):
+        with archivo_temporal() as archivo:
+            archivo.write(b'x' * 512)
+            self.assertFalse(archivo._rolled)
+            archivo.write(b'x' * 1024)
+            self.assertTrue(archivo._rolled)
+
+    def test_temporal_de_otro_proceso_se_borra_al_abrirlo(self):
+        with tempfile.NamedTemporaryFile(delete=False) as destino:
+            destino.write(b'%PDF-1.4')
+        with abrir_temporal(destino.name) as archivo:
+            self.assertFalse(os.path.exists(destino.name))
+            self.assertEqual(archivo.read(), b'%PDF-1.4')
@@ -0,0 +1,140 @@
+import io
+import shutil
+import tempfile
+import zipfile
+from datetime import date, datetime, timezone
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from core.models import AnexoHistorico, AnexoRequerido, Usuario
+from core.respaldos import diferencias
+
+
+class DiferenciasRespaldosTests(TestCase):
+    """Comparación del histórico entre dos fechas."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media = tempfile.mkdtemp(prefix='test_media_')
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media, ignore_errors=True)
+        super().tearDownClass()
+
+    def _respaldo(self, entidad, anexo, mes, contenido):
+        respaldo = AnexoHistorico(entidad=entidad, anexo_requerido=anexo)
+        respaldo.archivo.save('respaldo.pdf', ContentFile(contenido), save=False)
+        respaldo.save()
+        AnexoHistorico.objects.filter(id=respaldo.id).update(
+            fecha_subida=datetime(2024, mes, 10, tzinfo=timezone.utc)
+        )
+        return respaldo
+
+    def test_agregados_eliminados_cambiados_y_sin_cambios(self):
+        entidad = Usuario.objects.create_user(username='una', correo='una@ejemplo.test', password='x')
+        a1, a2, a3, a4 = (AnexoRequerido.objects.create(nombre=f'Anexo {i}') for i in range(1, 5))
+        self._respaldo(entidad, a4, 1, b'sin tocar')
+        self._respaldo(entidad, a1, 3, b'igual')
+        self._respaldo(entidad, a1, 5, b'igual')        # copia nueva, mismo contenido
+        self._respaldo(entidad, a2, 3, b'version 1')
+        self._respaldo(entidad, a2, 5, b'version 2')
+        self._respaldo(entidad, a3, 5, b'nuevo')
+
+        estados = {f['anexo_id']: f['estado'] for f in diferencias(date(2024, 3, 31), date(2024, 6, 30))}
+        self.assertEqual(estados, {
+            a1.id: 'sin_cambios', a2.id: 'cambiado', a3.id: 'agregado', a4.id: 'sin_cambios',
+        })
+        # Los hashes quedan guardados: la siguiente comparación ya no lee archivos
+        self.assertEqual(AnexoHistorico.objects.exclude(hash_contenido='').count(), 4)
+        with self.assertNumQueries(3):
+            diferencias(date(2024, 3, 31), date(2024, 6, 30))
+
+        estados = {f['anexo_id']: f['estado'] for f in diferencias(date(2024, 6, 30), date(2024, 3, 31))}
+        self.assertEqual(estados[a3.id], 'eliminado')
+
+
+@override_settings(RESPALDOS_POR_PAGINA=2)
+class VistaRespaldosTests(TestCase):
+    """Explorador paginado del histórico con los años calculados en la base."""
+
+    def setUp(self):
+        self.a1 = AnexoRequerido.objects.create(nombre='Anexo 1')
+        self.a2 = AnexoRequerido.objects.create(nombre='Anexo 2')
+        self.una = Usuario.objects.create_user(username='una', correo='una@ejemplo.test', password='x')
+        otra = Usuario.objects.create_user(username='otra', correo='otra@ejemplo.test', password='x')
+        self.ids = []
+        for entidad, anexo, anio in ((self.una, self.a1, 2023), (self.una, self.a1, 2024), (self.una, self.a2, 2024),
+                                     (otra, self.a1, 2024), (otra, self.a2, 2025)):
+            respaldo = AnexoHistorico.objects.create(entidad=entidad, anexo_requerido=anexo, archivo='anexos_historicos/x.pdf')
+            AnexoHistorico.objects.filter(id=respaldo.id).update(fecha_subida=datetime(anio, 6, 1, tzinfo=timezone.utc))
+            self.ids.append(respaldo.id)
+
+        admin = Usuario.objects.create_user(username='admin', correo='admin@ejemplo.test', password='x', rol='admin')
+        self.client.force_login(admin)
+
+    def _ver(self, consulta=''):
+        return self.client.get(f'/vista_respaldo_anexos/{consulta}').context
+
+    def test_paginas_del_mas_reciente_al_mas_antiguo(self):
+        contexto = self._ver()
+        self.assertEqual(contexto['respaldos'].paginator.count, 5)
+        self.assertEqual([r.id for r in contexto['respaldos']], [self.ids[4], self.ids[3]])
+        self.assertEqual([r.id for r in self._ver('?page=3')['respaldos']], [self.ids[0]])
+        # Una página fuera de rango muestra la última
+        self.assertEqual(self._ver('?page=99')['respaldos'].number, 3)
+
+    def test_anios_con_totales_respetan_entidad_y_anexo(self):
+        self.assertEqual(self._ver()['years'], [
+            {'anio': 2025, 'total': 1}, {'anio': 2024, 'total': 3}, {'anio': 2023, 'total': 1},
+        ])
+        contexto = self._ver(f'?year=2024&entidad={self.una.id}&anexo={self.a1.id}&page=1')
+        self.assertEqual(contexto['years'], [{'anio': 2024, 'total': 1}, {'anio': 2023, 'total': 1}])
+        self.assertEqual([r.id for r in contexto['respaldos']], [self.ids[1]])
+        self.assertEqual(contexto['filtros_qs'], f'year=2024&entidad={self.una.id}&anexo={self.a1.id}')
+
+
+class DescargaRespaldosTests(TestCase):
+    """El histórico completo sale en un ZIP en flujo, archivo por archivo."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp(prefix='test_media_')
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        anexo = AnexoRequerido.objects.create(nombre='Anexo Único')
+        entidad = Usuario.objects.create_user(username='Secretaría A', correo='a@ejemplo.test', password='x')
+        respaldo = AnexoHistorico(entidad=entidad, anexo_requerido=anexo)
+        respaldo.archivo.save('respaldo.pdf', ContentFile(b'%PDF contenido'), save=False)
+        respaldo.save()
+        AnexoHistorico.objects.filter(id=respaldo.id).update(fecha_subida=datetime(2024, 3, 10, 9, 5, tzinfo=timezone.utc))
+        self.perdido = AnexoHistorico.objects.create(
+            entidad=entidad, anexo_requerido=anexo, archivo='anexos_historicos/no/existe.pdf',
+        )
+
+        admin = Usuario.objects.create_user(username='admin', correo='admin@ejemplo.test', password='x', rol='admin')
+        self.client.force_login(admin)
+
+    def test_zip_en_flujo_omite_archivos_perdidos(self):
+        response = self.client.get('/descargar_respaldo_zip/')
+        self.assertTrue(response.streaming)
+        self.assertIn('Respaldo_Documental_', response['Content-Disposition'])
+        with self.assertLogs('core.views.respaldos', 'WARNING') as registro:
+            contenido = b''.join(response.streaming_content)
+        self.assertIn(str(self.perdido.id), registro.output[0])
+
+        with zipfile.ZipFile(io.BytesIO(contenido)) as archivo_zip:
+            self.assertEqual(archivo_zip.namelist(), ['secretaria-a/anexo-unico_20240310_0905.pdf'])
+            self.assertEqual(archivo_zip.read('secretaria-a/anexo-unico_20240310_0905.pdf'), b'%PDF contenido')
+
+    def test_sin_respaldos_regresa_con_mensaje(self):
+        AnexoHistorico.objects.all().delete()
+        response = self.client.get('/descargar_respaldo_zip/')
+        self.assertRedirects(response, '/vista_respaldo_anexos/', fetch_redirect_response=False)
@@ -0,0 +1,183 @@
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from core import puntajes, tareas
+from core.models import AnexoHistorico, AnexoRequerido, Documento, TareaFondo, Usuario
+
+
+@override_settings(RESPALDOS_PURGA_LOTE=2, USUARIOS_BORRADO_LOTE=2)
+class TareasFondoTests(TestCase):
+    """Trabajos de TareaFondo ejecutados en el hilo de la prueba."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media = tempfile.mkdtemp(prefix='test_media_')
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media, ignore_errors=True)
+        super().tearDownClass()
+
+    def _respaldo(self, entidad, anio):
+        respaldo = AnexoHistorico(entidad=entidad, anexo_requerido=self.anexo)
+        respaldo.archivo.save('respaldo.pdf', ContentFile(b'%PDF'), save=False)
+        respaldo.save()
+        AnexoHistorico.objects.filter(id=respaldo.id).update(
+            fecha_subida=datetime(anio, 6, 1, tzinfo=timezone.utc)
+        )
+        return respaldo.archivo.name
+
+    def setUp(self):
+        self.anexo = AnexoRequerido.objects.create(nombre='Anexo 1')
+        self.una = Usuario.objects.create_user(username='una', correo='una@ejemplo.test', password='x')
+        self.otra = Usuario.objects.create_user(username='otra', correo='otra@ejemplo.test', password='x')
+
+    def test_purgar_respaldos_por_anio_y_entidad(self):
+        viejos = [self._respaldo(self.una, 2022) for _ in range(3)]
+        conservados = [self._respaldo(self.una, 2024), self._respaldo(self.otra, 2022)]
+
+        tarea = TareaFondo.objects.create(
+            tipo='purgar_respaldos', parametros={'anio': 2022, 'entidad_id': self.una.id},
+        )
+        tareas.ejecutar(tarea.id)
+        tareas.esperar(timeout=10)
+
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, 'terminada', tarea.mensaje)
+        self.assertEqual((tarea.procesados, tarea.total), (3, 3))
+        self.assertEqual(
+            sorted(AnexoHistorico.objects.values_list('archivo', flat=True)), sorted(conservados)
+        )
+        self.assertFalse(any(default_storage.exists(r) for r in viejos))
+        self.assertTrue(all(default_storage.exists(r) for r in conservados))
+
+    @override_settings(RESPALDOS_RETENCION={'ultimas': 2, 'una_por_anio': True})
+    def test_compactar_respaldos_conserva_ultimas_y_una_por_anio(self):
+        por_anio = {anio: [self._respaldo(self.una, anio) for _ in range(3)] for anio in (2021, 2022, 2024)}
+        pocos = [self._respaldo(self.otra, 2020), self._respaldo(self.otra, 2020)]
+
+        tarea = TareaFondo.objects.create(tipo='compactar_respaldos')
+        tareas.ejecutar(tarea.id)
+        tareas.esperar(timeout=10)
+
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, 'terminada', tarea.mensaje)
+        self.assertEqual(tarea.total, 1)  # 'otra' no excede la política y ni se revisa
+        # Las 2 más recientes (ambas de 2024) y la más reciente de 2021 y 2022
+        conservados = por_anio[2024][-2:] + [por_anio[2021][-1], por_anio[2022][-1]] + pocos
+        self.assertEqual(
+            sorted(AnexoHistorico.objects.values_list('archivo', flat=True)), sorted(conservados)
+        )
+        borrados = set(sum(por_anio.values(), [])) - set(conservados)
+        self.assertFalse(any(default_storage.exists(r) for r in borrados))
+
+    @override_settings(RESPALDOS_RETENCION={'ultimas': 1, 'una_por_anio': True})
+    def test_compactar_respaldos_solo_revisa_grupos_con_respaldos_nuevos(self):
+        def compactar(**parametros):
+            tarea = TareaFondo.objects.create(tipo='compactar_respaldos', parametros=parametros)
+            tareas.ejecutar(tarea.id)
+            tareas.esperar(timeout=10)
+            tarea.refresh_from_db()
+            self.assertEqual(tarea.estado, 'terminada', tarea.mensaje)
+            return tarea.total
+
+        # Una copia por año: el grupo conserva más de 'ultimas' sin exceder la política
+        for anio in (2021, 2022, 2023):
+            self._respaldo(self.una, anio)
+        self.assertEqual(compactar(), 1)
+        self.assertEqual(compactar(), 0)  # nada nuevo desde la marca
+        self.assertEqual(compactar(ultimas=2), 1)  # otra política: revisa todo de nuevo
+        self.assertEqual(compactar(ultimas=2, completa=True), 1)
+
+        for _ in range(3):
+            self._respaldo(self.otra, 2024)
+        self.assertEqual(compactar(ultimas=2), 1)  # solo 'otra', que recibió respaldos
+        self.assertEqual(AnexoHistorico.objects.filter(entidad=self.otra).count(), 2)
+        self.assertEqual(AnexoHistorico.objects.filter(entidad=self.una).count(), 3)
+
+    def test_eliminar_usuario_en_segundo_plano(self):
+        admin = Usuario.objects.create_user(
+            username='admin', correo='admin@ejemplo.test', password='x', rol='admin',
+        )
+        rutas = [self._respaldo(self.una, 2024) for _ in range(3)]
+        documento = Documento(usuario=self.una, anexo=self.anexo)
+        documento.archivo.save('anexo.pdf', ContentFile(b'%PDF'))
+        rutas.append(documento.archivo.name)
+        conservado = self._respaldo(self.otra, 2024)
+
+        self.client.force_login(admin)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(f'/eliminar_usuario/{self.una.id}/')
+        self.assertEqual(len(callbacks), 1)  # la tarea se lanza al confirmar, no aquí
+        self.una.refresh_from_db()
+        self.assertFalse(self.una.is_active)
+
+        tarea = TareaFondo.objects.get(tipo='eliminar_usuario')
+        self.assertEqual(tarea.parametros, {'usuario_id': self.una.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            tareas.ejecutar(tarea.id)
+        tareas.esperar(timeout=10)
+
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, 'terminada', tarea.mensaje)
+        self.assertEqual((tarea.procesados, tarea.total), (4, 4))
+        self.assertFalse(Usuario.objects.filter(id=self.una.id).exists())
+        self.assertFalse(any(default_storage.exists(r) for r in rutas))
+        self.assertTrue(default_storage.exists(conservado))
+
+    def _admin(self):
+        admin = Usuario.objects.create_user(
+            username='admin', correo='admin@ejemplo.test', password='x', rol='admin',
+        )
+        self.client.force_login(admin)
+
+    def test_baja_abandonada_se_puede_lanzar_de_nuevo(self):
+        self._admin()
+        en_curso = TareaFondo.objects.create(
+            tipo='eliminar_usuario', parametros={'usuario_id': self.una.id}, estado='en_curso',
+        )
+        with self.captureOnCommitCallbacks():
+            self.client.post(f'/eliminar_usuario/{self.una.id}/')
+        self.assertEqual(TareaFondo.objects.filter(tipo='eliminar_usuario').count(), 1)  # sigue en curso
+
+        # Sin avance desde hace una hora (p. ej. se reinició el worker)
+        TareaFondo.objects.filter(id=en_curso.id).update(
+            fecha_avance=datetime.now(timezone.utc) - timedelta(hours=1),
+        )
+        en_curso.refresh_from_db()
+        self.assertTrue(en_curso.abandonada)
+        with self.captureOnCommitCallbacks():
+            self.client.post(f'/eliminar_usuario/{self.una.id}/')
+        en_curso.refresh_from_db()
+        self.assertEqual(en_curso.estado, 'fallida')
+        nueva = TareaFondo.objects.filter(tipo='eliminar_usuario').exclude(id=en_curso.id).get()
+        self.assertEqual(nueva.estado, 'pendiente')
+
+    def test_baja_invalida_puntajes_por_lote_y_excluye_a_la_entidad(self):
+        self._admin()
+        for i in range(3):
+            anexo = AnexoRequerido.objects.create(nombre=f'Extra {i}')
+            Documento.objects.create(usuario=self.una, anexo=anexo)
+        self.assertIn(self.una.id, puntajes.obtener_puntajes())
+
+        with self.captureOnCommitCallbacks():
+            self.client.post(f'/eliminar_usuario/{self.una.id}/')
+        # Desactivada: ya no cuenta en los puntajes aunque sus datos sigan ahí
+        self.assertNotIn(self.una.id, puntajes.obtener_puntajes())
+
+        tarea = TareaFondo.objects.get(tipo='eliminar_usuario')
+        with mock.patch('core.puntajes.invalidar') as invalidar:
+            with self.captureOnCommitCallbacks(execute=True):
+                tareas.ejecutar(tarea.id)
+        # 3 documentos en lotes de 2 = 2 invalidaciones, más la del usuario
+        self.assertEqual(invalidar.call_count, 3)
@@ -0,0 +1,64 @@
+from datetime import date, datetime, timezone
+
+from django.test import TestCase
+
+from core.models import AnexoHistorico, AnexoRequerido, Documento, Usuario
+
+
+class TendenciasTests(TestCase):
+    """Series semanales acumuladas por grupo (lunes a domingo)."""
+
+    def _documento(self, entidad, anexo, estado, dia):
+        documento = Documento.objects.create(usuario=entidad, anexo=anexo, estado=estado, archivo='documentos/x.pdf')
+        Documento.objects.filter(id=documento.id).update(fecha_subida=dia)
+
+    def setUp(self):
+        anexo_a = AnexoRequerido.objects.create(nombre='A')
+        anexo_b = AnexoRequerido.objects.create(nombre='B')
+        una = Usuario.objects.create_user(
+            username='una', correo='una@ejemplo.test', password='x', entidad_federativa='Zacatecas',
+        )
+        otra = Usuario.objects.create_user(
+            username='otra', correo='otra@ejemplo.test', password='x', entidad_federativa='Sonora',
+        )
+        baja = Usuario.objects.create_user(
+            username='baja', correo='baja@ejemplo.test', password='x', entidad_federativa='Sonora', is_active=False,
+        )
+        # Semana del lunes 5 y del lunes 12 de enero de 2026
+        self._documento(una, anexo_a, 'validado', date(2026, 1, 5))
+        self._documento(una, anexo_b, 'pendiente', date(2026, 1, 14))
+        self._documento(otra, anexo_a, 'validado', date(2026, 1, 18))
+        self._documento(baja, anexo_a, 'validado', date(2026, 1, 5))
+        respaldo = AnexoHistorico.objects.create(entidad=una, anexo_requerido=anexo_a, archivo='anexos_historicos/x.pdf')
+        AnexoHistorico.objects.filter(id=respaldo.id).update(
+            fecha_subida=datetime(2026, 1, 6, 18, 0, tzinfo=timezone.utc),
+        )
+
+        admin = Usuario.objects.create_user(username='admin', correo='admin@ejemplo.test', password='x', rol='admin')
+        self.client.force_login(admin)
+
+    def test_series_por_entidad_federativa(self):
+        datos = self.client.get('/reporte/tendencias/').json()
+
+        self.assertEqual(datos['semanas'], ['2026-01-05', '2026-01-12'])
+        series = {s['grupo']: s for s in datos['series']}
+        self.assertEqual(sorted(series), ['Sonora', 'Zacatecas'])  # sin la entidad dada de baja
+        self.assertEqual(series['Zacatecas']['cargados'], [1, 2])
+        self.assertEqual(series['Zacatecas']['validados'], [1, 1])
+        self.assertEqual(series['Zacatecas']['respaldos'], [1, 1])
+        self.assertEqual(series['Zacatecas']['porcentaje'], [50.0, 50.0])
+        self.assertEqual(series['Sonora']['cargados'], [0, 1])
+        self.assertEqual(series['Sonora']['porcentaje'], [0.0, 50.0])
+        # 2 entidades activas × 2 anexos esperados
+        self.assertEqual(datos['total'], [25.0, 50.0])
+
+    def test_series_por_entidad(self):
+        datos = self.client.get('/reporte/tendencias/?por=entidad').json()
+        self.assertEqual(datos['por'], 'entidad')
+        self.assertEqual(sorted(s['grupo'] for s in datos['series']), ['otra', 'una'])
+
+    def test_sin_datos(self):
+        Documento.objects.all().delete()
+        AnexoHistorico.objects.all().delete()
+        datos = self.client.get('/reporte/tendencias/?por=desconocido').json()
+        self.assertEqual(datos, {'por': 'entidad_federativa', 'semanas': [], 'total': [], 'series': []})
@@ -0,0 +1,86 @@
+# --------------------
+# Utilidades para pruebas
+# --------------------
+import os
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+_RAIZ = str(settings.BASE_DIR)
+
+
+def sitio_de_llamada():
+    """Describe dónde se originó un query: código del proyecto y, si aplica, la plantilla.
+
+    Regresa por ejemplo ``'core/views/documentos.py:62 (usuario_dashboard) | core/usuario_dashboard.html:67'``.
+    """
+    codigo = plantilla = None
+    frame = sys._getframe(1)
+    while frame is not None and (codigo is None or plantilla is None):
+        archivo = frame.f_code.co_filename
+        if plantilla is None and frame.f_code.co_name == 'render_annotated':
+            nodo = frame.f_locals.get('self')
+            origen, token = getattr(nodo, 'origin', None), getattr(nodo, 'token', None)
+            if origen is not None and token is not None:
+                plantilla = f'{origen.template_name}:{token.lineno}'
+        if (codigo is None and archivo.startswith(_RAIZ) and 'site-packages' not in archivo
+                and f'{os.sep}tests{os.sep}' not in archivo):
+            codigo = f'{os.path.relpath(archivo, _RAIZ)}:{frame.f_lineno} ({frame.f_code.co_name})'
+        frame = frame.f_back
+    return ' | '.join(p for p in (codigo or '(Django)', plantilla) if p)
+
+
+class RegistroConsultas:
+    """Registra los queries ejecutados dentro del bloque junto con su sitio de llamada.
+
+    Uso::
+
+        with RegistroConsultas() as registro:
+            cliente.get(url)
+        len(registro), registro.por_sitio()
+    """
+
+    def __init__(self, conexion=connection):
+        self.conexion = conexion
+        self.consultas = []
+        self._envoltura = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.consultas.append((sql, sitio_de_llamada()))
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._envoltura = self.conexion.execute_wrapper(self)
+        self._envoltura.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self._envoltura.__exit__(*exc)
+
+    def __len__(self):
+        return len(self.consultas)
+
+    def por_sitio(self):
+        """``Counter`` de queries por sitio de llamada."""
+        return Counter(sitio for _, sitio in self.consultas)
+
+    def ejemplos(self):
+        """Primer SQL registrado en cada sitio."""
+        ejemplos = {}
+        for sql, sitio in self.consultas:
+            ejemplos.setdefault(sitio, sql)
+        return ejemplos
+
+
+def describir_crecimiento(chico, grande):
+    """Texto con los sitios cuyo número de queries creció de ``chico`` a ``grande``."""
+    antes, despues = chico.por_sitio(), grande.por_sitio()
+    ejemplos = grande.ejemplos()
+    lineas = []
+    for sitio, n in despues.most_common():
+        if n > antes.get(sitio, 0):
+            lineas.append(f'  {antes.get(sitio, 0)} -> {n}  {sitio}')
+            lineas.append(f'      {ejemplos[sitio][:300]}')
+    return '\n'.join(lineas) or '  (mismos sitios; cambió el SQL ejecutado)'
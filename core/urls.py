@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from django.shortcuts import redirect
 from . import views
@@ -26,6 +27,11 @@ urlpatterns = [
     # Reportes generales
     path('reporte/general/pdf/', views.reporte_general_pdf, name='reporte_general_pdf'),
     path('reporte/entidad/<int:entidad_id>/pdf/', views.reporte_entidad_pdf, name='reporte_entidad_pdf'),
+    path('reporte/entidades/zip/', views.exportar_reportes_entidades, name='exportar_reportes_entidades'),
+    path('reporte/documentos/zip/', views.descargar_documentos_zip, name='descargar_documentos_zip'),
+    path('reporte/matriz/', views.exportar_matriz_cumplimiento, name='exportar_matriz_cumplimiento'),
+    path('reporte/tendencias/', views.tendencias_cumplimiento, name='tendencias_cumplimiento'),
+    path('reporte/instantanea/', views.descargar_instantanea, name='descargar_instantanea'),
 
     # Respaldos y utilidades
     path('olvido_contrasena/', views.olvido_contrasena, name='olvido_contrasena'),
@@ -34,10 +40,20 @@ urlpatterns = [
     path('vista_respaldo_anexos/', views.vista_respaldo_anexos, name='vista_respaldo_anexos'),
     path('limpiar_respaldo/', views.limpiar_respaldo, name='limpiar_respaldo'),
     path('descargar_respaldo_zip/', views.descargar_respaldo_zip, name='descargar_respaldo_zip'),
+    path('diferencias_respaldos/', views.diferencias_respaldos, name='diferencias_respaldos'),
     path("cambiar_contrasena/", views.cambiar_contrasena, name="cambiar_contrasena"),
     path("cambiar_contrasena_admin/", views.cambiar_contrasena_admin, name="cambiar_contrasena_admin"),
 
 
+    # Métricas (Prometheus) y perfiles de peticiones
+    path('metrics', views.metricas_prometheus, name='metricas'),
+    path('perfiles/', views.admin_perfiles, name='admin_perfiles'),
+    path('perfiles/<str:perfil_id>/<str:tipo>/', views.descargar_perfil, name='descargar_perfil'),
+    path('tareas/<int:tarea_id>/', views.estado_tarea, name='estado_tarea'),
+
+    # Archivos subidos (solo su entidad o un administrador; ver core/views/archivos.py)
+    path(settings.MEDIA_URL.lstrip('/') + '<path:ruta>', views.servir_archivo, name='servir_archivo'),
+
     # Redireccionamiento por defecto
     path('', lambda request: redirect('login')),
 ]
@@ -0,0 +1,50 @@
+# --------------------
+# Vistas de core, separadas por área
+# --------------------
+# - sesion:          inicio de sesión y contraseñas
+# - documentos:      dashboard de la entidad y revisión de documentación
+# - administracion:  usuarios, perfil del administrador y anexos
+# - reportes:        PDF, matriz de cumplimiento, instantáneas y tendencias
+# - respaldos:       histórico de anexos
+# - monitoreo:       métricas, perfiles de peticiones y avance de tareas
+# - archivos:        archivos subidos (solo su entidad o un administrador)
+#
+# IMPORTANTE: ningún submódulo importa matplotlib, ReportLab ni NumPy a nivel
+# de módulo; se cargan con la primera petición que los necesita. Así cada
+# worker (y cada ``manage.py``) arranca sin pagar su costo. Para medirlo:
+#
+#   python manage.py tiempo_importacion
+from .administracion import (
+    admin_anexos,
+    admin_crear_usuario,
+    admin_eliminar_usuario,
+    admin_gestion_usuarios,
+    admin_perfil,
+    cambiar_contrasena_admin,
+    editar_usuario,
+    eliminar_anexo,
+    eliminar_todos_anexos,
+    limpiar_anexos_subidos,
+)
+from .archivos import servir_archivo
+from .comunes import es_admin, sincronizar_documentos_por_usuario
+from .documentos import admin_revision_documentacion, usuario_dashboard
+from .monitoreo import admin_perfiles, descargar_perfil, estado_tarea, metricas_prometheus
+from .reportes import (
+    descargar_documentos_zip,
+    descargar_instantanea,
+    exportar_matriz_cumplimiento,
+    exportar_reportes_entidades,
+    reporte_anexos_pdf,
+    reporte_entidad_pdf,
+    reporte_general_pdf,
+    tendencias_cumplimiento,
+)
+from .respaldos import (
+    descargar_respaldo_zip,
+    diferencias_respaldos,
+    limpiar_respaldo,
+    respaldar_anexos,
+    vista_respaldo_anexos,
+)
+from .sesion import cambiar_contrasena, cerrar_sesion, generar_contrasena, login_view, olvido_contrasena
@@ -0,0 +1,207 @@
+# --------------------
+# Administración de usuarios, perfil y anexos
+# --------------------
+from django.contrib import messages
+from django.contrib.auth import update_session_auth_hash
+from django.contrib.auth.decorators import user_passes_test
+from django.contrib.auth.forms import PasswordChangeForm
+from django.db import transaction
+from django.db.utils import IntegrityError
+from django.shortcuts import render, redirect, get_object_or_404
+
+from .. import bajas, tareas
+from ..forms import (
+    CrearUsuarioForm,
+    EditarUsuarioForm,
+    AnexoForm,
+    EditarPerfilAdminForm,
+)
+from ..models import AnexoRequerido, Documento, TareaFondo, Usuario
+from .comunes import es_admin, sincronizar_documentos_por_usuario
+
+
+@user_passes_test(es_admin)
+def admin_crear_usuario(request):
+    if request.method == 'POST':
+        form = CrearUsuarioForm(request.POST)
+        if form.is_valid():
+            usuario = form.save(commit=False)
+            usuario.set_password(form.cleaned_data['password'])
+            usuario.is_active = True
+
+            try:
+                usuario.save()
+                messages.success(request, 'Usuario creado con éxito.')
+                return redirect('admin_crear_usuario')
+
+            # 📌 CAMBIO CLAVE 1: Manejar el error de unicidad (correo ya existe)
+            except IntegrityError:
+                messages.error(request, 'El correo electrónico ya está registrado. Por favor, use uno diferente.')
+                # Renderizamos la página con el formulario lleno para que el admin no pierda datos
+                return render(request, 'core/admin_crear_usuario.html', {'form': form})
+
+        else:
+            # Si la validación del formulario falla por otras razones (e.g., contraseñas no coinciden)
+            # Renderizamos para mostrar los errores específicos del formulario
+            pass
+    else:
+        form = CrearUsuarioForm()
+
+    return render(request, 'core/admin_crear_usuario.html', {'form': form})
+
+@user_passes_test(es_admin)
+def admin_gestion_usuarios(request):
+    # Cada usuario con su baja en segundo plano, si la tiene (ver core/bajas.py)
+    en_curso = bajas.bajas_en_curso()
+    usuarios = list(Usuario.objects.all())
+    for usuario in usuarios:
+        usuario.baja = en_curso.get(usuario.id)
+    return render(request, 'core/admin_gestion_usuarios.html', {
+        'entidades': usuarios,
+    })
+
+@user_passes_test(es_admin)
+def admin_eliminar_usuario(request, usuario_id):
+    usuario = get_object_or_404(Usuario, id=usuario_id)
+
+    if request.method == 'POST':
+        baja = bajas.bajas_en_curso().get(usuario.id)
+        if baja and baja.estado != 'fallida' and not baja.abandonada:
+            messages.info(request, 'La eliminación de este usuario ya está en curso.')
+            return redirect('admin_gestion_usuarios')
+
+        # La cuenta se desactiva de inmediato; sus registros y archivos se borran por lotes en segundo plano
+        with transaction.atomic():
+            if baja and baja.abandonada:
+                TareaFondo.objects.filter(id=baja.id).update(
+                    estado='fallida', mensaje='Se interrumpió y se lanzó de nuevo.',
+                )
+            usuario.is_active = False
+            usuario.save(update_fields=['is_active'])
+            tareas.lanzar('eliminar_usuario', {'usuario_id': usuario.id}, request.user)
+        messages.success(request, 'Usuario desactivado; sus documentos se están eliminando en segundo plano.')
+        return redirect('admin_gestion_usuarios')
+
+    # En caso de acceso por GET (opcional, puede redirigir o lanzar error)
+    return redirect('admin_gestion_usuarios')
+
+@user_passes_test(es_admin)
+def editar_usuario(request, usuario_id):
+    usuario = get_object_or_404(Usuario, id=usuario_id)
+
+    if request.method == 'POST':
+        form = EditarUsuarioForm(request.POST, instance=usuario)
+        if form.is_valid():
+            form.save()
+            messages.success(request, 'Usuario actualizado correctamente.')
+            return redirect('admin_gestion_usuarios')
+    else:
+        form = EditarUsuarioForm(instance=usuario)
+
+    return render(request, 'core/admin_editar_usuario.html', {'form': form, 'usuario': usuario})
+
+
+
+@user_passes_test(es_admin)
+def admin_perfil(request):
+    usuario = request.user
+
+    if request.method == 'POST':
+        form = EditarPerfilAdminForm(request.POST, instance=usuario)
+        if form.is_valid():
+            form.save()
+            messages.success(request, 'Tu perfil fue actualizado correctamente.')
+            return redirect('admin_perfil')
+        else:
+            messages.error(request, 'Revisa los campos e inténtalo de nuevo.')
+    else:
+        form = EditarPerfilAdminForm(instance=usuario)
+
+    return render(request, 'core/admin_perfil.html', {
+        'form': form,
+        'usuario': usuario,
+    })
+
+
+
+@user_passes_test(es_admin)
+def cambiar_contrasena_admin(request):
+    if request.method == 'POST':
+        form = PasswordChangeForm(user=request.user, data=request.POST)
+        if form.is_valid():
+            user = form.save()
+            update_session_auth_hash(request, user)  # mantiene la sesión
+            messages.success(request, 'Contraseña actualizada correctamente.')
+            return redirect('admin_perfil')
+    else:
+        form = PasswordChangeForm(user=request.user)
+
+    return render(request, 'core/cambiar_contrasena_admin.html', {
+        'form': form
+    })
+
+
+# --- Vista principal de administración de anexos
+@user_passes_test(es_admin)
+def admin_anexos(request):
+    anexos = AnexoRequerido.objects.all().order_by('nombre')
+
+    if request.method == 'POST':
+        form = AnexoForm(request.POST)
+        if form.is_valid():
+            form.save()
+            sincronizar_documentos_por_usuario()  # 🔥 sincronización total
+            messages.success(request, "El documento requerido fue agregado correctamente.")
+            return redirect('admin_anexos')  # evita reenvíos dobles
+        else:
+            messages.error(request, "Ocurrió un error al guardar el documento.")
+    else:
+        form = AnexoForm()
+
+    return render(request, 'core/admin_anexos.html', {
+        'anexos': anexos,
+        'form': form,
+    })
+
+
+# --- Eliminar un anexo
+@user_passes_test(es_admin)
+def eliminar_anexo(request, anexo_id):
+    try:
+        anexo = AnexoRequerido.objects.get(id=anexo_id)
+        anexo.delete()
+        messages.success(request, "El anexo fue eliminado correctamente.")
+    except AnexoRequerido.DoesNotExist:
+        messages.error(request, "El anexo no existe.")
+    return redirect('admin_anexos')
+
+# --- Eliminar todos los anexos
+@user_passes_test(es_admin)
+def eliminar_todos_anexos(request):
+    AnexoRequerido.objects.all().delete()
+    messages.success(request, "Todos los anexos han sido eliminados.")
+    return redirect('admin_anexos')
+
+@user_passes_test(es_admin)
+def limpiar_anexos_subidos(request):
+    if request.method == 'POST':
+        from ..puntajes import invalidar
+
+        # Un solo UPDATE; los archivos se borran en segundo plano hasta que la
+        # transacción se confirma (si falla, base y disco quedan como estaban)
+        with transaction.atomic():
+            documentos = (
+                Documento.objects.select_for_update()
+                .exclude(archivo='').exclude(archivo__isnull=True)
+            )
+            rutas = list(documentos.values_list('archivo', flat=True))
+            archivos_limpiados = documentos.update(archivo=None, estado='pendiente', observaciones='')
+            tareas.borrar_al_confirmar(rutas)
+        invalidar()
+
+        if archivos_limpiados:
+            messages.success(request, f"Se han limpiado {archivos_limpiados} archivos subidos correctamente.")
+        else:
+            messages.info(request, "No había archivos para limpiar.")
+        return redirect('admin_anexos')
+    return redirect('admin_anexos')
@@ -0,0 +1,45 @@
+# --------------------
+# Archivos subidos (protegidos)
+# --------------------
+# Reemplaza a static() en las URLs del proyecto: cada archivo de MEDIA_ROOT
+# solo lo descarga la entidad dueña o un administrador. La transferencia la
+# hace core/descargas.py (servidor frontal o FileResponse con rangos).
+from django.contrib.auth.decorators import login_required
+from django.http import Http404
+
+from ..descargas import enviar_archivo
+from ..models import AnexoHistorico, AnexoUsuario, Documento
+from .comunes import es_admin
+
+# Carpeta de MEDIA_ROOT de cada modelo con archivos (ver core/almacenamiento.py)
+# y el campo que indica a qué entidad pertenece
+_DUENOS = {
+    'documentos': (Documento, 'usuario_id'),
+    'anexos_historicos': (AnexoHistorico, 'entidad_id'),
+    'anexos': (AnexoUsuario, 'usuario_id'),
+}
+
+
+def _dueno(ruta):
+    """Id de la entidad dueña del archivo, o ``None`` si no lo registra ningún modelo.
+
+    La carpeta de la ruta indica qué modelo consultar (una sola búsqueda por
+    el índice de ``archivo``); las rutas fuera de esas carpetas se buscan en
+    todos.
+    """
+    carpeta = ruta.split('/', 1)[0]
+    candidatos = [_DUENOS[carpeta]] if carpeta in _DUENOS else _DUENOS.values()
+    for modelo, campo in candidatos:
+        dueno = modelo.objects.filter(archivo=ruta).values_list(campo, flat=True).first()
+        if dueno is not None:
+            return dueno
+    return None
+
+
+@login_required
+def servir_archivo(request, ruta):
+    dueno = _dueno(ruta)
+    # 404 también cuando no es suyo: no revelamos qué archivos existen
+    if dueno is None or not (es_admin(request.user) or dueno == request.user.id):
+        raise Http404("El archivo no existe.")
+    return enviar_archivo(request, ruta)
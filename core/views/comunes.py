@@ -0,0 +1,34 @@
+# --------------------
+# Utilidades compartidas por las vistas
+# --------------------
+from ..models import AnexoRequerido, Documento, Usuario
+
+
+# --- Verificación de rol admin
+def es_admin(user):
+    return user.is_authenticated and (user.is_superuser or user.rol == 'admin')
+
+
+# --- Función para sincronizar anexos con los usuarios (todos por defecto)
+def sincronizar_documentos_por_usuario(usuarios=None):
+    # Solo se insertan los pares (usuario, anexo) que faltan, en lote
+    usuario_ids = [u.id for u in usuarios] if usuarios is not None else list(
+        Usuario.objects.values_list('id', flat=True)
+    )
+    anexo_ids = list(AnexoRequerido.objects.values_list('id', flat=True))
+    documentos = Documento.objects.all()
+    if usuarios is not None:
+        documentos = documentos.filter(usuario_id__in=usuario_ids)
+    existentes = set(documentos.values_list('usuario_id', 'anexo_id'))
+
+    faltantes = [
+        Documento(usuario_id=usuario_id, anexo_id=anexo_id, estado='pendiente', observaciones='')
+        for usuario_id in usuario_ids
+        for anexo_id in anexo_ids
+        if (usuario_id, anexo_id) not in existentes
+    ]
+    if faltantes:
+        Documento.objects.bulk_create(faltantes, batch_size=1000, ignore_conflicts=True)
+        # Import local: los puntajes usan NumPy y no se necesita al arrancar
+        from ..puntajes import invalidar
+        invalidar()
@@ -0,0 +1,100 @@
+# --------------------
+# Carga y revisión de documentación
+# --------------------
+# Los puntajes usan NumPy: se importan dentro de cada vista para que el
+# worker no lo cargue al arrancar, solo con la primera petición que lo use.
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.shortcuts import render, redirect, get_object_or_404
+
+from ..models import AnexoRequerido, Documento, Usuario
+from .comunes import es_admin, sincronizar_documentos_por_usuario
+
+
+@user_passes_test(es_admin)
+def admin_revision_documentacion(request, entidad_id=None):
+    from .. import puntajes
+
+    entidades = Usuario.objects.filter(rol='usuario', is_active=True)
+    entidad_seleccionada = None
+    documentos = Documento.objects.none()
+
+    if entidad_id:
+        entidad_seleccionada = get_object_or_404(Usuario, id=entidad_id)
+
+        # Asegura que existan los documentos
+        sincronizar_documentos_por_usuario([entidad_seleccionada])
+
+        documentos = Documento.objects.filter(usuario=entidad_seleccionada).select_related('anexo')
+
+        if request.method == 'POST':
+            # ... (código para guardar cambios) ...
+            documentos = list(documentos)
+            for doc in documentos:
+                estado = request.POST.get(f'estado_{doc.id}')
+                observaciones = request.POST.get(f'observaciones_{doc.id}')
+                if estado:
+                    doc.estado = estado
+                doc.observaciones = observaciones
+            # Un solo UPDATE en lugar de un save() por documento (bulk_update no emite señales)
+            Documento.objects.bulk_update(documentos, ['estado', 'observaciones'])
+            puntajes.invalidar()
+
+            # 🟢 AÑADIR MENSAJE DE ÉXITO ANTES DE REDIRIGIR
+            messages.success(request, 'Cambios de documentación guardados correctamente.')
+
+            return redirect('admin_revision_documentacion_entidad', entidad_id=entidad_id)
+
+    # Porcentajes desde el motor de puntajes (en caché)
+    puntaje = puntajes.puntajes_de(entidad_seleccionada.id) if entidad_seleccionada else None
+
+    return render(request, 'core/admin_revision_documentacion.html', {
+        'entidades': entidades,
+        'entidad_seleccionada': entidad_seleccionada,
+        'documentos': documentos,
+        'porcentaje_validados': puntaje['general'] if puntaje else 0,
+        'puntaje': puntaje,
+        # Para descargar un anexo de todas las entidades en un ZIP
+        'anexos': AnexoRequerido.objects.order_by('nombre').only('id', 'nombre') if not entidad_seleccionada else (),
+    })
+
+@login_required
+def usuario_dashboard(request):
+    from .. import puntajes
+
+    # 🔹 Asegurar que el usuario tenga documentos creados
+    sincronizar_documentos_por_usuario([request.user])
+
+    documentos = Documento.objects.filter(usuario=request.user).select_related('anexo')
+
+    if request.method == 'POST':
+        archivos_guardados = False  # Bandera para controlar si se subió algo
+
+        for doc in documentos:
+            # Buscamos si viene un archivo para este documento específico
+            archivo = request.FILES.get(f'documento_{doc.id}')
+
+            if archivo:
+                doc.archivo = archivo
+
+                # Opcional: Si el documento fue rechazado antes, al subir uno nuevo
+                # podrías querer regresarlo a estado 'pendiente' automáticamente:
+                if doc.estado == 'rechazado':
+                     doc.estado = 'pendiente'
+
+                doc.save()
+                archivos_guardados = True  # ¡Se guardó al menos uno!
+
+        # Si se guardó al menos un archivo, mandamos el mensaje y recargamos
+        if archivos_guardados:
+            messages.success(request, '¡Documentos subidos exitosamente!')
+            return redirect('usuario_dashboard') # Redirige a la misma URL para limpiar el formulario
+
+    # Porcentajes desde el motor de puntajes (en caché)
+    puntaje = puntajes.puntajes_de(request.user.id)
+
+    return render(request, 'core/usuario_dashboard.html', {
+        'documentos': documentos,
+        'porcentaje_validados': puntaje['general'],
+        'puntaje': puntaje,
+    })
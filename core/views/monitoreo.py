@@ -0,0 +1,60 @@
+# --------------------
+# Monitoreo: métricas, perfiles de peticiones y tareas en segundo plano
+# --------------------
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import user_passes_test
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, JsonResponse
+from django.shortcuts import render, redirect, get_object_or_404
+from django.utils.crypto import constant_time_compare
+
+from .. import metricas, perfilado
+from ..models import TareaFondo
+from .comunes import es_admin
+
+
+# Métricas del proceso en formato de Prometheus
+def metricas_prometheus(request):
+    # Administradores con sesión, o el recolector con el token de METRICAS_TOKEN
+    token = getattr(settings, 'METRICAS_TOKEN', '')
+    con_token = bool(token) and constant_time_compare(
+        request.headers.get('Authorization', ''), f'Bearer {token}'
+    )
+    if not (con_token or es_admin(request.user)):
+        return HttpResponseForbidden()
+    return HttpResponse(metricas.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# Perfiles de peticiones guardados por PerfiladoMiddleware
+@user_passes_test(es_admin)
+def admin_perfiles(request):
+    if request.method == 'POST':
+        perfilado.borrar(request.POST.get('perfil_id', ''))
+        messages.success(request, "Perfil eliminado.")
+        return redirect('admin_perfiles')
+    return render(request, 'core/admin_perfiles.html', {'perfiles': perfilado.listar()})
+
+
+@user_passes_test(es_admin)
+def descargar_perfil(request, perfil_id, tipo):
+    ruta = perfilado.ruta_artefacto(perfil_id, tipo)
+    if ruta is None:
+        raise Http404("El perfil no existe.")
+    extension, content_type = perfilado.ARTEFACTOS[tipo]
+    return FileResponse(open(ruta, 'rb'), as_attachment=True,
+                        filename=f"perfil_{perfil_id}{extension}", content_type=content_type)
+
+
+# Avance de una tarea en segundo plano (lo consultan las páginas que la lanzan)
+@user_passes_test(es_admin)
+def estado_tarea(request, tarea_id):
+    tarea = get_object_or_404(TareaFondo, id=tarea_id)
+    return JsonResponse({
+        'id': tarea.id,
+        'tipo': tarea.tipo,
+        'estado': tarea.estado,
+        'total': tarea.total,
+        'procesados': tarea.procesados,
+        'porcentaje': tarea.porcentaje,
+        'mensaje': tarea.mensaje,
+    })
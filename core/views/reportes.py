@@ -0,0 +1,197 @@
+# --------------------
+# Reportes y exportaciones
+# --------------------
+# IMPORTANTE: nada de matplotlib, ReportLab ni NumPy a nivel de módulo. Los
+# PDF se generan en core/reportes.py (vía core/renderizado.py, normalmente en
+# otro proceso) y los módulos de análisis se importan dentro de la vista que
+# los usa, así que el worker solo los carga con la primera petición.
+import logging
+import os
+from datetime import datetime
+
+from django.contrib import messages
+from django.contrib.auth.decorators import user_passes_test
+from django.core.files.storage import default_storage
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect, get_object_or_404
+from django.utils.text import slugify
+
+from .. import exportacion, renderizado
+from ..descargas import archivo_temporal, respuesta_archivo, zip_en_flujo
+from ..models import AnexoRequerido, Documento, Usuario
+from .comunes import es_admin
+
+logger = logging.getLogger(__name__)
+
+
+def _descargar_reporte(request, trabajo, *args, volver='admin_revision_documentacion'):
+    # Si el pool de reportes falla, un mensaje en lugar de un error 500
+    try:
+        filename, archivo = renderizado.renderizar(trabajo, *args)
+    except renderizado.ErrorReporte as error:
+        messages.error(request, f"No se pudo generar el reporte: {error} Intenta de nuevo.")
+        return redirect(volver)
+    return respuesta_archivo(archivo, filename)
+
+
+@user_passes_test(lambda u: u.is_superuser) # O tu función es_admin
+def reporte_general_pdf(request):
+    # Validaciones previas
+    if not AnexoRequerido.objects.exists():
+        messages.warning(request, "No hay anexos disponibles para generar el reporte.")
+        return redirect('admin_revision_documentacion')
+
+    return _descargar_reporte(request, renderizado.reporte_general)
+
+
+@user_passes_test(lambda u: u.is_superuser) # O tu test 'es_admin'
+def reporte_entidad_pdf(request, entidad_id):
+    entidad = get_object_or_404(Usuario, id=entidad_id)
+
+    return _descargar_reporte(request, renderizado.reporte_entidad, entidad.id)
+
+
+# --- Exportación masiva de reportes individuales (ZIP)
+@user_passes_test(lambda u: u.is_superuser)
+def exportar_reportes_entidades(request):
+    entidades = Usuario.objects.filter(rol='usuario', is_active=True).order_by('username')
+
+    # Filtros opcionales: ?entidad=1&entidad=2 o ?entidad_federativa=Zacatecas
+    ids = [i for i in request.GET.getlist('entidad') if i.isdigit()]
+    if ids:
+        entidades = entidades.filter(id__in=ids)
+    entidad_federativa = request.GET.get('entidad_federativa')
+    if entidad_federativa:
+        entidades = entidades.filter(entidad_federativa=entidad_federativa)
+
+    entidad_ids = list(entidades.values_list('id', flat=True))
+    if not entidad_ids:
+        messages.info(request, "ℹ️ No hay entidades para exportar.")
+        return redirect('admin_revision_documentacion')
+
+    reportes = renderizado.exportar_reportes_entidades(entidad_ids)
+    response = StreamingHttpResponse(zip_en_flujo(reportes), content_type='application/zip')
+    fecha_hoy = datetime.now().strftime('%d-%m-%Y')
+    response['Content-Disposition'] = f'attachment; filename="Reportes_Entidades_{fecha_hoy}.zip"'
+    return response
+
+
+# --- Documentos vigentes en un ZIP (por entidad y/o por anexo)
+def _documentos_en_zip(filas):
+    # Abre cada archivo solo mientras zip_en_flujo lo copia
+    usados = set()
+    for username, anexo, ruta in filas:
+        try:
+            archivo = default_storage.open(ruta, 'rb')
+        except OSError:
+            logger.warning("No se encontró %s; se omite del ZIP", ruta)
+            continue
+        with archivo:
+            # Nombres distintos pueden quedar iguales con slugify: se numeran
+            base = f"{slugify(username)}/{slugify(anexo)}"
+            extension = os.path.splitext(ruta)[1].lower() or '.pdf'
+            nombre, n = f"{base}{extension}", 1
+            while nombre in usados:
+                n += 1
+                nombre = f"{base}-{n}{extension}"
+            usados.add(nombre)
+            yield nombre, archivo
+
+
+@user_passes_test(es_admin)
+def descargar_documentos_zip(request):
+    # ?entidad=<id> (todos sus anexos) y/o ?anexo=<id> (ese anexo de todas las entidades)
+    documentos = Documento.objects.exclude(archivo='').exclude(archivo__isnull=True)
+    partes = ['Documentos']
+    entidad, anexo = request.GET.get('entidad', ''), request.GET.get('anexo', '')
+    if entidad.isdigit():
+        documentos = documentos.filter(usuario_id=int(entidad))
+        partes.append(get_object_or_404(Usuario, id=int(entidad)).username)
+    if anexo.isdigit():
+        documentos = documentos.filter(anexo_id=int(anexo))
+        partes.append(get_object_or_404(AnexoRequerido, id=int(anexo)).nombre)
+
+    if not documentos.exists():
+        messages.info(request, "ℹ️ No hay documentos cargados para descargar.")
+        return redirect('admin_revision_documentacion')
+
+    # Las filas se leen por bloques del cursor y los archivos por bloques del disco
+    # conforme sale la respuesta
+    filas = (
+        documentos.order_by('usuario__username', 'anexo__nombre')
+        .values_list('usuario__username', 'anexo__nombre', 'archivo')
+        .iterator(chunk_size=500)
+    )
+    response = StreamingHttpResponse(zip_en_flujo(_documentos_en_zip(filas)), content_type='application/zip')
+    partes.append(datetime.now().strftime('%d-%m-%Y'))
+    response['Content-Disposition'] = f'attachment; filename="{slugify("_".join(partes))}.zip"'
+    return response
+
+
+# Generar reporte de anexos
+@user_passes_test(es_admin)
+def reporte_anexos_pdf(request):
+    return _descargar_reporte(request, renderizado.reporte_anexos, volver='admin_anexos')
+
+
+# Exportar matriz de cumplimiento (entidad × anexo) en CSV o XLSX
+@user_passes_test(es_admin)
+def exportar_matriz_cumplimiento(request):
+    formato = request.GET.get('formato', 'csv')
+    fecha_hoy = datetime.now().strftime('%d-%m-%Y')
+    filas = exportacion.filas_matriz_cumplimiento()
+
+    if formato == 'xlsx':
+        archivo = archivo_temporal()
+        try:
+            exportacion.escribir_xlsx(filas, archivo)
+        except ImportError:
+            messages.error(request, "❌ La exportación a Excel requiere el paquete XlsxWriter.")
+            return redirect('admin_revision_documentacion')
+        return respuesta_archivo(
+            archivo,
+            f"Matriz_Cumplimiento_{fecha_hoy}.xlsx",
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+    response = StreamingHttpResponse(exportacion.csv_en_flujo(filas), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="Matriz_Cumplimiento_{fecha_hoy}.csv"'
+    return response
+
+
+# Instantánea columnar (.npz) para análisis fuera de línea
+@user_passes_test(es_admin)
+def descargar_instantanea(request):
+    from .. import instantaneas
+
+    archivo = archivo_temporal()
+    instantaneas.escribir_instantanea(archivo)
+    return respuesta_archivo(archivo, instantaneas.nombre_instantanea(), content_type='application/octet-stream')
+
+
+# Tendencias semanales de cumplimiento (JSON)
+@user_passes_test(es_admin)
+def tendencias_cumplimiento(request):
+    from .. import tendencias
+
+    por = request.GET.get('por', 'entidad_federativa')
+    if por not in tendencias.AGRUPACIONES:
+        por = 'entidad_federativa'
+    datos = tendencias.calcular_tendencias(por)
+
+    series = [
+        {
+            'grupo': grupo,
+            'cargados': datos['cargados'][i].tolist(),
+            'validados': datos['validados'][i].tolist(),
+            'respaldos': datos['respaldos'][i].tolist(),
+            'porcentaje': datos['porcentaje'][i].round(2).tolist(),
+        }
+        for i, grupo in enumerate(datos['grupos'].tolist())
+    ]
+    return JsonResponse({
+        'por': por,
+        'semanas': datos['semanas'].astype(str).tolist(),
+        'total': tendencias.porcentaje_total(datos).round(2).tolist(),
+        'series': series,
+    })
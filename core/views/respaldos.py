@@ -0,0 +1,211 @@
+# --------------------
+# Respaldos de anexos (histórico)
+# --------------------
+import logging
+from collections import Counter
+from datetime import date, datetime
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import user_passes_test
+from django.core.files.storage import default_storage
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.db.models.functions import ExtractYear
+from django.http import StreamingHttpResponse
+from django.shortcuts import render, redirect
+from django.utils.text import slugify  # Importante para limpiar nombres de carpetas
+
+from .. import tareas
+from ..descargas import zip_en_flujo
+from ..memoria import verificar_presupuesto
+from ..models import AnexoHistorico, AnexoRequerido, Documento, TareaFondo, Usuario
+from ..respaldos import ESTADOS_DIFERENCIA, diferencias, filtrar_respaldos, politica_retencion
+from .comunes import es_admin
+
+logger = logging.getLogger(__name__)
+
+
+@user_passes_test(es_admin)
+def respaldar_anexos(request):
+    if request.method == 'POST':
+        documentos = (
+            Documento.objects.exclude(archivo='').exclude(archivo__isnull=True)
+            .values_list('usuario_id', 'anexo_id', 'archivo')
+        )
+
+        # Respaldos existentes por (entidad, anexo), en un solo query
+        existentes = {}
+        for entidad_id, anexo_id, archivo in AnexoHistorico.objects.values_list(
+            'entidad_id', 'anexo_requerido_id', 'archivo'
+        ):
+            existentes.setdefault((entidad_id, anexo_id), []).append(archivo)
+
+        campo_archivo = AnexoHistorico._meta.get_field('archivo')
+        nuevos = []
+        for usuario_id, anexo_id, archivo in documentos.iterator():
+            verificar_presupuesto()
+            # Evitar respaldar si ya existe un respaldo con mismo nombre y entidad
+            nombre_archivo = archivo.split('/')[-1]
+            if any(r.endswith(nombre_archivo) for r in existentes.get((usuario_id, anexo_id), ())):
+                continue
+
+            # Crear copia física en histórico con nombre (se copia por bloques, sin leerlo completo)
+            respaldo = AnexoHistorico(entidad_id=usuario_id, anexo_requerido_id=anexo_id)
+            with default_storage.open(archivo, 'rb') as origen:
+                respaldo.archivo = default_storage.save(
+                    campo_archivo.generate_filename(respaldo, nombre_archivo), origen,
+                    max_length=campo_archivo.max_length,
+                )
+            nuevos.append(respaldo)
+
+        AnexoHistorico.objects.bulk_create(nuevos, batch_size=500)
+        respaldados = len(nuevos)
+
+        if respaldados:
+            # Los grupos que crecieron de más se compactan en segundo plano
+            if politica_retencion()[0]:
+                tareas.lanzar('compactar_respaldos', usuario=request.user)
+            messages.success(request, f"Se han respaldado {respaldados} archivos correctamente.")
+        else:
+            messages.info(request, "No había archivos nuevos para respaldar.")
+        return redirect('admin_anexos')
+    return redirect('admin_anexos')
+
+
+@user_passes_test(es_admin)
+def vista_respaldo_anexos(request):
+    # Filtros (GET): año, entidad y anexo
+    filtros = {}
+    for campo, clave in (('anio', 'year'), ('entidad_id', 'entidad'), ('anexo_id', 'anexo')):
+        valor = request.GET.get(clave, '')
+        if valor.isdigit():
+            filtros[campo] = int(valor)
+
+    # Años con su número de respaldos, calculados en la base (respetan entidad y anexo)
+    years = (
+        filtrar_respaldos(entidad_id=filtros.get('entidad_id'), anexo_id=filtros.get('anexo_id'))
+        .annotate(anio=ExtractYear('fecha_subida')).values('anio')
+        .annotate(total=Count('id')).order_by('-anio')
+    )
+
+    # Paginado sobre el índice (-fecha_subida, -id)
+    respaldos = (
+        filtrar_respaldos(**filtros).select_related('entidad', 'anexo_requerido')
+        .only('id', 'archivo', 'fecha_subida', 'entidad__username', 'anexo_requerido__nombre')
+        .order_by('-fecha_subida', '-id')
+    )
+    pagina = Paginator(respaldos, getattr(settings, 'RESPALDOS_POR_PAGINA', 50)).get_page(request.GET.get('page'))
+
+    # Query string de los filtros para los enlaces de paginación
+    consulta = request.GET.copy()
+    consulta.pop('page', None)
+
+    return render(
+        request,
+        'core/respaldo_anexos.html',
+        {
+            'respaldos': pagina,
+            'years': list(years),
+            'year_selected': request.GET.get('year', ''),
+            'entidad_selected': request.GET.get('entidad', ''),
+            'anexo_selected': request.GET.get('anexo', ''),
+            'filtros_qs': consulta.urlencode(),
+            'entidades': Usuario.objects.filter(rol='usuario').order_by('username').only('id', 'username'),
+            'anexos': AnexoRequerido.objects.order_by('nombre').only('id', 'nombre'),
+            'tareas': TareaFondo.objects.filter(tipo__in=['purgar_respaldos', 'compactar_respaldos'])[:5],
+        }
+    )
+
+@user_passes_test(es_admin)
+def diferencias_respaldos(request):
+    # Qué cambió en el histórico entre dos fechas (?a=AAAA-MM-DD&b=AAAA-MM-DD)
+    a, b = request.GET.get('a', ''), request.GET.get('b', '')
+    todos = request.GET.get('todos') == '1'
+    contexto = {'a': a, 'b': b, 'todos': todos, 'filas': None}
+    if a and b:
+        try:
+            fecha_a, fecha_b = date.fromisoformat(a), date.fromisoformat(b)
+        except ValueError:
+            messages.error(request, "Las fechas deben tener el formato AAAA-MM-DD.")
+            return redirect('diferencias_respaldos')
+
+        filas = diferencias(fecha_a, fecha_b)
+        resumen = Counter(f['estado'] for f in filas)
+        etiquetas = dict(ESTADOS_DIFERENCIA)
+        if not todos:
+            filas = [f for f in filas if f['estado'] != 'sin_cambios']
+
+        # Nombres y archivos de lo que se muestra, en tres queries
+        entidades = dict(Usuario.objects.filter(id__in={f['entidad_id'] for f in filas}).values_list('id', 'username'))
+        anexos = dict(AnexoRequerido.objects.values_list('id', 'nombre'))
+        ids = {pk for f in filas for pk in (f['respaldo_a'], f['respaldo_b']) if pk}
+        archivos = dict(AnexoHistorico.objects.filter(id__in=ids).values_list('id', 'archivo'))
+        for f in filas:
+            f['entidad'] = entidades.get(f['entidad_id'], '—')
+            f['anexo'] = anexos.get(f['anexo_id'], '—')
+            f['archivo_a'] = archivos.get(f['respaldo_a'])
+            f['archivo_b'] = archivos.get(f['respaldo_b'])
+            f['etiqueta'] = etiquetas[f['estado']]
+
+        contexto.update(filas=filas, resumen=[(e, etiquetas[e], resumen[e]) for e in etiquetas])
+    return render(request, 'core/diferencias_respaldos.html', contexto)
+
+
+@user_passes_test(es_admin)
+def limpiar_respaldo(request):
+    if request.method == 'POST':
+        # Filtros opcionales: solo un año y/o una entidad
+        parametros = {}
+        anio, entidad = request.POST.get('year', ''), request.POST.get('entidad', '')
+        if anio.isdigit():
+            parametros['anio'] = int(anio)
+        if entidad.isdigit():
+            parametros['entidad_id'] = int(entidad)
+
+        if not filtrar_respaldos(**parametros).exists():
+            messages.info(request, "ℹ️ No hay respaldos para limpiar.")
+            return redirect('vista_respaldo_anexos')
+
+        # Los archivos y registros se borran por lotes en segundo plano
+        tareas.lanzar('purgar_respaldos', parametros, request.user)
+        messages.success(request, "✅ La limpieza de respaldos se está ejecutando; el avance se muestra abajo.")
+        return redirect('vista_respaldo_anexos')
+    return redirect('vista_respaldo_anexos')
+
+# --- Histórico completo en un ZIP (Entidad / Anexo_Fecha.ext)
+def _respaldos_en_zip(filas):
+    # Abre cada archivo solo mientras zip_en_flujo lo copia; el presupuesto de
+    # memoria se revisa por archivo mientras sale la respuesta
+    for respaldo_id, username, anexo, fecha_subida, ruta in filas:
+        verificar_presupuesto()
+        try:
+            archivo = default_storage.open(ruta, 'rb')
+        except OSError as e:
+            logger.warning("Error al comprimir el respaldo %s: %s", respaldo_id, e)
+            continue
+        with archivo:
+            # slugify evita problemas con espacios o acentos ("Secretaría A" -> "secretaria-a")
+            extension = ruta.split('.')[-1]
+            yield f"{slugify(username)}/{slugify(anexo)}_{fecha_subida.strftime('%Y%m%d_%H%M')}.{extension}", archivo
+
+
+@user_passes_test(es_admin)
+def descargar_respaldo_zip(request):
+    respaldos = AnexoHistorico.objects.exclude(archivo='').exclude(archivo__isnull=True)
+
+    if not respaldos.exists():
+        messages.info(request, "ℹ️ No hay archivos respaldados para descargar.")
+        return redirect('vista_respaldo_anexos')
+
+    # Las filas se leen por bloques del cursor y los archivos por bloques del disco
+    filas = (
+        respaldos.order_by('entidad__username', 'anexo_requerido__nombre', 'fecha_subida', 'id')
+        .values_list('id', 'entidad__username', 'anexo_requerido__nombre', 'fecha_subida', 'archivo')
+        .iterator(chunk_size=500)
+    )
+    response = StreamingHttpResponse(zip_en_flujo(_respaldos_en_zip(filas)), content_type='application/zip')
+    # Le ponemos fecha al nombre del ZIP global
+    fecha_hoy = datetime.now().strftime('%d-%m-%Y')
+    response['Content-Disposition'] = f'attachment; filename=Respaldo_Documental_{fecha_hoy}.zip'
+    return response
@@ -0,0 +1,101 @@
+# --------------------
+# Inicio de sesión y contraseñas
+# --------------------
+import random
+import string
+
+from django.contrib import messages
+from django.contrib.auth import authenticate, login, logout, update_session_auth_hash
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.forms import PasswordChangeForm
+from django.core.mail import send_mail
+from django.shortcuts import render, redirect
+
+from ..models import Usuario
+
+
+def login_view(request):
+    if request.method == 'POST':
+        username = request.POST.get('username')
+        password = request.POST.get('password')
+
+        user = authenticate(request, username=username, password=password)
+
+        if user is not None:
+            login(request, user)
+            if user.is_superuser or user.rol == 'admin':
+                return redirect('admin_revision_documentacion')
+            elif user.rol == 'usuario':
+                return redirect('usuario_dashboard')
+        else:
+            return render(request, 'core/login.html', {'error': 'Usuario o contraseña incorrectos'})
+
+    return render(request, 'core/login.html')
+
+def cerrar_sesion(request):
+    logout(request)
+    return redirect('login')  # nombre de la URL del login
+
+# 🔑 Función para generar contraseñas aleatorias
+def generar_contrasena(longitud=10):
+    """Genera una contraseña aleatoria provisional"""
+    caracteres = string.ascii_letters + string.digits
+    return ''.join(random.choice(caracteres) for _ in range(longitud))
+
+# 📌 Recuperación de contraseña por correo
+def olvido_contrasena(request):
+    if request.method == "POST":
+        correo = request.POST.get("correo")  # 👈 en tu form el input debe llamarse 'correo'
+
+        try:
+            usuario = Usuario.objects.get(correo=correo)
+
+            # Generar nueva contraseña provisional
+            nueva_pass = generar_contrasena()
+            usuario.set_password(nueva_pass)  # 👈 se guarda encriptada
+            usuario.save()
+
+            # Enviar correo
+            mensaje = f"""Hola {usuario.nombre_responsable},
+
+Tu nueva contraseña es: {nueva_pass}
+
+Por favor, cambia tu contraseña después de iniciar sesión.
+"""
+            send_mail(
+                subject="Recuperación de contraseña - SEMUJERES",
+                message=mensaje,
+                from_email="asemujeres@gmail.com",  # ⚠️ cámbialo por el correo configurado en settings.py
+                recipient_list=[usuario.correo],
+                fail_silently=False,
+            )
+
+            messages.success(request, "Se envió una nueva contraseña a tu correo.")
+            return render(request, "core/olvido_contrasena.html")
+
+        except Usuario.DoesNotExist:
+            messages.error(request, " El correo no está registrado.")
+
+    return render(request, "core/olvido_contrasena.html")
+
+# 📌 Cambio de contraseña dentro del sistema
+@login_required
+def cambiar_contrasena(request):
+    if request.method == "POST":
+        form = PasswordChangeForm(user=request.user, data=request.POST)
+        if form.is_valid():
+            user = form.save()
+            update_session_auth_hash(request, user)  # 🔑 Mantener sesión activa
+            messages.success(request, "✅ Tu contraseña se cambió correctamente.")
+            return render(request, "core/cambiar_contrasena.html", {"form": PasswordChangeForm(user=request.user)})
+        else:
+            messages.error(request, "❌ Corrige los errores del formulario.")
+    else:
+        form = PasswordChangeForm(user=request.user)
+
+    # Traducción de etiquetas al español
+    form.fields['old_password'].label = "Contraseña actual"
+    form.fields['new_password1'].label = "Nueva contraseña"
+    form.fields['new_password2'].label = "Confirmar nueva contraseña"
+
+    return render(request, "core/cambiar_contrasena.html", {"form": form})
@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -7,6 +8,31 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Cómo se entregan los archivos subidos una vez autorizados (core/descargas.py):
+# 'django' (FileResponse con Range y ETag), 'x-accel' (nginx) o 'x-sendfile'
+# (Apache mod_xsendfile / lighttpd). Con nginx, por ejemplo:
+#   location /media-protegida/ { internal; alias /ruta/a/media/; }
+# En producción usa 'x-accel' o 'x-sendfile': con 'django' las respuestas por
+# rangos (206) se copian en Python en lugar de usar sendfile.
+MEDIA_ENVIO = os.environ.get('SEMUJERES_MEDIA_ENVIO', 'django')
+MEDIA_ACCEL_PREFIJO = '/media-protegida/'
+# Hilos que borran archivos en segundo plano tras confirmar la transacción (core/tareas.py)
+ARCHIVOS_BORRADO_HILOS = 4
+# Hilos para las tareas largas (TareaFondo) y registros por lote al purgar respaldos
+TAREAS_FONDO_HILOS = 2
+# Minutos sin avance tras los que una tarea pendiente o en curso se da por abandonada
+# (p. ej. tras reiniciar el worker) y se puede lanzar de nuevo
+TAREAS_FONDO_ABANDONO_MIN = 15
+RESPALDOS_PURGA_LOTE = 1000
+RESPALDOS_POR_PAGINA = 50  # filas por página en vista_respaldo_anexos
+USUARIOS_BORRADO_LOTE = 500  # registros por lote al eliminar un usuario (core/bajas.py)
+
+# Retención del histórico de anexos (core/respaldos.py): por cada entidad y anexo se
+# conservan las últimas N versiones y, con una_por_anio, la más reciente de cada año.
+# Se aplica después de cada respaldo y con `manage.py compactar_respaldos`.
+RESPALDOS_RETENCION = {'ultimas': 5, 'una_por_anio': True}
+RESPALDOS_COMPACTACION_ENTIDADES = 50  # entidades por query de compactación
+
 # Archivos estáticos
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'core/static']
@@ -28,11 +54,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.PerfiladoMiddleware',
+    'core.middleware.PresupuestoMemoriaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -60,14 +89,22 @@ WSGI_APPLICATION = 'semujeres_sistema.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.mysql',  # MySQLdb funciona con MariaDB
-        'NAME': 'semujer_db',
-        'USER': 'semujer_user',
-        'PASSWORD': 'Semujer123!',
-        'HOST': 'localhost',
-        'PORT': '3306',
+        'NAME': os.environ.get('SEMUJERES_DB_NAME', 'semujer_db'),
+        'USER': os.environ.get('SEMUJERES_DB_USER', 'semujer_user'),
+        'PASSWORD': os.environ.get('SEMUJERES_DB_PASSWORD', 'Semujer123!'),
+        'HOST': os.environ.get('SEMUJERES_DB_HOST', 'localhost'),
+        'PORT': os.environ.get('SEMUJERES_DB_PORT', '3306'),
     }
 }
 
+# SEMUJERES_DB=sqlite: base local en un archivo (desarrollo y pruebas de carga, ver core/carga.py)
+if os.environ.get('SEMUJERES_DB') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('SEMUJERES_SQLITE', os.path.join(BASE_DIR, 'db.sqlite3')),
+        'OPTIONS': {'timeout': 20},  # espera en lugar de fallar cuando otra escritura tiene el candado
+    }
+
 
 
 # Contraseñas
@@ -93,6 +130,58 @@ LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/login/'
 
+# Reportes
+# Generar los PDF en un pool de procesos dedicado (matplotlib/ReportLab no
+# crecen la memoria de los workers web). En False se generan en el mismo proceso.
+REPORTES_FUERA_DE_PROCESO = True
+REPORTES_POOL_WORKERS = 2
+REPORTES_POOL_MAX_TRABAJOS = 50      # reportes por worker antes de reciclarlo
+REPORTES_POOL_MAX_RSS_MB = 400       # memoria de un worker que obliga a reciclar el pool
+REPORTES_POOL_TIMEOUT = 120          # segundos
+# Procesos del pool aparte para las exportaciones masivas (None: uno por núcleo)
+REPORTES_EXPORTACION_WORKERS = None
+
+# Bytes que un reporte puede ocupar en memoria antes de pasar a un temporal en disco
+REPORTES_SPOOL_MAX_BYTES = 5 * 1024 * 1024
+
+
+# Puntajes de cumplimiento: peso de cada anexo según AnexoRequerido.obligatorio
+PUNTAJE_PESO_OBLIGATORIO = 2.0
+PUNTAJE_PESO_OPCIONAL = 1.0
+PUNTAJE_CACHE_SEGUNDOS = 300
+
+# Métricas por vista expuestas en /metrics (ver core/middleware.py)
+METRICAS_ACTIVAS = True
+METRICAS_MUESTREO_MEMORIA = 0.01     # fracción de peticiones con tracemalloc
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN', '')  # Authorization: Bearer <token> para el recolector
+
+# Perfiles de peticiones (X-Perfilar: 1 o ?perfilar=1, solo administradores)
+PERFILES_DIR = os.path.join(BASE_DIR, 'perfiles')
+PERFILES_MAXIMO = 50                 # se conservan los más recientes
+
+# Memoria (MB) que puede crecer el proceso durante cada vista antes de cancelarla
+# (por nombre de URL). Cubre también los reportes generados en el pool y las
+# respuestas en flujo; ver en core/memoria.py el alcance y sus límites
+PRESUPUESTOS_MEMORIA_MB = {
+    'descargar_respaldo_zip': 256,
+    'respaldar_anexos': 256,
+    'reporte_general_pdf': 300,
+    'reporte_entidad_pdf': 200,
+    'reporte_anexos_pdf': 200,
+    'exportar_reportes_entidades': 300,
+}
+
+# Carpeta donde `manage.py exportar_instantanea` guarda las instantáneas .npz
+INSTANTANEAS_DIR = os.path.join(BASE_DIR, 'instantaneas')
+
+# Caché compartida por los workers web y el pool de reportes
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'semujeres_cache'),
+    }
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -16,10 +16,9 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static 
 
+# Los archivos de MEDIA_URL los sirve core.urls (servir_archivo) con control de acceso
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('core.urls')),  # 👈 importa las URLs de core
-]  + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]